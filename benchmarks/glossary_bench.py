@@ -0,0 +1,301 @@
+"""Scaling benchmark for glossary generation.
+
+Generates synthetic English / Chinese / mixed corpora and times each stage of
+``generate_glossary`` separately, so the effect of corpus size, window size and
+vocabulary size can be compared run to run.
+
+Example::
+
+    python benchmarks/glossary_bench.py --sizes 10KB 1MB --windows 2 4 8 \
+        --output bench_glossary.json --profile-dir prof/
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from glossary import (  # noqa: E402
+    GlossaryEntry,
+    _build_graph,
+    _build_stopwords,
+    _extract_phrases,
+    _pagerank,
+    _split_sentences,
+    _tokenize,
+)
+
+LANGUAGES = ("en", "zh", "mixed")
+DEFAULT_SIZES = ("10KB", "100KB", "1MB", "10MB", "100MB", "500MB")
+STAGES = ("split", "tokenize", "graph", "pagerank", "phrases", "sort")
+
+_UNITS = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+_EN_SYLLABLES = ["ka", "ri", "to", "mel", "sen", "dor", "vi", "lan", "quo", "tes", "pra", "nix"]
+
+
+@dataclass
+class StageResult:
+    """One stage's timing and memory.
+
+    ``max_rss_bytes`` is the process's peak resident size after the stage and
+    ``rss_growth_bytes`` how far the stage raised it (0 if an earlier stage
+    peaked higher); both are ``None`` where ``resource`` is unavailable.
+    ``peak_bytes`` is the tracemalloc peak, recorded with ``--trace-memory``.
+    """
+
+    stage: str
+    seconds: float
+    max_rss_bytes: Optional[int] = None
+    rss_growth_bytes: Optional[int] = None
+    peak_bytes: Optional[int] = None
+
+
+@dataclass
+class BenchResult:
+    language: str
+    corpus_bytes: int
+    vocabulary: int
+    window_size: int
+    sentences: int = 0
+    tokens: int = 0
+    nodes: int = 0
+    edges: int = 0
+    entries: int = 0
+    total_seconds: float = 0.0
+    stages: List[StageResult] = field(default_factory=list)
+
+
+def parse_size(text: str) -> int:
+    upper = text.strip().upper()
+    for unit in sorted(_UNITS, key=len, reverse=True):
+        if upper.endswith(unit):
+            return int(float(upper[: -len(unit)]) * _UNITS[unit])
+    return int(upper)
+
+
+def max_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far, or ``None`` if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def build_vocabulary(language: str, size: int, rng: random.Random) -> List[str]:
+    words: set[str] = set()
+    while len(words) < size:
+        if language == "en" or (language == "mixed" and len(words) % 2 == 0):
+            count = rng.randint(1, 4)
+            words.add("".join(rng.choice(_EN_SYLLABLES) for _ in range(count)))
+        else:
+            count = rng.randint(1, 3)
+            words.add("".join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(count)))
+    return sorted(words)
+
+
+def generate_corpus(language: str, target_bytes: int, vocabulary: int, seed: int = 0) -> str:
+    """Build a Zipf-distributed corpus of roughly ``target_bytes`` UTF-8 bytes."""
+    rng = random.Random(seed)
+    words = build_vocabulary(language, vocabulary, rng)
+    cumulative = list(accumulate(1.0 / rank for rank in range(1, len(words) + 1)))
+
+    chunks: List[str] = []
+    produced = 0
+    while produced < target_bytes:
+        length = rng.randint(6, 18)
+        picked = rng.choices(words, cum_weights=cumulative, k=length)
+        if language == "zh":
+            sentence = "".join(word + ("，" if rng.random() < 0.3 else "") for word in picked) + "。"
+        else:
+            sentence = " ".join(picked).capitalize() + ". "
+        chunks.append(sentence)
+        produced += len(sentence.encode("utf-8"))
+    return "".join(chunks)
+
+
+def run_case(
+    text: str,
+    language: str,
+    vocabulary: int,
+    window_size: int,
+    top_k: int = 30,
+    min_term_length: int = 2,
+    trace_memory: bool = False,
+    profile_dir: Optional[Path] = None,
+) -> BenchResult:
+    """Run the ``generate_glossary`` stages one by one, timing each and recording its memory."""
+    result = BenchResult(
+        language=language,
+        corpus_bytes=len(text.encode("utf-8")),
+        vocabulary=vocabulary,
+        window_size=window_size,
+    )
+    stopwords = _build_stopwords(None)
+    tag = f"{language}-{result.corpus_bytes}-v{vocabulary}-w{window_size}"
+
+    def timed(stage: str, func: Callable[[], Any]) -> Any:
+        profiler = cProfile.Profile() if profile_dir is not None else None
+        if trace_memory:
+            tracemalloc.start()
+        rss_before = max_rss_bytes()
+        start = time.perf_counter()
+        if profiler is not None:
+            value = profiler.runcall(func)
+        else:
+            value = func()
+        elapsed = time.perf_counter() - start
+        rss_after = max_rss_bytes()
+        peak = None
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        if profiler is not None:
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(profile_dir / f"{tag}-{stage}.prof"))
+        result.stages.append(
+            StageResult(
+                stage=stage,
+                seconds=elapsed,
+                max_rss_bytes=rss_after,
+                rss_growth_bytes=rss_after - rss_before if rss_after is not None else None,
+                peak_bytes=peak,
+            )
+        )
+        result.total_seconds += elapsed
+        return value
+
+    sentences = timed("split", lambda: _split_sentences(text))
+    tokenized = timed("tokenize", lambda: [_tokenize(sentence, stopwords) for sentence in sentences])
+    graph = timed("graph", lambda: _build_graph(tokenized, window_size))
+    scores = timed("pagerank", lambda: _pagerank(graph) if graph else {})
+    phrases = timed(
+        "phrases",
+        lambda: _extract_phrases(sentences, scores, stopwords, min_term_length) if graph else {},
+    )
+    ranked = timed(
+        "sort",
+        lambda: sorted(
+            (GlossaryEntry(term=term, score=score) for term, score in phrases.items()),
+            key=lambda entry: entry.score,
+            reverse=True,
+        )[:top_k],
+    )
+
+    result.sentences = len(sentences)
+    result.tokens = sum(len(tokens) for tokens in tokenized)
+    result.nodes = len(graph)
+    result.edges = sum(len(neighbors) for neighbors in graph.values()) // 2
+    result.entries = len(ranked)
+    return result
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Glossary scaling benchmark")
+    parser.add_argument(
+        "--languages",
+        nargs="+",
+        choices=LANGUAGES,
+        default=list(LANGUAGES),
+        help="Synthetic corpus languages.",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="Corpus sizes, e.g. 10KB 1MB 500MB.",
+    )
+    parser.add_argument(
+        "--windows",
+        nargs="+",
+        type=int,
+        default=[4],
+        help="Co-occurrence window sizes.",
+    )
+    parser.add_argument(
+        "--vocabularies",
+        nargs="+",
+        type=int,
+        default=[5000],
+        help="Synthetic vocabulary sizes.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed.")
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help=(
+            "Also record each stage's peak Python allocations with tracemalloc "
+            "(slows stages down; the process peak RSS is always recorded)."
+        ),
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=None,
+        help="Write one cProfile dump per stage into this directory.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Write results as JSON to this path (defaults to stdout).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    results: List[Dict[str, Any]] = []
+    for language in args.languages:
+        for size_text in args.sizes:
+            for vocabulary in args.vocabularies:
+                text = generate_corpus(language, parse_size(size_text), vocabulary, args.seed)
+                for window_size in args.windows:
+                    result = run_case(
+                        text,
+                        language,
+                        vocabulary,
+                        window_size,
+                        trace_memory=args.trace_memory,
+                        profile_dir=args.profile_dir,
+                    )
+                    results.append(asdict(result))
+                    print(
+                        f"{language:>5} {size_text:>6} vocab={vocabulary:<6} "
+                        f"window={window_size:<2} {result.total_seconds:8.3f}s",
+                        file=sys.stderr,
+                    )
+                del text
+
+    payload = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = json.dumps(payload, ensure_ascii=False, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(output, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,77 @@
 from __future__ import annotations
 from runtime_paths import get_app_root
 
+import multiprocessing
+import os
 import sys
+import threading
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Deque, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from conversion import ConversionMode, ConversionRequest
 from service import GlossaryJobInput, OcrJobInput, PptExtractJobInput, ServiceLayer
+from task_queue import FINISHED_STATUSES, TaskQueue, TaskRecord, TaskStatus
+
+_TASK_COLUMNS = ["Task ID", "Description", "Status", "Progress", "Result"]
+_STATUS_COLUMN = 2
+_PROGRESS_COLUMN = 3
+_RESULT_COLUMN = 4
+_STATUS_ORDER = {status: order for order, status in enumerate(TaskStatus)}
+# How often task changes reported by worker threads reach the window.
+_TASK_FLUSH_MS = 100
+# Files found in dropped folders are added this many at a time, this often.
+_INSERT_BATCH = 500
+_INSERT_INTERVAL_MS = 50
+
+_IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".gif", ".webp")
+_CONVERSION_SUFFIXES = {
+    ConversionMode.PPTX_TO_PDF: (".pptx",),
+    ConversionMode.PDF_TO_PPTX: (".pdf",),
+    ConversionMode.DOCX_TO_PDF: (".docx",),
+    ConversionMode.PDF_TO_DOCX: (".pdf",),
+    ConversionMode.IMAGE_TO_PDF: _IMAGE_SUFFIXES,
+    ConversionMode.IMAGES_TO_PDF: _IMAGE_SUFFIXES,
+}
+_OCR_SUFFIXES = {"ocr_image": _IMAGE_SUFFIXES, "ocr_pdf": (".pdf",)}
+_PPT_SUFFIXES = (".pptx",)
+_GLOSSARY_SUFFIXES = (".txt", ".docx", ".pptx", ".pdf")
 
 
 class FileListWidget(QtWidgets.QListWidget):
-    def __init__(self, parent: Optional[QtWidgets.QWidget] = None) -> None:
+    """List of input files; accepts dropped files and folders.
+
+    Dropped folders are scanned recursively on a background thread for
+    files with one of ``suffixes`` (any file if empty). What the scan finds
+    is added in batches from a timer, so dropping a folder of tens of
+    thousands of files does not block the window. Paths already in the list
+    are skipped.
+    """
+
+    scan_finished = QtCore.Signal(int)
+
+    def __init__(self, parent: Optional[QtWidgets.QWidget] = None, suffixes: Sequence[str] = ()) -> None:
         super().__init__(parent)
         self.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
         self.setAcceptDrops(True)
+        self.setUniformItemSizes(True)
+        self._suffixes: FrozenSet[str] = frozenset()
+        self.set_suffixes(suffixes)
+        self._known: Set[str] = set()
+        self._found: Deque[str] = deque()
+        self._scanners: List[threading.Thread] = []
+        self._stop_scans = threading.Event()
+        self._scan_added = 0
+        self._insert_timer = QtCore.QTimer(self)
+        self._insert_timer.setInterval(_INSERT_INTERVAL_MS)
+        self._insert_timer.timeout.connect(self._insert_found)
+
+    def set_suffixes(self, suffixes: Sequence[str]) -> None:
+        """Suffixes picked up from folders scanned from now on."""
+        self._suffixes = frozenset(suffix.lower() for suffix in suffixes)
 
     def dragEnterEvent(self, event: QtGui.QDragEnterEvent) -> None:
         if event.mimeData().hasUrls():
@@ -34,34 +89,250 @@ class FileListWidget(QtWidgets.QListWidget):
         if not event.mimeData().hasUrls():
             event.ignore()
             return
+        files: List[str] = []
+        folders: List[Path] = []
         for url in event.mimeData().urls():
             path = Path(url.toLocalFile())
-            if path.exists():
-                self.addItem(str(path))
+            if path.is_dir():
+                folders.append(path)
+            elif path.exists():
+                files.append(str(path))
+        self.add_paths(files)
+        if folders:
+            self.scan_folders(folders)
         event.acceptProposedAction()
 
+    def add_paths(self, paths: Iterable[str]) -> int:
+        """Append the paths not in the list yet; returns how many were added."""
+        added: List[str] = []
+        for path in paths:
+            key = os.path.normcase(os.path.abspath(path))
+            if key not in self._known:
+                self._known.add(key)
+                added.append(path)
+        self.addItems(added)
+        return len(added)
+
+    def scan_folders(self, folders: Sequence[Path]) -> None:
+        scanner = threading.Thread(
+            target=self._scan,
+            args=(list(folders), self._suffixes),
+            name="folder-scan",
+            daemon=True,
+        )
+        self._scanners.append(scanner)
+        scanner.start()
+        self._insert_timer.start()
+
+    def stop_scans(self) -> None:
+        self._stop_scans.set()
+
     def paths(self) -> List[Path]:
         return [Path(self.item(index).text()) for index in range(self.count())]
 
     def remove_selected(self) -> None:
         for item in self.selectedItems():
             row = self.row(item)
+            self._known.discard(os.path.normcase(os.path.abspath(item.text())))
             self.takeItem(row)
 
+    def clear(self) -> None:
+        super().clear()
+        self._known.clear()
+
+    def _scan(self, folders: List[Path], suffixes: FrozenSet[str]) -> None:
+        # Runs on the scanner thread; only the deque is shared with the GUI.
+        for folder in folders:
+            for path in _walk_files(folder, suffixes, self._stop_scans):
+                self._found.append(path)
+
+    def _insert_found(self) -> None:
+        # Check the scanners before the deque: a scanner that has exited has
+        # already queued everything it found.
+        self._scanners = [scanner for scanner in self._scanners if scanner.is_alive()]
+        scanning = bool(self._scanners)
+        batch: List[str] = []
+        while self._found and len(batch) < _INSERT_BATCH:
+            batch.append(self._found.popleft())
+        self._scan_added += self.add_paths(batch)
+        if not scanning and not self._found:
+            self._insert_timer.stop()
+            added, self._scan_added = self._scan_added, 0
+            self.scan_finished.emit(added)
+
 
 @dataclass
 class UiState:
     output: Optional[Path]
 
 
+class TaskEvents(QtCore.QObject):
+    """Carries queue notifications from worker threads to the GUI thread.
+
+    :meth:`notify` may be called from any thread and only records the task;
+    a timer on the GUI thread emits ``changed`` every ``_TASK_FLUSH_MS``
+    with each changed task once, in the order they first changed.
+    """
+
+    changed = QtCore.Signal(list)
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self._pending: Deque[TaskRecord] = deque()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(_TASK_FLUSH_MS)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def notify(self, task: TaskRecord) -> None:
+        self._pending.append(task)
+
+    def flush(self) -> None:
+        changed: Dict[str, TaskRecord] = {}
+        while self._pending:
+            task = self._pending.popleft()
+            changed[task.task_id] = task
+        if changed:
+            self.changed.emit(list(changed.values()))
+
+
+class TaskTableModel(QtCore.QAbstractTableModel):
+    """The queue's tasks in submission order, read straight from their records.
+
+    Each batch of changes is applied at once: new tasks are appended with a
+    single insert, and changed tasks get one ``dataChanged`` per run of
+    adjacent rows, so views repaint only those rows.
+    """
+
+    SORT_ROLE = QtCore.Qt.ItemDataRole.UserRole + 1
+    PROGRESS_ROLE = QtCore.Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self._tasks: List[TaskRecord] = []
+        self._rows: Dict[str, int] = {}
+
+    def tasks_changed(self, tasks: List[TaskRecord]) -> None:
+        added = [task for task in tasks if task.task_id not in self._rows]
+        rows = sorted(self._rows[task.task_id] for task in tasks if task.task_id in self._rows)
+        if added:
+            first = len(self._tasks)
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(added) - 1)
+            for task in added:
+                self._rows[task.task_id] = len(self._tasks)
+                self._tasks.append(task)
+            self.endInsertRows()
+        for first, last in _row_runs(rows):
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(_TASK_COLUMNS) - 1))
+
+    def task(self, row: int) -> TaskRecord:
+        return self._tasks[row]
+
+    def remove_finished(self) -> None:
+        self.beginResetModel()
+        self._tasks = [task for task in self._tasks if task.status not in FINISHED_STATUSES]
+        self._rows = {task.task_id: row for row, task in enumerate(self._tasks)}
+        self.endResetModel()
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._tasks)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(_TASK_COLUMNS)
+
+    def headerData(
+        self,
+        section: int,
+        orientation: QtCore.Qt.Orientation,
+        role: int = QtCore.Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if orientation == QtCore.Qt.Orientation.Horizontal and role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return _TASK_COLUMNS[section]
+        return None
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        task = self._tasks[index.row()]
+        column = index.column()
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return _task_text(task, column)
+        if role == QtCore.Qt.ItemDataRole.ToolTipRole and column == _STATUS_COLUMN:
+            return task.error
+        if role == self.PROGRESS_ROLE and column == _PROGRESS_COLUMN:
+            return _task_percent(task)
+        if role == self.SORT_ROLE:
+            if column == _STATUS_COLUMN:
+                return _STATUS_ORDER[task.status]
+            if column == _PROGRESS_COLUMN:
+                percent = _task_percent(task)
+                return percent if percent is not None else -1
+            return _task_text(task, column)
+        return None
+
+
+class TaskFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """Sorts and filters a :class:`TaskTableModel`; can hide finished tasks."""
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self._hide_finished = False
+        self.setSortRole(TaskTableModel.SORT_ROLE)
+        self.setFilterCaseSensitivity(QtCore.Qt.CaseSensitivity.CaseInsensitive)
+        self.setFilterKeyColumn(-1)
+        self.setDynamicSortFilter(True)
+
+    def set_hide_finished(self, hide: bool) -> None:
+        self._hide_finished = hide
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QtCore.QModelIndex) -> bool:
+        if self._hide_finished and self.sourceModel().task(source_row).status in FINISHED_STATUSES:
+            return False
+        return super().filterAcceptsRow(source_row, source_parent)
+
+
+class ProgressDelegate(QtWidgets.QStyledItemDelegate):
+    """Draws the progress column as a progress bar."""
+
+    def paint(
+        self,
+        painter: QtGui.QPainter,
+        option: QtWidgets.QStyleOptionViewItem,
+        index: QtCore.QModelIndex,
+    ) -> None:
+        percent = index.data(TaskTableModel.PROGRESS_ROLE)
+        if percent is None:
+            super().paint(painter, option, index)
+            return
+        bar = QtWidgets.QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(2, 2, -2, -2)
+        bar.state = option.state
+        bar.minimum = 0
+        bar.maximum = 100
+        bar.progress = percent
+        bar.text = index.data()
+        bar.textVisible = True
+        style = option.widget.style() if option.widget is not None else QtWidgets.QApplication.style()
+        style.drawControl(QtWidgets.QStyle.ControlElement.CE_ProgressBar, bar, painter)
+
+
 class ConversionWindow(QtWidgets.QMainWindow):
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("SH File Helper")
         self.resize(1000, 700)
 
-        self._service = ServiceLayer()
+        # Jobs run on worker threads, leaving a core for the window. The queue
+        # reports status and progress from those threads; TaskEvents hands
+        # them to the GUI thread in batches.
+        self._service = ServiceLayer(queue=TaskQueue(workers=max(1, (os.cpu_count() or 2) - 1)))
         self._state = UiState(output=None)
+        self._task_model = TaskTableModel(self)
+        self._task_events = TaskEvents(self)
+        self._task_events.changed.connect(self._task_model.tasks_changed)
+        self._task_events.changed.connect(self._on_tasks_changed)
+        self._service.queue.add_listener(self._task_events.notify, progress=True)
 
         root = QtWidgets.QWidget()
         self.setCentralWidget(root)
@@ -80,10 +351,20 @@ class ConversionWindow(QtWidgets.QMainWindow):
         self.tabs.addTab(self._ppt_tab, "PPT Extract")
         self.tabs.addTab(self._glossary_tab, "Glossary")
 
-        self.task_table = QtWidgets.QTableWidget(0, 4)
-        self.task_table.setHorizontalHeaderLabels(["Task ID", "Description", "Status", "Result"])
-        self.task_table.horizontalHeader().setStretchLastSection(True)
+        self._task_proxy = TaskFilterProxyModel(self)
+        self._task_proxy.setSourceModel(self._task_model)
+        self.task_table = QtWidgets.QTableView()
+        self.task_table.setModel(self._task_proxy)
+        self.task_table.setItemDelegateForColumn(_PROGRESS_COLUMN, ProgressDelegate(self.task_table))
+        self.task_table.setSortingEnabled(True)
+        self.task_table.sortByColumn(-1, QtCore.Qt.SortOrder.AscendingOrder)
+        self.task_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.task_table.verticalHeader().setVisible(False)
+        self.task_table.horizontalHeader().setSectionResizeMode(
+            _RESULT_COLUMN, QtWidgets.QHeaderView.ResizeMode.Stretch
+        )
         layout.addWidget(QtWidgets.QLabel("Task Queue"))
+        layout.addLayout(self._build_task_controls())
         layout.addWidget(self.task_table)
 
         self.status_label = QtWidgets.QLabel("Idle")
@@ -102,7 +383,12 @@ class ConversionWindow(QtWidgets.QMainWindow):
         self.mode_combo.currentTextChanged.connect(self._update_conversion_output_placeholder)
         layout.addRow("Conversion Mode", self.mode_combo)
 
-        self.conversion_inputs = FileListWidget()
+        self.conversion_inputs = FileListWidget(
+            suffixes=_CONVERSION_SUFFIXES[ConversionMode(self.mode_combo.currentText())]
+        )
+        self.mode_combo.currentTextChanged.connect(
+            lambda text: self.conversion_inputs.set_suffixes(_CONVERSION_SUFFIXES[ConversionMode(text)])
+        )
         conversion_buttons = self._build_file_buttons(self.conversion_inputs, multi=True)
         layout.addRow("Input Files", self._wrap_list_with_buttons(self.conversion_inputs, conversion_buttons))
 
@@ -125,7 +411,10 @@ class ConversionWindow(QtWidgets.QMainWindow):
         self.ocr_mode.addItems(["ocr_image", "ocr_pdf"])
         layout.addRow("OCR Mode", self.ocr_mode)
 
-        self.ocr_input = FileListWidget()
+        self.ocr_input = FileListWidget(suffixes=_OCR_SUFFIXES[self.ocr_mode.currentText()])
+        self.ocr_mode.currentTextChanged.connect(
+            lambda text: self.ocr_input.set_suffixes(_OCR_SUFFIXES[text])
+        )
         ocr_buttons = self._build_file_buttons(self.ocr_input, multi=False)
         layout.addRow("Input File", self._wrap_list_with_buttons(self.ocr_input, ocr_buttons))
 
@@ -158,7 +447,7 @@ class ConversionWindow(QtWidgets.QMainWindow):
         tab = QtWidgets.QWidget()
         layout = QtWidgets.QFormLayout(tab)
 
-        self.ppt_input = FileListWidget()
+        self.ppt_input = FileListWidget(suffixes=_PPT_SUFFIXES)
         ppt_buttons = self._build_file_buttons(self.ppt_input, multi=False)
         layout.addRow("PPTX File", self._wrap_list_with_buttons(self.ppt_input, ppt_buttons))
 
@@ -186,7 +475,7 @@ class ConversionWindow(QtWidgets.QMainWindow):
         tab = QtWidgets.QWidget()
         layout = QtWidgets.QFormLayout(tab)
 
-        self.glossary_inputs = FileListWidget()
+        self.glossary_inputs = FileListWidget(suffixes=_GLOSSARY_SUFFIXES)
         glossary_buttons = self._build_file_buttons(self.glossary_inputs, multi=True)
         layout.addRow("Input Files", self._wrap_list_with_buttons(self.glossary_inputs, glossary_buttons))
 
@@ -240,6 +529,7 @@ class ConversionWindow(QtWidgets.QMainWindow):
         add_button.clicked.connect(lambda: self._add_inputs(widget, multi))
         remove_button = QtWidgets.QPushButton("Remove Selected")
         remove_button.clicked.connect(widget.remove_selected)
+        widget.scan_finished.connect(lambda count: self._set_status(f"Added {count} file(s) from dropped folders."))
         buttons.addWidget(add_button)
         buttons.addWidget(remove_button)
         buttons.addStretch()
@@ -267,10 +557,7 @@ class ConversionWindow(QtWidgets.QMainWindow):
         else:
             file_path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Select Input File")
             files = [file_path] if file_path else []
-        for file_path in files:
-            if not file_path:
-                continue
-            widget.addItem(file_path)
+        widget.add_paths(file_path for file_path in files if file_path)
 
     def _select_output_file(self, field: QtWidgets.QLineEdit, suffix: str) -> None:
         filename, _ = QtWidgets.QFileDialog.getSaveFileName(
@@ -302,9 +589,7 @@ class ConversionWindow(QtWidgets.QMainWindow):
             output_path=Path(output),
         )
         task = self._service.submit_conversion(request)
-        self._service.queue.run_all()
-        self._refresh_tasks()
-        self._report_task(task)
+        self._set_status(f"Queued: {task.description}")
 
     def _run_ocr(self) -> None:
         inputs = self.ocr_input.paths()
@@ -326,9 +611,7 @@ class ConversionWindow(QtWidgets.QMainWindow):
             task = self._service.submit_ocr_image(request)
         else:
             task = self._service.submit_ocr_pdf(request)
-        self._service.queue.run_all()
-        self._refresh_tasks()
-        self._report_task(task)
+        self._set_status(f"Queued: {task.description}")
 
     def _run_ppt_extract(self) -> None:
         inputs = self.ppt_input.paths()
@@ -346,9 +629,7 @@ class ConversionWindow(QtWidgets.QMainWindow):
             language=self.ppt_lang.currentData(),
         )
         task = self._service.submit_ppt_extract(request)
-        self._service.queue.run_all()
-        self._refresh_tasks()
-        self._report_task(task)
+        self._set_status(f"Queued: {task.description}")
 
     def _run_glossary(self) -> None:
         inputs = self.glossary_inputs.paths()
@@ -371,25 +652,43 @@ class ConversionWindow(QtWidgets.QMainWindow):
             output_format=self.glossary_format.currentText(),
         )
         task = self._service.submit_glossary(request)
-        self._service.queue.run_all()
-        self._refresh_tasks()
-        self._report_task(task)
+        self._set_status(f"Queued: {task.description}")
 
-    def _report_task(self, task) -> None:
-        if task.status.value == "completed":
+    def _report_task(self, task: TaskRecord) -> None:
+        if task.status == TaskStatus.COMPLETED:
             self._set_status(f"Completed: {task.result}")
+        elif task.status == TaskStatus.CANCELLED:
+            self._set_status(f"Cancelled: {task.description}")
         else:
             self._set_status(f"Failed: {task.error}")
 
-    def _refresh_tasks(self) -> None:
-        tasks = self._service.queue.list_tasks()
-        self.task_table.setRowCount(len(tasks))
-        for row, task in enumerate(tasks):
-            self.task_table.setItem(row, 0, QtWidgets.QTableWidgetItem(task.task_id))
-            self.task_table.setItem(row, 1, QtWidgets.QTableWidgetItem(task.description))
-            self.task_table.setItem(row, 2, QtWidgets.QTableWidgetItem(task.status.value))
-            result_text = str(task.result) if task.result is not None else ""
-            self.task_table.setItem(row, 3, QtWidgets.QTableWidgetItem(result_text))
+    def _on_tasks_changed(self, tasks: List[TaskRecord]) -> None:
+        finished = [task for task in tasks if task.status in FINISHED_STATUSES]
+        if finished:
+            self._report_task(finished[-1])
+
+    def _build_task_controls(self) -> QtWidgets.QHBoxLayout:
+        controls = QtWidgets.QHBoxLayout()
+        task_filter = QtWidgets.QLineEdit()
+        task_filter.setPlaceholderText("Filter tasks")
+        task_filter.setClearButtonEnabled(True)
+        task_filter.textChanged.connect(self._task_proxy.setFilterFixedString)
+        hide_finished = QtWidgets.QCheckBox("Hide finished")
+        hide_finished.toggled.connect(self._task_proxy.set_hide_finished)
+        cancel_button = QtWidgets.QPushButton("Cancel Selected")
+        cancel_button.clicked.connect(self._cancel_selected_tasks)
+        clear_button = QtWidgets.QPushButton("Clear Finished")
+        clear_button.clicked.connect(self._task_model.remove_finished)
+        controls.addWidget(task_filter, stretch=1)
+        controls.addWidget(hide_finished)
+        controls.addWidget(cancel_button)
+        controls.addWidget(clear_button)
+        return controls
+
+    def _cancel_selected_tasks(self) -> None:
+        for index in self.task_table.selectionModel().selectedRows():
+            task = self._task_model.task(self._task_proxy.mapToSource(index).row())
+            self._service.cancel(task.task_id)
 
     def _update_conversion_output_placeholder(self, mode_text: str) -> None:
         mode = ConversionMode(mode_text)
@@ -398,6 +697,15 @@ class ConversionWindow(QtWidgets.QMainWindow):
 
     def _set_status(self, message: str) -> None:
         self.status_label.setText(message)
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        for file_list in (self.conversion_inputs, self.ocr_input, self.ppt_input, self.glossary_inputs):
+            file_list.stop_scans()
+        # Running tasks stop at their next progress report.
+        for task in self._service.queue.list_tasks():
+            self._service.cancel(task.task_id)
+        self._service.queue.shutdown(wait=False)
+        super().closeEvent(event)
     
     def _check_runtime_deps(self) -> None:
         app_root = get_app_root()
@@ -423,6 +731,77 @@ class ConversionWindow(QtWidgets.QMainWindow):
         else:
             self._set_status("Ready (Tesseract OK)")
 
+def _walk_files(root: Path, suffixes: FrozenSet[str], stop: threading.Event) -> Iterator[str]:
+    """Files under ``root`` with one of ``suffixes`` (any if empty), in name order.
+
+    Symlinked folders are not followed, so links cannot send the walk in
+    circles; unreadable folders are skipped.
+    """
+    pending = [str(root)]
+    while pending and not stop.is_set():
+        folder = pending.pop()
+        try:
+            with os.scandir(folder) as scan:
+                entries = sorted(scan, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subfolders: List[str] = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subfolders.append(entry.path)
+                elif entry.is_file() and (
+                    not suffixes or os.path.splitext(entry.name)[1].lower() in suffixes
+                ):
+                    yield entry.path
+            except OSError:
+                continue
+        pending.extend(reversed(subfolders))
+
+
+def _task_text(task: TaskRecord, column: int) -> str:
+    if column == 0:
+        return task.task_id
+    if column == 1:
+        return task.description
+    if column == _STATUS_COLUMN:
+        return task.status.value
+    if column == _PROGRESS_COLUMN:
+        if task.status == TaskStatus.COMPLETED:
+            return "Done"
+        progress = task.progress
+        if task.status != TaskStatus.RUNNING or progress is None:
+            return ""
+        if not progress.total:
+            return progress.stage
+        return f"{progress.stage} {progress.done}/{progress.total}"
+    return str(task.result) if task.result is not None else ""
+
+
+def _task_percent(task: TaskRecord) -> Optional[int]:
+    """Progress bar value; None while there is no count to show."""
+    if task.status == TaskStatus.COMPLETED:
+        return 100
+    fraction = task.progress.fraction if task.progress is not None else None
+    if task.status != TaskStatus.RUNNING or fraction is None:
+        return None
+    return int(fraction * 100)
+
+
+def _row_runs(rows: List[int]) -> Iterator[Tuple[int, int]]:
+    """``(first, last)`` of each run of consecutive numbers in sorted ``rows``."""
+    start = previous = None
+    for row in rows:
+        if previous is not None and row == previous + 1:
+            previous = row
+            continue
+        if start is not None:
+            yield start, previous
+        start = previous = row
+    if start is not None:
+        yield start, previous
+
+
 def _output_suffix(mode: ConversionMode) -> str:
     mapping = {
         ConversionMode.PPTX_TO_PDF: ".pdf",
@@ -436,6 +815,8 @@ def _output_suffix(mode: ConversionMode) -> str:
 
 
 def main() -> None:
+    # pdf2docx's multi-processing re-launches the frozen executable on Windows.
+    multiprocessing.freeze_support()
     app = QtWidgets.QApplication(sys.argv)
     window = ConversionWindow()
     window.show()
@@ -1,40 +1,138 @@
 """Core conversion and OCR helpers for SH-file-helper."""
 
-from .conversion import ConversionError, ConversionMode, ConversionRequest, convert
+from .artifact_store import ArtifactStore, ArtifactStoreStats
+from .async_service import AsyncServiceError, AsyncServiceLayer
+from .conversion import (
+    ConversionError,
+    ConversionItemResult,
+    ConversionMode,
+    ConversionRequest,
+    IMAGE_PDF_PROFILES,
+    ImageEncoding,
+    ImagePdfProfile,
+    convert,
+    convert_batch,
+    images_to_pptx,
+)
 from .glossary import GlossaryEntry, GlossaryError, GlossaryRequest, GlossaryResult, generate_glossary
-from .ocr import OcrError, OcrRequest, OcrResult, ocr_image, ocr_pdf
+from .job_client import JobClient, JobClientError
+from .job_codec import JOB_TYPES, JobCodecError, decode_job, encode_job, encode_task
+from .job_server import JobServer
+from .libreoffice_pool import LibreOfficePool, LibreOfficePoolError
+from .memory_estimate import estimate_job_memory
+from .metrics import StageMetrics, record_metrics, span, write_jsonl, write_prometheus
+from .ocr import OcrError, OcrRequest, OcrResult, ocr_image, ocr_images, ocr_pdf
+from .pipeline import (
+    ExtractText,
+    Glossary,
+    Ocr,
+    PIPELINE_STEPS,
+    PipelineError,
+    PipelineJobInput,
+    Rasterize,
+    ToPdf,
+    ToPptx,
+    run_pipeline,
+)
 from .ppt_extract import PptExtractError, PptExtractRequest, PptExtractResult, extract_ppt_text
+from .progress import ProgressEvent, ProgressThrottle
 from .service import GlossaryJobInput, OcrJobInput, PptExtractJobInput, ServiceLayer
-from .task_queue import TaskQueue, TaskRecord, TaskStatus
+from .spool import Spool, SpoolError, SpoolWorker
+from .task_journal import JournalEntry, TaskJournal, TaskJournalError
+from .task_queue import (
+    TaskCancelled,
+    TaskQueue,
+    TaskRecord,
+    TaskStatus,
+    current_task,
+    raise_if_cancelled,
+    task_progress,
+)
 from .text_extract import TextExtractError, TextExtractRequest, extract_text
+from .watchdog import RETRIES, TIMEOUTS, ProcessTimeout, RetryPolicy, TimeoutPolicy, run_process
 
 __all__ = [
+    "ArtifactStore",
+    "ArtifactStoreStats",
+    "AsyncServiceError",
+    "AsyncServiceLayer",
     "ConversionError",
+    "ConversionItemResult",
     "ConversionMode",
     "ConversionRequest",
+    "IMAGE_PDF_PROFILES",
+    "ImageEncoding",
+    "ImagePdfProfile",
     "convert",
+    "convert_batch",
+    "images_to_pptx",
     "GlossaryEntry",
     "GlossaryError",
     "GlossaryRequest",
     "GlossaryResult",
     "generate_glossary",
+    "JobClient",
+    "JobClientError",
+    "JOB_TYPES",
+    "JobCodecError",
+    "decode_job",
+    "encode_job",
+    "encode_task",
+    "JobServer",
+    "LibreOfficePool",
+    "LibreOfficePoolError",
+    "estimate_job_memory",
+    "StageMetrics",
+    "record_metrics",
+    "span",
+    "write_jsonl",
+    "write_prometheus",
     "OcrError",
     "OcrRequest",
     "OcrResult",
     "ocr_image",
+    "ocr_images",
     "ocr_pdf",
+    "ExtractText",
+    "Glossary",
+    "Ocr",
+    "PIPELINE_STEPS",
+    "PipelineError",
+    "PipelineJobInput",
+    "Rasterize",
+    "ToPdf",
+    "ToPptx",
+    "run_pipeline",
     "PptExtractError",
     "PptExtractRequest",
     "PptExtractResult",
     "extract_ppt_text",
+    "ProgressEvent",
+    "ProgressThrottle",
     "GlossaryJobInput",
     "OcrJobInput",
     "PptExtractJobInput",
     "ServiceLayer",
+    "Spool",
+    "SpoolError",
+    "SpoolWorker",
+    "JournalEntry",
+    "TaskJournal",
+    "TaskJournalError",
+    "TaskCancelled",
     "TaskQueue",
     "TaskRecord",
     "TaskStatus",
+    "current_task",
+    "raise_if_cancelled",
+    "task_progress",
     "TextExtractError",
     "TextExtractRequest",
     "extract_text",
-]
\ No newline at end of file
+    "RETRIES",
+    "TIMEOUTS",
+    "ProcessTimeout",
+    "RetryPolicy",
+    "TimeoutPolicy",
+    "run_process",
+]
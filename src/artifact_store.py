@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ArtifactStoreStats:
+    hits: int
+    misses: int
+    stores: int
+    evictions: int
+    size_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ArtifactStore:
+    """Content-addressed cache of conversion outputs with an LRU size cap.
+
+    Artifacts live under ``root/<key[:2]>/<key>``. A hit copies the artifact
+    to the requested output path; the artifact's mtime records its last use
+    for eviction.
+
+    ``use_hardlinks=True`` links outputs to the artifact instead (falling back
+    to a copy across devices). That saves the copy, but the output then
+    shares its bytes and mtime with the store: anything that later rewrites
+    the output file in place (as the converters here do when asked for the
+    same output path) corrupts the cached artifact. Only enable it when
+    outputs are treated as read-only.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 2 * 1024**3, use_hardlinks: bool = False) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.use_hardlinks = use_hardlinks
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._size = sum(size for _, size, _ in self._entries())
+
+    def fetch(self, key: str, output_path: Path) -> bool:
+        """Materialize the artifact for ``key`` at ``output_path`` if present."""
+        artifact = self._artifact_path(key)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.utime(artifact)
+            self._materialize(artifact, output_path)
+        except FileNotFoundError:
+            # Never stored, or evicted by another thread since the lookup.
+            with self._lock:
+                self._misses += 1
+            return False
+        with self._lock:
+            self._hits += 1
+        return True
+
+    def store(self, key: str, produced_path: Path) -> None:
+        """Copy a freshly produced output into the store and evict if over the cap."""
+        artifact = self._artifact_path(key)
+        artifact.parent.mkdir(parents=True, exist_ok=True)
+        staging = artifact.with_name(f".{artifact.name}.{uuid.uuid4().hex}.tmp")
+        shutil.copyfile(produced_path, staging)
+        size = staging.stat().st_size
+        with self._lock:
+            if artifact.exists():
+                staging.unlink()
+                return
+            os.replace(staging, artifact)
+            self._size += size
+            self._stores += 1
+            self._evict_locked(keep=artifact)
+
+    def stats(self) -> ArtifactStoreStats:
+        with self._lock:
+            return ArtifactStoreStats(
+                hits=self._hits,
+                misses=self._misses,
+                stores=self._stores,
+                evictions=self._evictions,
+                size_bytes=self._size,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            for path, _, _ in self._entries():
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+    def _materialize(self, artifact: Path, output_path: Path) -> None:
+        staging = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}.tmp")
+        if self.use_hardlinks:
+            try:
+                os.link(artifact, staging)
+            except OSError:
+                shutil.copyfile(artifact, staging)
+        else:
+            shutil.copyfile(artifact, staging)
+        os.replace(staging, output_path)
+
+    def _evict_locked(self, keep: Path) -> None:
+        if self._size <= self.max_bytes:
+            return
+        for path, size, _ in sorted(self._entries(), key=lambda entry: entry[2]):
+            if self._size <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            self._size -= size
+            self._evictions += 1
+
+    def _entries(self) -> List[Tuple[Path, int, float]]:
+        entries = []
+        for path in self.root.glob("??/*"):
+            if path.name.startswith("."):
+                continue
+            stat = path.stat()
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _artifact_path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+
+def hash_files(paths: Iterable[Path], extra: Iterable[str] = ()) -> str:
+    """SHA-256 over the given strings and the contents of ``paths``, in order."""
+    digest = hashlib.sha256()
+    for item in extra:
+        digest.update(hashlib.sha256(item.encode("utf-8")).digest())
+    for path in paths:
+        file_digest = hashlib.sha256()
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(_CHUNK_SIZE), b""):
+                file_digest.update(chunk)
+        digest.update(file_digest.digest())
+    return digest.hexdigest()
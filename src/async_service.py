@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, List, Optional, Sequence
+
+import pytesseract
+from PIL import Image, UnidentifiedImageError
+
+from conversion import LIBREOFFICE_MODES, ConversionError, ConversionRequest, remove_libreoffice_lock
+from ocr import OcrError, render_timeout, setup_tesseract
+from pipeline import PipelineJobInput
+from service import GlossaryJobInput, OcrJobInput, PptExtractJobInput, ServiceLayer
+from task_queue import TaskQueue, TaskStatus
+from watchdog import RETRIES, ProcessTimeout, kill_process_group, new_group_options, stage_timeout
+
+# Formats the tesseract CLI reads directly; others are decoded by Pillow on the queue.
+_TESSERACT_SUFFIXES = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".pnm", ".pbm", ".pgm", ".ppm"}
+_SOFFICE = "soffice"
+_PDFTOPPM = "pdftoppm"
+
+
+class AsyncServiceError(RuntimeError):
+    pass
+
+
+class AsyncServiceLayer:
+    """Awaitable counterparts of :class:`ServiceLayer`'s submit methods.
+
+    Each ``submit_*`` coroutine returns the job's result (usually the output
+    path) once it is done. OCR of images and PDFs and single Office-to-PDF
+    conversions run Tesseract, ``pdftoppm`` and ``soffice`` as asyncio
+    subprocesses, at most ``max_processes`` at a time, so one event loop can
+    keep hundreds of jobs in flight. Everything else goes to the wrapped
+    service's concurrent queue (by default one worker thread per CPU).
+
+    ``timeout`` is in seconds for the whole job. A timed-out or cancelled
+    job kills its subprocesses, or asks its queued task to stop at its next
+    progress report. Each subprocess is also bound by its stage's
+    ``watchdog.TIMEOUTS`` entry and retried per ``watchdog.RETRIES``, as in
+    the synchronous code. Subprocess jobs do not become queue tasks, so
+    they are not journaled and do not count against a memory budget.
+    """
+
+    def __init__(self, service: Optional[ServiceLayer] = None, max_processes: Optional[int] = None) -> None:
+        if service is None:
+            service = ServiceLayer(queue=TaskQueue(workers=os.cpu_count() or 1))
+        if not service.queue.concurrent:
+            raise ValueError("AsyncServiceLayer needs a ServiceLayer with a concurrent TaskQueue.")
+        self.service = service
+        self.max_processes = max_processes or os.cpu_count() or 1
+        self._process_slots: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncServiceLayer":
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.service.queue.shutdown)
+
+    async def submit_conversion(self, request: ConversionRequest, timeout: Optional[float] = None) -> Any:
+        if (
+            request.mode in LIBREOFFICE_MODES
+            and not request.batch
+            and self.service.libreoffice_pool is None
+            and self.service.artifact_store is None
+        ):
+            return await _with_timeout(self._convert_office(request), timeout)
+        return await _with_timeout(self._run_queued("conversion", request), timeout)
+
+    async def submit_ocr_image(self, request: OcrJobInput, timeout: Optional[float] = None) -> Path:
+        if request.input_path.suffix.lower() not in _TESSERACT_SUFFIXES:
+            return await _with_timeout(self._run_queued("ocr_image", request), timeout)
+        return await _with_timeout(self._ocr_image(request), timeout)
+
+    async def submit_ocr_pdf(self, request: OcrJobInput, timeout: Optional[float] = None) -> Path:
+        return await _with_timeout(self._ocr_pdf(request), timeout)
+
+    async def submit_glossary(self, request: GlossaryJobInput, timeout: Optional[float] = None) -> Path:
+        return await _with_timeout(self._run_queued("glossary", request), timeout)
+
+    async def submit_ppt_extract(self, request: PptExtractJobInput, timeout: Optional[float] = None) -> Path:
+        return await _with_timeout(self._run_queued("ppt_extract", request), timeout)
+
+    async def submit_pipeline(self, request: PipelineJobInput, timeout: Optional[float] = None) -> Path:
+        return await _with_timeout(self._run_queued("pipeline", request), timeout)
+
+    async def _run_queued(self, kind: str, job: object) -> Any:
+        record = self.service.submit_job(kind, job)
+        future = asyncio.wrap_future(self.service.queue.future(record.task_id))
+        try:
+            # Shielded so that cancelling the caller does not cancel the
+            # queue's own future, which other waiters may share.
+            finished = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            self.service.cancel(record.task_id)
+            raise
+        if finished.status != TaskStatus.COMPLETED:
+            raise AsyncServiceError(f"{finished.description} {finished.status.value}: {finished.error}")
+        return finished.result
+
+    async def _ocr_image(self, request: OcrJobInput) -> Path:
+        setup_tesseract()
+        if not request.input_path.exists():
+            raise OcrError(f"Input image not found: {request.input_path}")
+        text = await self._tesseract(request.input_path, request.language)
+        _write_text(request.output_path, text)
+        return request.output_path
+
+    async def _ocr_pdf(self, request: OcrJobInput) -> Path:
+        setup_tesseract()
+        if not request.input_path.exists():
+            raise OcrError(f"Input PDF not found: {request.input_path}")
+
+        # pdfinfo has a timeout of its own but blocks, so not on the loop.
+        timeout = await asyncio.get_running_loop().run_in_executor(None, render_timeout, request.input_path)
+        with tempfile.TemporaryDirectory(prefix="shfh-async-ocr-") as scratch:
+            prefix = Path(scratch) / "page"
+            await self._run_stage(
+                "poppler",
+                timeout,
+                [_PDFTOPPM, "-r", str(request.dpi), "-png", str(request.input_path), str(prefix)],
+                OcrError("Failed to render PDF pages. Ensure Poppler is installed and in PATH."),
+            )
+            # pdftoppm zero-pads page numbers to the width of the page count.
+            pages = sorted(Path(scratch).glob("page-*.png"), key=lambda path: int(path.stem.split("-")[-1]))
+            texts = await _gather_or_cancel(
+                [self._tesseract(page, request.language) for page in pages]
+            )
+        _write_text(request.output_path, "\n\n".join(texts))
+        return request.output_path
+
+    async def _convert_office(self, request: ConversionRequest) -> Path:
+        if len(request.input_paths) != 1:
+            raise ConversionError("LibreOffice conversions require exactly one input file.")
+        input_path = request.input_paths[0]
+        request.output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(prefix="shfh-async-soffice-") as scratch:
+            # A private profile per run lets many soffice processes work at once.
+            profile = (Path(scratch) / "profile").resolve().as_uri()
+            output_dir = Path(scratch) / "out"
+            timeout = stage_timeout("libreoffice", size_bytes=input_path.stat().st_size)
+            try:
+                await self._run_stage(
+                    "libreoffice",
+                    timeout,
+                    [
+                        _SOFFICE,
+                        f"-env:UserInstallation={profile}",
+                        "--headless",
+                        "--convert-to",
+                        "pdf",
+                        "--outdir",
+                        str(output_dir),
+                        str(input_path),
+                    ],
+                    ConversionError(
+                        "LibreOffice not found. Install LibreOffice and ensure 'soffice' is on PATH."
+                    ),
+                )
+            except ConversionError as exc:
+                if isinstance(exc.__cause__, ProcessTimeout):
+                    remove_libreoffice_lock(input_path)
+                raise
+            produced = output_dir / input_path.with_suffix(".pdf").name
+            if not produced.exists():
+                raise ConversionError("LibreOffice did not create the expected output file.")
+            shutil.move(str(produced), str(request.output_path))
+        return request.output_path
+
+    async def _tesseract(self, image_path: Path, language: str) -> str:
+        output = await self._run_stage(
+            "tesseract",
+            stage_timeout("tesseract", size_bytes=_decoded_size(image_path)),
+            [pytesseract.pytesseract.tesseract_cmd, str(image_path), "stdout", "-l", language],
+            OcrError("Tesseract not found. Install Tesseract or set TESSERACT_CMD."),
+        )
+        return output.decode("utf-8", errors="replace")
+
+    async def _run_stage(self, stage: str, timeout: float, command: Sequence[str], not_found: Exception) -> bytes:
+        """Run ``command`` under ``stage``'s retry policy; a timeout becomes ``not_found``'s type."""
+        try:
+            return await RETRIES[stage].run_async(lambda: self._run_process(command, not_found, stage, timeout))
+        except ProcessTimeout as exc:
+            raise type(not_found)(f"{Path(command[0]).name} failed: {exc}") from exc
+
+    async def _run_process(self, command: Sequence[str], not_found: Exception, stage: str, timeout: float) -> bytes:
+        """:func:`watchdog.run_process` for the event loop; returns the command's stdout.
+
+        The command's process group is killed when it runs past ``timeout``
+        (raising :class:`ProcessTimeout`) or the caller is cancelled.
+        """
+        if self._process_slots is None:
+            self._process_slots = asyncio.Semaphore(self.max_processes)
+        async with self._process_slots:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    **new_group_options(),
+                )
+            except FileNotFoundError as exc:
+                raise not_found from exc
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError as exc:
+                kill_process_group(process)
+                await process.wait()
+                raise ProcessTimeout(stage, timeout, " ".join(command[:2])) from exc
+            except BaseException:
+                kill_process_group(process)
+                await process.wait()
+                raise
+        if process.returncode != 0:
+            message = stderr.decode("utf-8", errors="replace").strip()
+            raise type(not_found)(f"{Path(command[0]).name} failed ({process.returncode}): {message}")
+        return stdout
+
+
+async def _with_timeout(job: Awaitable[Any], timeout: Optional[float]) -> Any:
+    if timeout is None:
+        return await job
+    return await asyncio.wait_for(job, timeout)
+
+
+async def _gather_or_cancel(jobs: List[Awaitable[Any]]) -> List[Any]:
+    """Like ``asyncio.gather`` but cancels the remaining jobs when one fails."""
+    tasks = [asyncio.ensure_future(job) for job in jobs]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def _decoded_size(image_path: Path) -> int:
+    """Bytes of the decoded image, which Tesseract's timeout is sized by."""
+    try:
+        with Image.open(image_path) as image:
+            return image.width * image.height * len(image.getbands())
+    except (OSError, UnidentifiedImageError):
+        return image_path.stat().st_size
+
+
+def _write_text(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
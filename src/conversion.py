@@ -1,17 +1,40 @@
 from __future__ import annotations
 
 import enum
+import multiprocessing
+import os
+import shutil
 import subprocess
-from dataclasses import dataclass
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from importlib import metadata
+from io import BytesIO
 from pathlib import Path
-from typing import Iterable, Sequence
+from typing import BinaryIO, Deque, Iterable, List, Optional, Sequence, Tuple, Union
 
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 from pdf2docx import Converter
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+from pdf2image.exceptions import PDFPopplerTimeoutError
 from pptx import Presentation
 from pptx.util import Inches
 
+from artifact_store import ArtifactStore, hash_files
+from libreoffice_pool import LibreOfficePool, LibreOfficePoolError
+from metrics import span
+from pdf_writer import (
+    PdfImage,
+    StreamingPdfWriter,
+    encode_image,
+    encode_image_file,
+    load_embeddable_image,
+)
+from progress import ProgressCallback, report
+from watchdog import RETRIES, ProcessTimeout, kill_process_group, run_process, stage_timeout
+
 
 class ConversionMode(str, enum.Enum):
     PPTX_TO_PDF = "pptx_to_pdf"
@@ -22,43 +45,324 @@ class ConversionMode(str, enum.Enum):
     IMAGES_TO_PDF = "images_to_pdf"
 
 
+# Bump when a code change alters the bytes a conversion produces, so cached
+# artifacts from older versions are not reused.
+CONVERTER_VERSION = "2"
+
+# Keep a single soffice command line well below the Windows 32767-char limit.
+_MAX_COMMAND_CHARS = 8000
+
+# Conversions done by soffice; these are also the ones that can run as a batch.
+LIBREOFFICE_MODES = frozenset({ConversionMode.PPTX_TO_PDF, ConversionMode.DOCX_TO_PDF})
+_BATCH_MODES = LIBREOFFICE_MODES
+
+_MODE_PACKAGES = {
+    ConversionMode.PDF_TO_DOCX: ("pdf2docx", "PyMuPDF"),
+    ConversionMode.PDF_TO_PPTX: ("pdf2image", "python-pptx", "Pillow"),
+    ConversionMode.IMAGE_TO_PDF: ("Pillow",),
+    ConversionMode.IMAGES_TO_PDF: ("Pillow",),
+}
+
+
+class ImageEncoding(str, enum.Enum):
+    PNG = "png"
+    JPEG = "jpeg"
+    AUTO = "auto"
+
+
+_JPEG_QUALITY = 85
+_DOCX_PARALLEL_MIN_PAGES = 8
+# How often a waiting parent checks its pdf2docx child for cancellation and timeout.
+_CHILD_POLL_SECONDS = 0.5
+# Pages whose sampled pixels use at most this many colours are kept as PNG.
+_LINE_ART_MAX_COLORS = 1024
+
+
+@dataclass(frozen=True)
+class ImagePdfProfile:
+    """Output settings for IMAGE_TO_PDF / IMAGES_TO_PDF.
+
+    ``dpi`` is the maximum output resolution (images are never upsampled;
+    ``None`` keeps every pixel), ``color`` is ``rgb``, ``gray`` or ``bilevel``
+    and ``compression`` is ``flate``, ``jpeg`` or ``ccitt``.
+    """
+
+    name: str
+    dpi: Optional[int]
+    color: str
+    compression: str
+    jpeg_quality: int = 85
+
+
+IMAGE_PDF_PROFILES = {
+    profile.name: profile
+    for profile in (
+        ImagePdfProfile("archive", dpi=None, color="rgb", compression="flate"),
+        ImagePdfProfile("email", dpi=150, color="rgb", compression="jpeg", jpeg_quality=70),
+        ImagePdfProfile("ocr-ready", dpi=300, color="gray", compression="flate"),
+        ImagePdfProfile("bw-document", dpi=300, color="bilevel", compression="ccitt"),
+    )
+}
+
+# Image data plus optional page width/height in points.
+_PdfPage = Tuple[PdfImage, Optional[float], Optional[float]]
+
+_A4_LONG_EDGE_INCHES = 11.69
+
+
 @dataclass(frozen=True)
 class ConversionRequest:
+    """A conversion job.
+
+    With ``batch=True`` (PPTX_TO_PDF / DOCX_TO_PDF only) every input is
+    converted independently: ``output_path`` is the output directory and
+    ``output_paths`` optionally names the target of each input explicitly.
+
+    ``dpi`` and ``image_encoding`` control how PDF_TO_PPTX renders slides.
+    ``first_page``/``last_page`` (1-based, inclusive) limit PDF_TO_PPTX and
+    PDF_TO_DOCX to a page range, and ``workers`` caps their parallelism
+    (defaults to the CPU count). ``image_profile`` names an entry of
+    ``IMAGE_PDF_PROFILES`` for IMAGE_TO_PDF / IMAGES_TO_PDF.
+    """
+
     mode: ConversionMode
     input_paths: Sequence[Path]
     output_path: Path
+    batch: bool = False
+    output_paths: Sequence[Path] = ()
+    dpi: int = 200
+    image_encoding: ImageEncoding = ImageEncoding.AUTO
+    workers: Optional[int] = None
+    first_page: Optional[int] = None
+    last_page: Optional[int] = None
+    image_profile: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ConversionItemResult:
+    input_path: Path
+    output_path: Path
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class ConversionError(RuntimeError):
     pass
 
 
-def convert(request: ConversionRequest) -> Path:
+def convert(
+    request: ConversionRequest,
+    *,
+    libreoffice_pool: Optional[LibreOfficePool] = None,
+    artifact_store: Optional[ArtifactStore] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Path:
     """Run a conversion based on the selected mode.
 
     The conversion relies on LibreOffice for Office <-> PDF transforms and
-    Pillow for image-to-PDF conversions.
+    a streaming PDF writer (with Pillow for decoding) for image-to-PDF
+    conversions. When ``libreoffice_pool`` is given, Office documents are
+    converted by its warm instances instead of a fresh ``soffice`` process.
+    When ``artifact_store`` is given, a previous output for the same input
+    bytes, mode and options is reused instead of converting again.
+
+    Batch requests raise if any item failed; use :func:`convert_batch` to get
+    per-file results instead. ``progress`` receives per-page events from
+    PDF_TO_PPTX.
     """
-    if request.mode in {
-        ConversionMode.PPTX_TO_PDF,
-        ConversionMode.DOCX_TO_PDF,
-    }:
-        _convert_with_libreoffice(request)
+    if request.batch:
+        results = convert_batch(
+            request, libreoffice_pool=libreoffice_pool, artifact_store=artifact_store
+        )
+        failures = [item for item in results if not item.ok]
+        if failures:
+            details = "; ".join(f"{item.input_path.name}: {item.error}" for item in failures)
+            raise ConversionError(f"{len(failures)} batch conversion(s) failed: {details}")
+        return request.output_path
+
+    key = None
+    if artifact_store is not None:
+        with span("conversion.artifact_fetch"):
+            key = _artifact_key(request)
+            if artifact_store.fetch(key, request.output_path):
+                return request.output_path
+
+    if request.mode in LIBREOFFICE_MODES:
+        _convert_with_libreoffice(request, libreoffice_pool)
     elif request.mode == ConversionMode.PDF_TO_DOCX:
-        _convert_pdf_to_docx(request)
+        _convert_pdf_to_docx(request, progress)
     elif request.mode == ConversionMode.PDF_TO_PPTX:
-        _convert_pdf_to_pptx(request)
+        _convert_pdf_to_pptx(request, progress)
     elif request.mode == ConversionMode.IMAGE_TO_PDF:
-        _convert_single_image_to_pdf(request.input_paths, request.output_path)
+        _convert_single_image_to_pdf(
+            request.input_paths, request.output_path, _image_pdf_profile(request.image_profile)
+        )
     elif request.mode == ConversionMode.IMAGES_TO_PDF:
-        _convert_multiple_images_to_pdf(request.input_paths, request.output_path)
+        _convert_multiple_images_to_pdf(
+            request.input_paths, request.output_path, _image_pdf_profile(request.image_profile)
+        )
     else:
         raise ConversionError(f"Unsupported conversion mode: {request.mode}")
 
+    if artifact_store is not None and key is not None:
+        with span("conversion.artifact_store"):
+            artifact_store.store(key, request.output_path)
     return request.output_path
 
 
-def _convert_with_libreoffice(request: ConversionRequest) -> None:
+def convert_batch(
+    request: ConversionRequest,
+    *,
+    libreoffice_pool: Optional[LibreOfficePool] = None,
+    artifact_store: Optional[ArtifactStore] = None,
+) -> List[ConversionItemResult]:
+    """Convert many Office documents to PDF, reporting each file separately.
+
+    Without a pool, inputs are passed to as few ``soffice`` runs as the
+    command-line length allows instead of one process per file. Items found
+    in ``artifact_store`` are not converted at all.
+    """
+    if request.mode not in _BATCH_MODES:
+        raise ConversionError(f"Batch conversion is not supported for mode: {request.mode}")
+    targets = _batch_targets(request)
+    for target in targets:
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+    results: dict[int, ConversionItemResult] = {}
+    keys: dict[int, str] = {}
+    pending: List[int] = []
+    for index, (input_path, target) in enumerate(zip(request.input_paths, targets)):
+        if artifact_store is not None:
+            keys[index] = _artifact_key(replace(request, input_paths=[input_path], batch=False))
+            if artifact_store.fetch(keys[index], target):
+                results[index] = ConversionItemResult(input_path, target)
+                continue
+        pending.append(index)
+
+    items = [(request.input_paths[index], targets[index]) for index in pending]
+    if libreoffice_pool is not None:
+        errors = libreoffice_pool.convert_many(items, _libreoffice_filter_name(request.mode))
+        converted = [
+            ConversionItemResult(input_path, target, str(error) if error else None)
+            for (input_path, target), error in zip(items, errors)
+        ]
+    else:
+        converted = []
+        for chunk in _chunk_batch(items):
+            converted.extend(_convert_libreoffice_chunk(chunk, request.mode))
+
+    for index, item in zip(pending, converted):
+        if artifact_store is not None and item.ok:
+            artifact_store.store(keys[index], item.output_path)
+        results[index] = item
+    return [results[index] for index in range(len(targets))]
+
+
+def _artifact_key(request: ConversionRequest) -> str:
+    """Key a conversion by input content, mode, output-affecting options and versions."""
+    options = [f"converter={CONVERTER_VERSION}", f"mode={request.mode.value}"]
+    if request.mode in {ConversionMode.PDF_TO_PPTX, ConversionMode.PDF_TO_DOCX}:
+        options += [f"first_page={request.first_page}", f"last_page={request.last_page}"]
+    if request.mode in {ConversionMode.IMAGE_TO_PDF, ConversionMode.IMAGES_TO_PDF}:
+        options.append(f"image_profile={request.image_profile}")
+    if request.mode == ConversionMode.PDF_TO_PPTX:
+        options += [f"dpi={request.dpi}", f"encoding={ImageEncoding(request.image_encoding).value}"]
+    for package in _MODE_PACKAGES.get(request.mode, ()):
+        try:
+            options.append(f"{package}={metadata.version(package)}")
+        except metadata.PackageNotFoundError:
+            options.append(f"{package}=unknown")
+    return hash_files(request.input_paths, options)
+
+
+def _batch_targets(request: ConversionRequest) -> List[Path]:
+    if not request.input_paths:
+        raise ConversionError("Batch conversion requires at least one input file.")
+    if request.output_paths:
+        if len(request.output_paths) != len(request.input_paths):
+            raise ConversionError("Batch conversion needs one output path per input file.")
+        return list(request.output_paths)
+
+    suffix = f".{_libreoffice_target_format(request.mode)}"
+    return [request.output_path / path.with_suffix(suffix).name for path in request.input_paths]
+
+
+def _chunk_batch(items: List[tuple[Path, Path]]) -> List[List[tuple[Path, Path]]]:
+    """Split a batch so every chunk fits one command line and has unique stems.
+
+    soffice names each output after its input stem, so two inputs with the
+    same stem cannot share an output directory.
+    """
+    chunks: List[List[tuple[Path, Path]]] = []
+    current: List[tuple[Path, Path]] = []
+    stems: set[str] = set()
+    length = 0
+    for item in items:
+        stem = item[0].stem.lower()
+        cost = len(str(item[0])) + 3
+        if current and (stem in stems or length + cost > _MAX_COMMAND_CHARS):
+            chunks.append(current)
+            current, stems, length = [], set(), 0
+        current.append(item)
+        stems.add(stem)
+        length += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _convert_libreoffice_chunk(
+    chunk: List[tuple[Path, Path]], mode: ConversionMode
+) -> List[ConversionItemResult]:
+    target_format = _libreoffice_target_format(mode)
+    with tempfile.TemporaryDirectory(prefix="shfh-batch-") as scratch:
+        scratch_dir = Path(scratch)
+        command = [
+            _libreoffice_executable(),
+            "--headless",
+            "--convert-to",
+            target_format,
+            "--outdir",
+            str(scratch_dir),
+            *(str(input_path) for input_path, _ in chunk),
+        ]
+
+        timeout = stage_timeout(
+            "libreoffice",
+            files=len(chunk),
+            size_bytes=sum(input_path.stat().st_size for input_path, _ in chunk),
+        )
+        run_error: Optional[str] = None
+        try:
+            with span("conversion.libreoffice"):
+                RETRIES["libreoffice"].run(lambda: run_process(command, timeout, "libreoffice"))
+        except FileNotFoundError:
+            run_error = "LibreOffice not found. Install LibreOffice and ensure 'soffice' is on PATH."
+        except subprocess.CalledProcessError as exc:
+            run_error = f"LibreOffice conversion failed: {exc.stderr or exc.stdout}"
+        except ProcessTimeout as exc:
+            run_error = str(exc)
+            for input_path, _ in chunk:
+                remove_libreoffice_lock(input_path)
+
+        results: List[ConversionItemResult] = []
+        for input_path, target in chunk:
+            produced = scratch_dir / input_path.with_suffix(f".{target_format}").name
+            if produced.exists():
+                shutil.move(str(produced), str(target))
+                results.append(ConversionItemResult(input_path, target))
+            else:
+                error = run_error or "LibreOffice did not create the expected output file."
+                results.append(ConversionItemResult(input_path, target, error))
+        return results
+
+
+def _convert_with_libreoffice(
+    request: ConversionRequest, pool: Optional[LibreOfficePool] = None
+) -> None:
     if len(request.input_paths) != 1:
         raise ConversionError("LibreOffice conversions require exactly one input file.")
 
@@ -66,6 +370,14 @@ def _convert_with_libreoffice(request: ConversionRequest) -> None:
     output_dir = request.output_path.parent
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    if pool is not None:
+        try:
+            with span("conversion.libreoffice"):
+                pool.convert(input_path, request.output_path, _libreoffice_filter_name(request.mode))
+        except LibreOfficePoolError as exc:
+            raise ConversionError(str(exc)) from exc
+        return
+
     target_format = _libreoffice_target_format(request.mode)
     command = [
         _libreoffice_executable(),
@@ -77,8 +389,11 @@ def _convert_with_libreoffice(request: ConversionRequest) -> None:
         str(input_path),
     ]
 
+    produced = output_dir / input_path.with_suffix(f".{target_format}").name
+    timeout = stage_timeout("libreoffice", size_bytes=input_path.stat().st_size)
     try:
-        subprocess.run(command, check=True, capture_output=True, text=True)
+        with span("conversion.libreoffice"):
+            RETRIES["libreoffice"].run(lambda: run_process(command, timeout, "libreoffice"))
     except FileNotFoundError as exc:
         raise ConversionError(
             "LibreOffice not found. Install LibreOffice and ensure 'soffice' is on PATH."
@@ -87,8 +402,12 @@ def _convert_with_libreoffice(request: ConversionRequest) -> None:
         raise ConversionError(
             f"LibreOffice conversion failed: {exc.stderr or exc.stdout}"
         ) from exc
+    except ProcessTimeout as exc:
+        # Do not leave a half-written PDF or a stale document lock behind.
+        produced.unlink(missing_ok=True)
+        remove_libreoffice_lock(input_path)
+        raise ConversionError(f"LibreOffice conversion failed: {exc}") from exc
 
-    produced = output_dir / input_path.with_suffix(f".{target_format}").name
     if not produced.exists():
         raise ConversionError("LibreOffice did not create the expected output file.")
 
@@ -96,6 +415,11 @@ def _convert_with_libreoffice(request: ConversionRequest) -> None:
         produced.replace(request.output_path)
 
 
+def remove_libreoffice_lock(input_path: Path) -> None:
+    """Delete the ``.~lock.<name>#`` file a killed soffice leaves next to its input."""
+    input_path.with_name(f".~lock.{input_path.name}#").unlink(missing_ok=True)
+
+
 def _libreoffice_target_format(mode: ConversionMode) -> str:
     mapping = {
         ConversionMode.PPTX_TO_PDF: "pdf",
@@ -107,39 +431,149 @@ def _libreoffice_target_format(mode: ConversionMode) -> str:
         raise ConversionError(f"Unsupported LibreOffice conversion mode: {mode}") from exc
 
 
+def _libreoffice_filter_name(mode: ConversionMode) -> str:
+    mapping = {
+        ConversionMode.PPTX_TO_PDF: "impress_pdf_Export",
+        ConversionMode.DOCX_TO_PDF: "writer_pdf_Export",
+    }
+    try:
+        return mapping[mode]
+    except KeyError as exc:
+        raise ConversionError(f"Unsupported LibreOffice conversion mode: {mode}") from exc
+
+
 def _libreoffice_executable() -> str:
     return "soffice"
 
 
-def _convert_single_image_to_pdf(input_paths: Sequence[Path], output_path: Path) -> None:
+def _convert_single_image_to_pdf(
+    input_paths: Sequence[Path], output_path: Path, profile: Optional[ImagePdfProfile] = None
+) -> None:
     if len(input_paths) != 1:
         raise ConversionError("Image-to-PDF conversion requires exactly one image.")
 
-    image_path = input_paths[0]
     output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with Image.open(image_path) as image:
-        rgb = image.convert("RGB")
-        rgb.save(output_path, format="PDF")
+    _write_images_to_pdf(list(input_paths), output_path, profile)
 
 
-def _convert_multiple_images_to_pdf(input_paths: Iterable[Path], output_path: Path) -> None:
+def _convert_multiple_images_to_pdf(
+    input_paths: Iterable[Path], output_path: Path, profile: Optional[ImagePdfProfile] = None
+) -> None:
     image_paths = list(input_paths)
     if len(image_paths) < 2:
         raise ConversionError("Multi-image PDF conversion requires at least two images.")
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    _write_images_to_pdf(image_paths, output_path, profile)
 
-    images = []
-    for path in image_paths:
-        with Image.open(path) as image:
-            images.append(image.convert("RGB"))
 
-    cover, *rest = images
-    cover.save(output_path, format="PDF", save_all=True, append_images=rest)
+def _write_images_to_pdf(
+    image_paths: List[Path], output_path: Path, profile: Optional[ImagePdfProfile] = None
+) -> None:
+    """Stream images into a PDF, one page each, in input order.
 
+    Without a profile, JPEGs and plain PNGs are embedded without decoding.
+    Other images (and every image under a profile) are decoded on a thread
+    pool; at most a small window of pages is held in memory at once, whatever
+    the number of images.
+    """
+    workers = max(1, min(len(image_paths), os.cpu_count() or 1))
+    window: Deque[Union[_PdfPage, Future]] = deque()
+    with span("conversion.images_to_pdf"), ThreadPoolExecutor(max_workers=workers) as executor:
+        with StreamingPdfWriter(output_path) as writer:
+            for path in image_paths:
+                window.append(_prepare_pdf_page(path, executor, profile))
+                if len(window) > workers * 2:
+                    writer.add_image_page(*_resolve_pdf_page(window.popleft()))
+            while window:
+                writer.add_image_page(*_resolve_pdf_page(window.popleft()))
+
+
+def _prepare_pdf_page(
+    path: Path, executor: ThreadPoolExecutor, profile: Optional[ImagePdfProfile]
+) -> Union[_PdfPage, Future]:
+    if profile is not None:
+        return executor.submit(_encode_with_profile, path, profile)
+    try:
+        embedded = load_embeddable_image(path)
+    except (OSError, UnidentifiedImageError) as exc:
+        raise ConversionError(f"Failed to read image: {path}") from exc
+    if embedded is not None:
+        return (embedded, None, None)
+    return executor.submit(lambda: (encode_image_file(path), None, None))
 
-def _convert_pdf_to_docx(request: ConversionRequest) -> None:
+
+def _resolve_pdf_page(item: Union[_PdfPage, Future]) -> _PdfPage:
+    if not isinstance(item, Future):
+        return item
+    try:
+        return item.result()
+    except (OSError, UnidentifiedImageError) as exc:
+        raise ConversionError(f"Failed to decode image: {exc}") from exc
+
+
+def _encode_with_profile(path: Path, profile: ImagePdfProfile) -> _PdfPage:
+    """Resample and re-encode one image per ``profile``; page size follows its DPI."""
+    with Image.open(path) as image:
+        image.load()
+        source_dpi = _source_dpi(image)
+        page_width = image.width / source_dpi * 72
+        page_height = image.height / source_dpi * 72
+
+        if profile.dpi is not None and profile.dpi < source_dpi:
+            scale = profile.dpi / source_dpi
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            # reducing_gap lets Pillow box-reduce by an integer factor in C
+            # before the final Lanczos pass, which is much faster on big scans.
+            image = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        if profile.color == "bilevel":
+            gray = image.convert("L")
+            threshold = _otsu_threshold(gray.histogram())
+            image = gray.point(lambda value: 255 if value > threshold else 0, mode="1")
+        elif profile.color == "gray":
+            image = image.convert("L")
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        encoded = encode_image(image, profile.compression, profile.jpeg_quality)
+    return (encoded, page_width, page_height)
+
+
+def _source_dpi(image: Image.Image) -> float:
+    """The image's resolution, guessing A4 when metadata is missing or implausible."""
+    dpi = image.info.get("dpi")
+    if dpi and float(dpi[0]) >= 100:
+        return float(dpi[0])
+    return max(image.width, image.height) / _A4_LONG_EDGE_INCHES
+
+
+def _otsu_threshold(histogram: List[int]) -> int:
+    """Otsu's global threshold from a 256-bin grayscale histogram."""
+    total = sum(histogram)
+    weighted_total = sum(index * count for index, count in enumerate(histogram))
+    background = 0
+    background_sum = 0.0
+    best_threshold = 127
+    best_variance = 0.0
+    for index, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        background_sum += index * count
+        mean_background = background_sum / background
+        mean_foreground = (weighted_total - background_sum) / foreground
+        variance = background * foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_variance = variance
+            best_threshold = index
+    return best_threshold
+
+
+def _convert_pdf_to_docx(request: ConversionRequest, progress: Optional[ProgressCallback] = None) -> None:
     if len(request.input_paths) != 1:
         raise ConversionError("PDF-to-DOCX conversion requires exactly one input file.")
 
@@ -149,14 +583,113 @@ def _convert_pdf_to_docx(request: ConversionRequest) -> None:
 
     converter = Converter(str(input_path))
     try:
-        converter.convert(str(output_path), start=0)
+        first_page, last_page = _page_range(request, len(converter.fitz_doc))
+        page_total = last_page - first_page + 1
+        workers = _worker_count(request.workers, page_total)
+        # pdf2docx re-opens the PDF in every worker process, which only pays
+        # off for longer documents.
+        parallel = workers > 1 and page_total >= _DOCX_PARALLEL_MIN_PAGES
+        if not parallel:
+            # pdf2docx counts pages from zero and treats ``end`` as exclusive.
+            with span("conversion.pdf2docx"):
+                converter.convert(str(output_path), start=first_page - 1, end=last_page)
+    except ConversionError:
+        raise
     except Exception as exc:  # noqa: BLE001
         raise ConversionError(f"PDF-to-DOCX conversion failed: {exc}") from exc
     finally:
         converter.close()
+    if parallel:
+        timeout = stage_timeout("pdf2docx", pages=page_total, size_bytes=input_path.stat().st_size)
+        try:
+            with span("conversion.pdf2docx"):
+                RETRIES["pdf2docx"].run(
+                    lambda: _convert_pdf_to_docx_in_child(
+                        input_path, output_path, first_page - 1, last_page, workers, timeout, progress
+                    )
+                )
+        except ProcessTimeout as exc:
+            raise ConversionError(f"PDF-to-DOCX conversion failed: {exc}") from exc
+
+
+def _convert_pdf_to_docx_in_child(
+    input_path: Path,
+    output_path: Path,
+    start: int,
+    end: int,
+    workers: int,
+    timeout: float,
+    progress: Optional[ProgressCallback] = None,
+) -> None:
+    """Run pdf2docx's multi-processing mode in a child process with a private working directory.
+
+    That mode hands pages between its processes through ``pages-<n>.json``
+    files relative to the working directory, so two conversions sharing one
+    (concurrent tasks in this process) would mix up their pages, and an
+    unwritable one (an installed app) fails outright.
+
+    The child and its pool are killed when ``timeout`` runs out
+    (:class:`ProcessTimeout`) or when a ``progress`` report raises, which is
+    how a cancelled task stops.
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    deadline = time.monotonic() + timeout
+    with tempfile.TemporaryDirectory(prefix="pdf2docx-") as work_dir:
+        process = context.Process(
+            target=_pdf2docx_worker,
+            args=(sender, work_dir, str(input_path.resolve()), str(output_path.resolve())),
+            kwargs={"start": start, "end": end, "workers": workers},
+            name="pdf2docx",
+        )
+        process.start()
+        sender.close()
+        try:
+            # Also returns once the child has died without answering.
+            while not receiver.poll(_CHILD_POLL_SECONDS):
+                report(progress, "pdf2docx", 0, 1, input_path.name)
+                if time.monotonic() >= deadline:
+                    raise ProcessTimeout("pdf2docx", timeout, input_path.name)
+            try:
+                error = receiver.recv()
+            except EOFError:
+                process.join(max(0.0, deadline - time.monotonic()))
+                error = f"the worker process exited with code {process.exitcode}"
+            process.join(max(0.0, deadline - time.monotonic()))
+        finally:
+            if process.is_alive():
+                kill_process_group(process)
+                process.join()
+            receiver.close()
+    if error is not None:
+        raise ConversionError(f"PDF-to-DOCX conversion failed: {error}")
+    report(progress, "pdf2docx", 1, 1, input_path.name)
+
+
+def _pdf2docx_worker(
+    connection, work_dir: str, input_path: str, output_path: str, start: int, end: int, workers: int
+) -> None:
+    if os.name == "posix":
+        # Lead a process group, so that killing it also stops pdf2docx's pool.
+        os.setsid()
+    try:
+        os.chdir(work_dir)
+        converter = Converter(input_path)
+        try:
+            converter.convert(output_path, start=start, end=end, multi_processing=True, cpu_count=workers)
+        finally:
+            converter.close()
+    except Exception as exc:  # noqa: BLE001
+        connection.send(str(exc))
+    else:
+        connection.send(None)
+    finally:
+        connection.close()
 
 
-def _convert_pdf_to_pptx(request: ConversionRequest) -> None:
+def _convert_pdf_to_pptx(
+    request: ConversionRequest, progress: Optional[ProgressCallback] = None
+) -> None:
     if len(request.input_paths) != 1:
         raise ConversionError("PDF-to-PPTX conversion requires exactly one input file.")
 
@@ -165,30 +698,149 @@ def _convert_pdf_to_pptx(request: ConversionRequest) -> None:
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     try:
-        images = convert_from_path(str(input_path), dpi=200)
+        page_count = int(
+            pdfinfo_from_path(str(input_path), timeout=stage_timeout("poppler"))["Pages"]
+        )
     except Exception as exc:  # noqa: BLE001
         raise ConversionError(
-            "PDF-to-PPTX conversion failed while rendering pages. Ensure Poppler is installed."
+            "PDF-to-PPTX conversion failed while reading the PDF. Ensure Poppler is installed."
         ) from exc
+    first_page, last_page = _page_range(request, page_count)
 
     presentation = Presentation()
     blank_layout = presentation.slide_layouts[6]
-    for image in images:
+    slide_width = presentation.slide_width
+    slide_height = presentation.slide_height
+
+    # Each worker renders and encodes one page; only ``workers * 2`` encoded
+    # pages are waiting at any time, so memory does not grow with page count.
+    total = last_page - first_page + 1
+    workers = _worker_count(request.workers, total)
+    window: Deque[Future] = deque()
+    report(progress, "pages", 0, total)
+
+    def add_slide(future: Future) -> None:
+        try:
+            image_stream = future.result()
+        except ConversionError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            raise ConversionError(
+                "PDF-to-PPTX conversion failed while rendering pages. Ensure Poppler is installed."
+            ) from exc
         slide = presentation.slides.add_slide(blank_layout)
-        width, height = image.size
-        slide_width = presentation.slide_width
-        slide_height = presentation.slide_height
-        image_stream = _image_to_stream(image)
         slide.shapes.add_picture(image_stream, Inches(0), Inches(0), slide_width, slide_height)
         image_stream.close()
+        report(progress, "pages", len(presentation.slides), total)
+
+    with span("conversion.render_pages"), ThreadPoolExecutor(max_workers=workers) as executor:
+        for page_number in range(first_page, last_page + 1):
+            window.append(
+                executor.submit(
+                    _render_page_stream,
+                    input_path,
+                    page_number,
+                    request.dpi,
+                    ImageEncoding(request.image_encoding),
+                )
+            )
+            if len(window) >= workers * 2:
+                add_slide(window.popleft())
+        while window:
+            add_slide(window.popleft())
+
+    with span("conversion.pptx_save"):
+        presentation.save(str(output_path))
+
+
+def images_to_pptx(
+    images: Iterable[Image.Image],
+    output: Union[Path, BinaryIO],
+    image_encoding: ImageEncoding = ImageEncoding.AUTO,
+) -> None:
+    """Write one full-slide picture per image, e.g. pages rasterized in memory."""
+    presentation = Presentation()
+    blank_layout = presentation.slide_layouts[6]
+    for image in images:
+        slide = presentation.slides.add_slide(blank_layout)
+        image_stream = _image_to_stream(image, ImageEncoding(image_encoding))
+        slide.shapes.add_picture(
+            image_stream, Inches(0), Inches(0), presentation.slide_width, presentation.slide_height
+        )
+        image_stream.close()
+    presentation.save(str(output) if isinstance(output, Path) else output)
+
 
-    presentation.save(str(output_path))
+def _render_page_stream(
+    input_path: Path, page_number: int, dpi: int, encoding: ImageEncoding
+) -> BytesIO:
+    timeout = stage_timeout("poppler", pages=1)
+    try:
+        images = RETRIES["poppler"].run(
+            lambda: _render_page(input_path, page_number, dpi, timeout)
+        )
+    except ProcessTimeout as exc:
+        raise ConversionError(f"Rendering page {page_number} failed: {exc}") from exc
+    if not images:
+        raise ConversionError(f"Poppler rendered no image for page {page_number}.")
+    return _image_to_stream(images[0], encoding)
 
 
-def _image_to_stream(image: Image.Image):
-    from io import BytesIO
+def _render_page(input_path: Path, page_number: int, dpi: int, timeout: float) -> List[Image.Image]:
+    try:
+        return convert_from_path(
+            str(input_path),
+            dpi=dpi,
+            first_page=page_number,
+            last_page=page_number,
+            timeout=timeout,
+        )
+    except PDFPopplerTimeoutError as exc:
+        raise ProcessTimeout("poppler", timeout, f"page {page_number}") from exc
+
+
+def _image_to_stream(image: Image.Image, encoding: ImageEncoding = ImageEncoding.PNG) -> BytesIO:
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    if encoding == ImageEncoding.AUTO:
+        encoding = ImageEncoding.PNG if _looks_like_line_art(image) else ImageEncoding.JPEG
 
     stream = BytesIO()
-    image.convert("RGB").save(stream, format="PNG")
+    if encoding == ImageEncoding.JPEG:
+        image.save(stream, format="JPEG", quality=_JPEG_QUALITY)
+    else:
+        image.save(stream, format="PNG")
     stream.seek(0)
-    return stream
\ No newline at end of file
+    return stream
+
+
+def _looks_like_line_art(image: Image.Image) -> bool:
+    """Guess whether a page is text/diagrams (PNG-friendly) rather than a photo."""
+    sample = image.resize((128, 128), Image.Resampling.NEAREST)
+    return sample.getcolors(maxcolors=_LINE_ART_MAX_COLORS) is not None
+
+
+def _image_pdf_profile(name: Optional[str]) -> Optional[ImagePdfProfile]:
+    if name is None:
+        return None
+    try:
+        return IMAGE_PDF_PROFILES[name]
+    except KeyError as exc:
+        choices = ", ".join(sorted(IMAGE_PDF_PROFILES))
+        raise ConversionError(f"Unknown image PDF profile '{name}'. Choose one of: {choices}") from exc
+
+
+def _page_range(request: ConversionRequest, page_count: int) -> tuple[int, int]:
+    """Resolve the request's 1-based, inclusive page range against the document."""
+    first_page = request.first_page or 1
+    last_page = min(request.last_page or page_count, page_count)
+    if first_page < 1 or first_page > last_page:
+        raise ConversionError(
+            f"Invalid page range {first_page}-{request.last_page or page_count} for a {page_count}-page PDF."
+        )
+    return first_page, last_page
+
+
+def _worker_count(requested: Optional[int], items: int) -> int:
+    workers = requested if requested is not None else (os.cpu_count() or 1)
+    return max(1, min(workers, items))
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import json
 import re
 from collections import defaultdict
 from dataclasses import dataclass
 from typing import Iterable, List, Sequence
 
+from metrics import span
+
 SENTENCE_SPLIT_RE = re.compile(r"[.!?。！？\n]+")
 TOKEN_RE = re.compile(r"[\w\u4e00-\u9fff]+", re.UNICODE)
 
@@ -95,6 +98,12 @@ class GlossaryEntry:
 class GlossaryResult:
     entries: List[GlossaryEntry]
 
+    def to_text(self, output_format: str = "txt") -> str:
+        if output_format == "json":
+            payload = [entry.__dict__ for entry in self.entries]
+            return json.dumps(payload, ensure_ascii=False, indent=2)
+        return "\n".join(f"{entry.term}\t{entry.score:.4f}" for entry in self.entries)
+
 
 class GlossaryError(RuntimeError):
     pass
@@ -105,21 +114,24 @@ def generate_glossary(request: GlossaryRequest) -> GlossaryResult:
         raise GlossaryError("Glossary generation requires at least one text input.")
 
     stopwords = _build_stopwords(request.stopwords)
-    sentences = _split_sentences("\n".join(request.texts))
-    tokenized = [_tokenize(sentence, stopwords) for sentence in sentences]
+    with span("glossary.tokenize"):
+        sentences = _split_sentences("\n".join(request.texts))
+        tokenized = [_tokenize(sentence, stopwords) for sentence in sentences]
 
-    graph = _build_graph(tokenized, request.window_size)
+    with span("glossary.graph"):
+        graph = _build_graph(tokenized, request.window_size)
     if not graph:
         return GlossaryResult(entries=[])
 
-    scores = _pagerank(graph)
-    phrases = _extract_phrases(sentences, scores, stopwords, request.min_term_length)
-
-    ranked = sorted(
-        (GlossaryEntry(term=term, score=score) for term, score in phrases.items()),
-        key=lambda entry: entry.score,
-        reverse=True,
-    )
+    with span("glossary.pagerank"):
+        scores = _pagerank(graph)
+    with span("glossary.phrases"):
+        phrases = _extract_phrases(sentences, scores, stopwords, request.min_term_length)
+        ranked = sorted(
+            (GlossaryEntry(term=term, score=score) for term, score in phrases.items()),
+            key=lambda entry: entry.score,
+            reverse=True,
+        )
     return GlossaryResult(entries=ranked[: request.top_k])
 
 
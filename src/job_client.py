@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+DEFAULT_PORT = 8765
+TOKEN_HEADER = "X-Job-Token"
+# Long-poll length of each result request while waiting for a task.
+_POLL_SECONDS = 60.0
+# Requests carry the job token, so they never go through HTTP(S)_PROXY.
+_OPENER = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+class JobClientError(RuntimeError):
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def token_path(port: int = DEFAULT_PORT) -> Path:
+    """Where a job server started without ``--token`` keeps its generated token."""
+    return Path.home() / ".sh-file-helper" / f"job-server-{port}.token"
+
+
+def write_token(path: Path, token: str) -> None:
+    """Store ``token`` in a file only the current user can read."""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+        # The mode above only applies to new files.
+        os.chmod(path, 0o600)
+        handle.write(token)
+
+
+def read_token(url: str = DEFAULT_URL) -> Optional[str]:
+    """The token a local job server at ``url`` generated, if it left one."""
+    try:
+        port = urlsplit(url).port or DEFAULT_PORT
+        return token_path(port).read_text(encoding="utf-8").strip() or None
+    except (OSError, ValueError):
+        return None
+
+
+class JobClient:
+    """Submit jobs to a running job server and follow them.
+
+    Jobs are the plain JSON form produced by ``job_codec.encode_job``'s
+    ``job`` field, e.g. ``{"input_path": "scan.pdf", "output_path":
+    "scan.txt"}`` for ``ocr_pdf``. Relative paths are resolved against the
+    client's working directory.
+
+    Without ``token`` the client uses the one a local server generated for
+    itself (see :func:`token_path`).
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, token: Optional[str] = None, timeout: float = 30.0) -> None:
+        self.url = url.rstrip("/")
+        self.token = token if token is not None else read_token(self.url)
+        self.timeout = timeout
+
+    def submit(self, kind: str, job: Dict[str, Any], priority: int = 0) -> Dict[str, Any]:
+        """Queue a job and return its task."""
+        body = {"kind": kind, "job": job, "priority": priority, "cwd": os.getcwd()}
+        return self._request("POST", "/jobs", body)
+
+    def status(self, task_id: str) -> Dict[str, Any]:
+        return self._request("GET", f"/jobs/{task_id}")
+
+    def result(self, task_id: str, wait: Optional[float] = None) -> Dict[str, Any]:
+        """The task once it has finished, or as it stands after ``wait`` seconds.
+
+        ``wait=None`` waits for as long as it takes.
+        """
+        deadline = None if wait is None else time.monotonic() + wait
+        while True:
+            remaining = _POLL_SECONDS if deadline is None else max(0.0, deadline - time.monotonic())
+            poll = min(remaining, _POLL_SECONDS)
+            task = self._request("GET", f"/jobs/{task_id}/result?wait={poll:g}", timeout=self.timeout + poll)
+            if task.get("finished_at") is not None or (deadline is not None and time.monotonic() >= deadline):
+                return task
+
+    def cancel(self, task_id: str) -> bool:
+        return bool(self._request("POST", f"/jobs/{task_id}/cancel")["cancelled"])
+
+    def list(self) -> List[Dict[str, Any]]:
+        return self._request("GET", "/jobs")["tasks"]
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method)
+        if data is not None:
+            request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header(TOKEN_HEADER, self.token)
+        try:
+            with _OPENER.open(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as exc:
+            raise JobClientError(_error_message(exc), exc.code) from exc
+        except urllib.error.URLError as exc:
+            raise JobClientError(f"Cannot reach the job server at {self.url}: {exc.reason}") from exc
+
+
+def _error_message(exc: urllib.error.HTTPError) -> str:
+    try:
+        return json.loads(exc.read().decode("utf-8"))["error"]
+    except (ValueError, KeyError, TypeError):
+        return f"HTTP {exc.code}: {exc.reason}"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Submit jobs to a running SH-file-helper job server")
+    parser.add_argument(
+        "--url",
+        default=os.environ.get("SHFH_JOB_SERVER", DEFAULT_URL),
+        help="Job server address (default: $SHFH_JOB_SERVER or %(default)s).",
+    )
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("SHFH_JOB_TOKEN"),
+        help="Shared secret the server expects (default: $SHFH_JOB_TOKEN, else the token a local server saved).",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Queue a job.")
+    submit.add_argument("kind", help="Job kind, e.g. conversion, ocr_pdf, glossary.")
+    source = submit.add_mutually_exclusive_group(required=True)
+    source.add_argument("--job", help="The job's fields as a JSON object.")
+    source.add_argument("--job-file", type=Path, help="File holding the job's fields as JSON.")
+    submit.add_argument("--priority", default=0, type=int, help="Higher runs sooner.")
+    submit.add_argument("--wait", action="store_true", help="Wait for the job to finish.")
+
+    for name, help_text in (
+        ("status", "Show a task."),
+        ("result", "Wait for a task and show it."),
+        ("cancel", "Cancel a task."),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("task_id")
+        if name == "result":
+            command.add_argument("--wait", type=float, default=None, help="Give up after this many seconds.")
+
+    commands.add_parser("list", help="Show all tasks the server remembers.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    client = JobClient(args.url, token=args.token)
+    try:
+        if args.command == "submit":
+            text = args.job if args.job is not None else args.job_file.read_text(encoding="utf-8")
+            output: Any = client.submit(args.kind, json.loads(text), args.priority)
+            if args.wait:
+                output = client.result(output["task_id"])
+        elif args.command == "status":
+            output = client.status(args.task_id)
+        elif args.command == "result":
+            output = client.result(args.task_id, args.wait)
+        elif args.command == "cancel":
+            output = {"task_id": args.task_id, "cancelled": client.cancel(args.task_id)}
+        else:
+            output = client.list()
+    except (JobClientError, OSError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 2
+    print(json.dumps(output, indent=2, ensure_ascii=False))
+    status = output.get("status") if isinstance(output, dict) else None
+    return 1 if status in {"failed", "cancelled", "timed_out"} else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
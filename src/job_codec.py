@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import collections.abc
+import dataclasses
+import enum
+import typing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from conversion import ConversionRequest
+from pipeline import PIPELINE_STEPS, PipelineJobInput
+from service import GlossaryJobInput, OcrJobInput, PptExtractJobInput
+from task_queue import TaskRecord
+
+JOB_TYPES: Dict[str, type] = {
+    "conversion": ConversionRequest,
+    "ocr_image": OcrJobInput,
+    "ocr_pdf": OcrJobInput,
+    "glossary": GlossaryJobInput,
+    "ppt_extract": PptExtractJobInput,
+    "pipeline": PipelineJobInput,
+}
+
+
+_PRIMITIVES: Dict[type, str] = {bool: "a boolean", int: "an integer", float: "a number", str: "a string"}
+
+
+class JobCodecError(RuntimeError):
+    pass
+
+
+def encode_job(kind: str, job: object) -> Dict[str, Any]:
+    """Turn a service job into plain JSON data, e.g. for a journal or a socket."""
+    job_type = JOB_TYPES.get(kind)
+    if job_type is None:
+        raise JobCodecError(f"Unknown job kind: {kind}")
+    if not isinstance(job, job_type):
+        raise JobCodecError(f"A '{kind}' job must be a {job_type.__name__}, not {type(job).__name__}.")
+    return {"kind": kind, "job": to_json_value(job)}
+
+
+def decode_job(data: Dict[str, Any], base_dir: Optional[Path] = None) -> Tuple[str, object]:
+    """Inverse of :func:`encode_job`; returns ``(kind, job)``.
+
+    Relative paths are resolved against ``base_dir`` when one is given, e.g.
+    the working directory of a remote client.
+    """
+    try:
+        kind = data["kind"]
+        fields = data["job"]
+    except (KeyError, TypeError) as exc:
+        raise JobCodecError("A job needs 'kind' and 'job' entries.") from exc
+    job_type = JOB_TYPES.get(kind)
+    if job_type is None:
+        raise JobCodecError(f"Unknown job kind: {kind}")
+    return kind, _decode_dataclass(job_type, fields, base_dir)
+
+
+def to_json_value(value: Any) -> Any:
+    """Convert jobs and task results (paths, enums, dataclasses, lists) to JSON data.
+
+    Pipeline steps carry their class name under ``step``. Anything else that
+    JSON cannot represent is stored as its ``str()``.
+    """
+    if isinstance(value, enum.Enum):
+        return value.value
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Path):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        encoded = {
+            item.name: to_json_value(getattr(value, item.name)) for item in dataclasses.fields(value)
+        }
+        if PIPELINE_STEPS.get(type(value).__name__) is type(value):
+            encoded = {"step": type(value).__name__, **encoded}
+        return encoded
+    if isinstance(value, dict):
+        return {str(key): to_json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_json_value(item) for item in value]
+    return str(value)
+
+
+def encode_task(record: TaskRecord) -> Dict[str, Any]:
+    """A task's status, progress and result as JSON data, as reported to clients."""
+    progress = record.progress
+    return {
+        "task_id": record.task_id,
+        "description": record.description,
+        "kind": record.kind,
+        "status": record.status.value,
+        "priority": record.priority,
+        "created_at": _isoformat(record.created_at),
+        "started_at": _isoformat(record.started_at),
+        "finished_at": _isoformat(record.finished_at),
+        "progress": (
+            {**to_json_value(progress), "fraction": progress.fraction} if progress is not None else None
+        ),
+        "result": to_json_value(record.result),
+        "error": record.error,
+    }
+
+
+def _decode_dataclass(cls: type, fields: Any, base_dir: Optional[Path]) -> object:
+    if not isinstance(fields, dict):
+        raise JobCodecError(f"Expected an object for {cls.__name__}, got {_json_type(fields)}.")
+    hints = typing.get_type_hints(cls)
+    known = {item.name for item in dataclasses.fields(cls) if item.init}
+    unknown = set(fields) - known - {"step"}
+    if unknown:
+        raise JobCodecError(f"Unknown {cls.__name__} field(s): {', '.join(sorted(unknown))}")
+    values = {}
+    for name, raw in fields.items():
+        if name not in known:
+            continue
+        try:
+            values[name] = _decode_value(hints[name], raw, base_dir)
+        except JobCodecError as exc:
+            raise JobCodecError(f"{cls.__name__}.{name}: {exc}") from exc
+    try:
+        return cls(**values)
+    except (TypeError, ValueError) as exc:
+        raise JobCodecError(f"Invalid {cls.__name__}: {exc}") from exc
+
+
+def _decode_value(hint: Any, raw: Any, base_dir: Optional[Path]) -> Any:
+    if raw is None:
+        return None
+    origin = typing.get_origin(hint)
+    args = typing.get_args(hint)
+    if origin is Union:
+        options = [arg for arg in args if arg is not type(None)]
+        return _decode_value(options[0], raw, base_dir) if len(options) == 1 else raw
+    if origin in (list, tuple, collections.abc.Sequence):
+        if not isinstance(raw, list):
+            raise JobCodecError(f"Expected a list, got {_json_type(raw)}.")
+        item_hint = args[0] if args else Any
+        return tuple(_decode_value(item_hint, item, base_dir) for item in raw)
+    if hint in (object, Any) and isinstance(raw, dict) and "step" in raw:
+        step = PIPELINE_STEPS.get(raw["step"])
+        if step is None:
+            raise JobCodecError(f"Unknown pipeline step: {raw['step']}")
+        return _decode_dataclass(step, raw, base_dir)
+    if hint in _PRIMITIVES:
+        # JSON has no separate integer type for bools to fall back on, and
+        # 3 is as good a float as 3.0.
+        accepted = (int, float) if hint is float else hint
+        if not isinstance(raw, accepted) or (hint is not bool and isinstance(raw, bool)):
+            raise JobCodecError(f"Expected {_PRIMITIVES[hint]}, got {_json_type(raw)}.")
+        return float(raw) if hint is float else raw
+    if isinstance(hint, type):
+        if issubclass(hint, enum.Enum):
+            try:
+                return hint(raw)
+            except ValueError as exc:
+                raise JobCodecError(str(exc)) from exc
+        if issubclass(hint, Path):
+            if not isinstance(raw, str):
+                raise JobCodecError(f"Expected a path string, got {_json_type(raw)}.")
+            path = Path(raw)
+            return base_dir / path if base_dir is not None and not path.is_absolute() else path
+        if dataclasses.is_dataclass(hint):
+            return _decode_dataclass(hint, raw, base_dir)
+    return raw
+
+
+def _json_type(value: Any) -> str:
+    """The JSON name of ``value``'s type, for error messages."""
+    if isinstance(value, bool):
+        return "a boolean"
+    if isinstance(value, (int, float)):
+        return "a number"
+    if isinstance(value, str):
+        return "a string"
+    if isinstance(value, list):
+        return "an array"
+    if isinstance(value, dict):
+        return "an object"
+    return "null" if value is None else type(value).__name__
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
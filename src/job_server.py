@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import hmac
+import ipaddress
+import json
+import os
+import secrets
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from artifact_store import ArtifactStore
+from job_client import DEFAULT_PORT, TOKEN_HEADER, token_path, write_token
+from job_codec import JobCodecError, decode_job, encode_task
+from libreoffice_pool import LibreOfficePool
+from service import ServiceLayer
+from task_journal import TaskJournal
+from task_queue import TaskQueue
+
+# Longest a result request may hold its connection open waiting for a task.
+_MAX_WAIT = 300.0
+_MAX_BODY = 1024 * 1024
+
+
+class JobServer:
+    """Serve a :class:`ServiceLayer` as a JSON API over HTTP on localhost.
+
+    Clients share the service's worker threads and its warm LibreOffice
+    pool instead of each paying for startup. Endpoints:
+
+    * ``POST /jobs`` with ``{"kind", "job", "priority", "cwd"}`` queues a
+      job (as encoded by :func:`job_codec.encode_job`); relative paths are
+      resolved against ``cwd``.
+    * ``GET /jobs`` lists tasks; ``GET /jobs/<id>`` reports one.
+    * ``GET /jobs/<id>/result?wait=<seconds>`` reports the task once it has
+      finished, or as it stands when ``wait`` runs out (status 202).
+    * ``POST /jobs/<id>/cancel`` cancels a task.
+
+    Jobs read and write files as the server's user, so every request must
+    carry ``token`` (generated when none is given) in the ``X-Job-Token``
+    header. Browsers cannot be trusted with that, so requests with an
+    ``Origin`` header, a ``Host`` that is not loopback (DNS rebinding) or a
+    body that is not ``application/json`` are refused as well.
+    """
+
+    def __init__(
+        self,
+        service: ServiceLayer,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        token: Optional[str] = None,
+        verbose: bool = False,
+    ) -> None:
+        if not service.queue.concurrent:
+            raise ValueError("JobServer needs a ServiceLayer with a concurrent TaskQueue.")
+        self.service = service
+        self.token = token or secrets.token_urlsafe(32)
+        self.verbose = verbose
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.job_server = self
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "JobServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        host, port = self._httpd.server_address[:2]
+        return host, port
+
+    @property
+    def url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def start(self) -> None:
+        """Serve on a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.serve_forever, name="job-server", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop accepting requests; queued and running tasks are left to the service."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def allows_host(self, host: Optional[str]) -> bool:
+        """Whether a ``Host`` header names this server by a loopback name or its own address."""
+        if not host:
+            return False
+        name = urlsplit(f"//{host}").hostname or ""
+        if name == "localhost" or name == self.address[0]:
+            return True
+        try:
+            return ipaddress.ip_address(name).is_loopback
+        except ValueError:
+            return False
+
+    def submit(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(body, dict):
+            raise JobCodecError("Expected a JSON object.")
+        cwd = body.get("cwd")
+        kind, job = decode_job(body, base_dir=Path(cwd) if cwd else None)
+        priority = body.get("priority", 0)
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            raise JobCodecError("priority must be an integer.")
+        record = self.service.submit_job(kind, job, priority)
+        return encode_task(record)
+
+    def status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        record = self.service.queue.get_task(task_id)
+        return encode_task(record) if record is not None else None
+
+    def result(self, task_id: str, wait: float) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """``(finished, task)``; waits up to ``wait`` seconds for the task to finish."""
+        queue = self.service.queue
+        record = queue.get_task(task_id)
+        if record is None:
+            return False, None
+        if wait > 0:
+            try:
+                record = queue.future(task_id).result(min(wait, _MAX_WAIT))
+            except KeyError:
+                # Pruned from the queue between the lookup and now.
+                pass
+            except concurrent.futures.TimeoutError:
+                pass
+        finished = record.finished_at is not None
+        return finished, encode_task(record)
+
+    def list(self) -> Dict[str, Any]:
+        return {"tasks": [encode_task(record) for record in self.service.queue.list_tasks()]}
+
+    def cancel(self, task_id: str) -> Optional[Dict[str, Any]]:
+        if self.service.queue.get_task(task_id) is None:
+            return None
+        return {"task_id": task_id, "cancelled": self.service.cancel(task_id)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "SHFileHelperJobServer/1.0"
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.job_server.verbose:
+            super().log_message(format, *args)
+
+    def _dispatch(self, method: str) -> None:
+        job_server: JobServer = self.server.job_server
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        try:
+            if self.headers.get("Origin") is not None or not job_server.allows_host(self.headers.get("Host")):
+                self._reply(HTTPStatus.FORBIDDEN, {"error": "Requests from browsers are not accepted."})
+                return
+            if not hmac.compare_digest(self.headers.get(TOKEN_HEADER, ""), job_server.token):
+                self._reply(HTTPStatus.UNAUTHORIZED, {"error": "Missing or wrong job token."})
+                return
+            if not parts or parts[0] != "jobs" or len(parts) > 3:
+                self._reply(HTTPStatus.NOT_FOUND, {"error": f"No such endpoint: {url.path}"})
+                return
+
+            if method == "POST" and len(parts) == 1:
+                self._reply(HTTPStatus.ACCEPTED, job_server.submit(self._read_json()))
+            elif method == "GET" and len(parts) == 1:
+                self._reply(HTTPStatus.OK, job_server.list())
+            elif method == "GET" and len(parts) == 2:
+                self._reply_task(job_server.status(parts[1]), parts[1])
+            elif method == "GET" and parts[2:] == ["result"]:
+                wait = float(parse_qs(url.query).get("wait", ["0"])[0])
+                finished, task = job_server.result(parts[1], wait)
+                self._reply_task(task, parts[1], HTTPStatus.OK if finished else HTTPStatus.ACCEPTED)
+            elif method == "POST" and parts[2:] == ["cancel"]:
+                self._reply_task(job_server.cancel(parts[1]), parts[1])
+            else:
+                self._reply(HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} {url.path} is not supported."})
+        except (JobCodecError, TypeError, ValueError) as exc:
+            self._reply(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+        except Exception as exc:  # noqa: BLE001
+            self._reply(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(exc).__name__}: {exc}"})
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length < 0:
+            raise ValueError("Invalid Content-Length.")
+        if length > _MAX_BODY:
+            raise ValueError("Request body is too large.")
+        if self.headers.get_content_type() != "application/json":
+            raise ValueError("The request body must be application/json.")
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON: {exc}") from exc
+
+    def _reply_task(self, task: Optional[Dict[str, Any]], task_id: str, status: HTTPStatus = HTTPStatus.OK) -> None:
+        if task is None:
+            self._reply(HTTPStatus.NOT_FOUND, {"error": f"Unknown task: {task_id}"})
+        else:
+            self._reply(status, task)
+
+    def _reply(self, status: HTTPStatus, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve SH-file-helper jobs to local clients")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on.")
+    parser.add_argument("--port", default=DEFAULT_PORT, type=int, help="Port to listen on.")
+    parser.add_argument(
+        "--workers",
+        default=os.cpu_count() or 1,
+        type=int,
+        help="Number of jobs run at once.",
+    )
+    parser.add_argument(
+        "--libreoffice-instances",
+        default=0,
+        type=int,
+        help="Warm LibreOffice instances to keep for Office conversions (0 to start soffice per job).",
+    )
+    parser.add_argument("--artifact-store", type=Path, default=None, help="Cache directory for outputs.")
+    parser.add_argument("--journal", type=Path, default=None, help="SQLite journal for recovering tasks.")
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=int,
+        default=None,
+        help="Hold jobs back while their estimated memory would exceed this.",
+    )
+    parser.add_argument("--coalesce", action="store_true", help="Run identical jobs only once.")
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("SHFH_JOB_TOKEN"),
+        help=(
+            "Shared secret clients must send (default: $SHFH_JOB_TOKEN, else a generated one saved "
+            "where job_client finds it)."
+        ),
+    )
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    pool = LibreOfficePool(size=args.libreoffice_instances) if args.libreoffice_instances > 0 else None
+    if pool is not None:
+        pool.start()
+    journal = TaskJournal(args.journal) if args.journal is not None else None
+    memory_budget = args.memory_budget_mb * 1024 * 1024 if args.memory_budget_mb else None
+    try:
+        service = ServiceLayer(
+            libreoffice_pool=pool,
+            artifact_store=ArtifactStore(args.artifact_store) if args.artifact_store is not None else None,
+            queue=TaskQueue(workers=args.workers, memory_budget=memory_budget),
+            journal=journal,
+            coalesce=args.coalesce,
+        )
+        server = JobServer(service, args.host, args.port, token=args.token, verbose=args.verbose)
+        saved_token = token_path(server.address[1]) if not args.token else None
+        if saved_token is not None:
+            write_token(saved_token, server.token)
+        print(f"Serving jobs on {server.url}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            service.queue.shutdown(wait=False)
+            if saved_token is not None:
+                saved_token.unlink(missing_ok=True)
+    finally:
+        if journal is not None:
+            journal.close()
+        if pool is not None:
+            pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from watchdog import ProcessTimeout, kill_process_group, new_group_options
+
+_CONNECT_URL = "uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+
+
+class LibreOfficePoolError(RuntimeError):
+    pass
+
+
+class LibreOfficeInstance:
+    """One long-lived headless soffice process with a private user profile."""
+
+    def __init__(self, executable: str, startup_timeout: float = 60.0) -> None:
+        self.executable = executable
+        self.startup_timeout = startup_timeout
+        self.port = 0
+        self._process: Optional[subprocess.Popen] = None
+        self._profile_dir: Optional[Path] = None
+        self._desktop = None
+
+    def start(self) -> None:
+        self._profile_dir = Path(tempfile.mkdtemp(prefix="shfh-soffice-"))
+        self.port = _free_port()
+        command = [
+            self.executable,
+            f"-env:UserInstallation={self._profile_dir.as_uri()}",
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--nodefault",
+            "--norestore",
+            "--nolockcheck",
+            f"--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext",
+        ]
+        try:
+            self._process = subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                **new_group_options(),
+            )
+        except FileNotFoundError as exc:
+            self.stop()
+            raise LibreOfficePoolError(
+                "LibreOffice not found. Install LibreOffice and ensure 'soffice' is on PATH."
+            ) from exc
+
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                break
+            try:
+                self._desktop = _connect_desktop(self.port)
+                return
+            except Exception:  # noqa: BLE001
+                time.sleep(0.25)
+        self.stop()
+        raise LibreOfficePoolError("LibreOffice instance did not become ready in time.")
+
+    def stop(self) -> None:
+        self._desktop = None
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.terminate()
+                try:
+                    self._process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    pass
+            # Also reaps soffice.bin and other helpers the launcher left running.
+            kill_process_group(self._process)
+            self._process.wait()
+        self._process = None
+        if self._profile_dir is not None:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+
+    def restart(self) -> None:
+        self.stop()
+        self.start()
+
+    def is_healthy(self) -> bool:
+        if self._process is None or self._process.poll() is not None or self._desktop is None:
+            return False
+        try:
+            self._desktop.getComponents()
+        except Exception:  # noqa: BLE001
+            return False
+        return True
+
+    def convert(self, input_path: Path, output_path: Path, filter_name: str) -> None:
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def prop(name: str, value: object) -> PropertyValue:
+            item = PropertyValue()
+            item.Name = name
+            item.Value = value
+            return item
+
+        document = self._desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(input_path.resolve())),
+            "_blank",
+            0,
+            (prop("Hidden", True), prop("ReadOnly", True)),
+        )
+        if document is None:
+            raise LibreOfficePoolError(f"LibreOffice could not open: {input_path}")
+        try:
+            document.storeToURL(
+                uno.systemPathToFileUrl(str(output_path.resolve())),
+                (prop("FilterName", filter_name),),
+            )
+        finally:
+            document.close(True)
+
+
+class LibreOfficePool:
+    """A fixed-size pool of warm headless LibreOffice instances.
+
+    Each instance listens on its own localhost UNO socket and uses a private
+    ``-env:UserInstallation`` profile, so instances never contend for the
+    profile lock of a desktop soffice. Requires the Python UNO bindings that
+    ship with LibreOffice (``import uno``).
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        executable: str = "soffice",
+        conversion_timeout: float = 300.0,
+        startup_timeout: float = 60.0,
+    ) -> None:
+        if size < 1:
+            raise ValueError("LibreOffice pool size must be at least 1.")
+        self.size = size
+        self.executable = executable
+        self.conversion_timeout = conversion_timeout
+        self.startup_timeout = startup_timeout
+        self._instances: List[LibreOfficeInstance] = []
+        self._idle: "queue.Queue[LibreOfficeInstance]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def __enter__(self) -> "LibreOfficePool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            try:
+                import uno  # noqa: F401
+            except ImportError as exc:
+                raise LibreOfficePoolError(
+                    "The LibreOffice pool requires the Python UNO bindings shipped with LibreOffice."
+                ) from exc
+            try:
+                for _ in range(self.size):
+                    instance = LibreOfficeInstance(self.executable, self.startup_timeout)
+                    instance.start()
+                    self._instances.append(instance)
+                    self._idle.put(instance)
+            except Exception:
+                self._shutdown_instances()
+                raise
+            self._started = True
+
+    def close(self) -> None:
+        with self._lock:
+            self._shutdown_instances()
+            self._started = False
+
+    def convert(self, input_path: Path, output_path: Path, filter_name: str) -> Path:
+        """Convert one document on the next idle instance."""
+        self.start()
+        instance = self._idle.get()
+        try:
+            if not instance.is_healthy():
+                instance.restart()
+            self._convert_with_timeout(instance, input_path, output_path, filter_name)
+        finally:
+            self._idle.put(instance)
+        if not output_path.exists():
+            raise LibreOfficePoolError("LibreOffice did not create the expected output file.")
+        return output_path
+
+    def convert_many(
+        self, items: Sequence[Tuple[Path, Path]], filter_name: str
+    ) -> List[Optional[Exception]]:
+        """Convert ``(input, output)`` pairs in parallel, one error slot per item."""
+        self.start()
+
+        def run(item: Tuple[Path, Path]) -> Optional[Exception]:
+            try:
+                self.convert(item[0], item[1], filter_name)
+            except Exception as exc:  # noqa: BLE001
+                return exc
+            return None
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(run, items))
+
+    def _convert_with_timeout(
+        self,
+        instance: LibreOfficeInstance,
+        input_path: Path,
+        output_path: Path,
+        filter_name: str,
+    ) -> None:
+        errors: List[BaseException] = []
+
+        def target() -> None:
+            try:
+                instance.convert(input_path, output_path, filter_name)
+            except BaseException as exc:  # noqa: BLE001
+                errors.append(exc)
+
+        worker = threading.Thread(target=target, daemon=True)
+        worker.start()
+        worker.join(self.conversion_timeout)
+        if worker.is_alive():
+            # The instance is hung; kill it so the blocked UNO call returns and
+            # bring up a fresh process for the next request.
+            instance.restart()
+            timed_out = ProcessTimeout("LibreOffice conversion", self.conversion_timeout, str(input_path))
+            raise LibreOfficePoolError(str(timed_out)) from timed_out
+        if errors:
+            if not instance.is_healthy():
+                instance.restart()
+            raise LibreOfficePoolError(f"LibreOffice conversion failed: {errors[0]}") from errors[0]
+
+    def _shutdown_instances(self) -> None:
+        for instance in self._instances:
+            instance.stop()
+        self._instances.clear()
+        self._idle = queue.Queue()
+
+
+def _connect_desktop(port: int):
+    import uno
+
+    local_context = uno.getComponentContext()
+    resolver = local_context.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_context
+    )
+    context = resolver.resolve(_CONNECT_URL.format(port=port))
+    return context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
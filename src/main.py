@@ -1,39 +1,147 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import contextlib
+import glob
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
 
-from conversion import ConversionMode, ConversionRequest, convert
-from glossary import GlossaryRequest, generate_glossary
-from ocr import OcrRequest, ocr_image, ocr_pdf
-from text_extract import TextExtractRequest, extract_text
+_results_stream: Optional[TextIO] = None
+
+
+def _reserve_stdout() -> TextIO:
+    """Keep stdout for machine-readable results; returns the stream to write them to.
+
+    File descriptor 1 and ``sys.stdout`` are pointed at stderr, so whatever
+    else prints (libraries, child processes) cannot end up among the results.
+    """
+    global _results_stream
+    if _results_stream is None:
+        sys.stdout.flush()
+        _results_stream = os.fdopen(os.dup(1), "w", encoding="utf-8")
+        os.dup2(2, 1)
+        sys.stdout = sys.stderr
+    return _results_stream
+
+
+# Some of the libraries imported below print notices on import; a manifest
+# run needs them off stdout before that happens.
+if __name__ == "__main__" and any(
+    arg == "--manifest" or arg.startswith("--manifest=") for arg in sys.argv[1:]
+):
+    _reserve_stdout()
+
+from conversion import IMAGE_PDF_PROFILES, LIBREOFFICE_MODES, ConversionMode, ConversionRequest, convert  # noqa: E402
+from glossary import GlossaryRequest, generate_glossary  # noqa: E402
+from job_codec import JobCodecError, decode_job, encode_task  # noqa: E402
+from libreoffice_pool import LibreOfficePool, LibreOfficePoolError  # noqa: E402
+from ocr import OcrRequest, ocr_image, ocr_pdf  # noqa: E402
+from service import GlossaryJobInput, OcrJobInput, ServiceLayer  # noqa: E402
+from task_queue import FINISHED_STATUSES, TaskQueue, TaskRecord, TaskStatus  # noqa: E402
+from text_extract import TextExtractRequest, extract_text  # noqa: E402
 
 
 OCR_MODES = {"ocr_image", "ocr_pdf"}
 GLOSSARY_MODE = "glossary"
+BATCH_SUMMARY_NAME = "batch_summary.json"
+
+_IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".gif", ".webp")
+# Which files a folder given to batch mode contributes, per mode.
+_BATCH_INPUT_SUFFIXES = {
+    ConversionMode.PPTX_TO_PDF.value: (".pptx",),
+    ConversionMode.PDF_TO_PPTX.value: (".pdf",),
+    ConversionMode.DOCX_TO_PDF.value: (".docx",),
+    ConversionMode.PDF_TO_DOCX.value: (".pdf",),
+    ConversionMode.IMAGE_TO_PDF.value: _IMAGE_SUFFIXES,
+    "ocr_image": _IMAGE_SUFFIXES,
+    "ocr_pdf": (".pdf",),
+    GLOSSARY_MODE: (".txt", ".docx", ".pptx", ".pdf"),
+}
+_OUTPUT_SUFFIXES = {
+    ConversionMode.PPTX_TO_PDF.value: ".pdf",
+    ConversionMode.PDF_TO_PPTX.value: ".pptx",
+    ConversionMode.DOCX_TO_PDF.value: ".pdf",
+    ConversionMode.PDF_TO_DOCX.value: ".docx",
+    ConversionMode.IMAGE_TO_PDF.value: ".pdf",
+    "ocr_image": ".txt",
+    "ocr_pdf": ".txt",
+}
+_OFFICE_MODES = {mode.value for mode in LIBREOFFICE_MODES}
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Offline file conversion helper")
     parser.add_argument(
         "--mode",
-        required=True,
         choices=[mode.value for mode in ConversionMode] + sorted(OCR_MODES) + [GLOSSARY_MODE],
         help="Conversion mode.",
     )
     parser.add_argument(
         "--input",
-        required=True,
         nargs="+",
         type=Path,
-        help="Input file(s).",
+        help="Input file(s); with --output-dir also folders and glob patterns.",
     )
     parser.add_argument(
         "--output",
-        required=True,
         type=Path,
         help="Output file path.",
     )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        help=(
+            "Run the jobs listed in this JSON-lines file ('-' for stdin), one "
+            '{"kind": ..., "job": {...}} object per line with optional "id" and '
+            '"priority", and print one JSON result line per job as it finishes.'
+        ),
+    )
+    parser.add_argument(
+        "--libreoffice-instances",
+        default=0,
+        type=int,
+        help="Manifest mode: warm LibreOffice instances for Office conversions.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        help="Batch mode: run --mode on every input file and write the outputs here.",
+    )
+    parser.add_argument(
+        "--name-template",
+        default="{rel_dir}/{stem}{suffix}",
+        help=(
+            "Batch output name, relative to --output-dir. Fields: {stem}, {name}, {ext}, "
+            "{suffix} (the mode's output suffix) and {rel_dir} (the file's folder "
+            "relative to the input folder it was found in)."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        default=os.cpu_count() or 1,
+        type=int,
+        help="Batch and manifest modes: number of jobs run at once.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Batch mode: also process files whose output is newer than the input.",
+    )
+    parser.add_argument(
+        "--summary",
+        type=Path,
+        default=None,
+        help=f"Batch mode: where to write the JSON summary (default: <output-dir>/{BATCH_SUMMARY_NAME}).",
+    )
     parser.add_argument(
         "--lang",
         default="eng",
@@ -45,6 +153,12 @@ def parse_args() -> argparse.Namespace:
         type=int,
         help="DPI used when rendering PDF pages for OCR.",
     )
+    parser.add_argument(
+        "--image-profile",
+        choices=sorted(IMAGE_PDF_PROFILES),
+        default=None,
+        help="Output profile for image_to_pdf / images_to_pdf.",
+    )
     parser.add_argument(
         "--top-k",
         default=30,
@@ -69,11 +183,25 @@ def parse_args() -> argparse.Namespace:
         default="txt",
         help="Glossary output format.",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.manifest is not None:
+        if args.mode or args.input or args.output or args.output_dir:
+            parser.error("--manifest cannot be combined with --mode, --input, --output or --output-dir")
+    elif args.mode is None or not args.input:
+        parser.error("--mode and --input are required unless --manifest is given")
+    elif (args.output is None) == (args.output_dir is None):
+        parser.error("give exactly one of --output or --output-dir")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
 
 
 def main() -> None:
     args = parse_args()
+    if args.manifest is not None:
+        raise SystemExit(_run_manifest(args))
+    if args.output_dir is not None:
+        raise SystemExit(_run_batch(args))
     if args.mode in OCR_MODES:
         output = _run_ocr(args)
         print(f"OCR saved to: {output}")
@@ -87,6 +215,7 @@ def main() -> None:
         mode=ConversionMode(args.mode),
         input_paths=args.input,
         output_path=args.output,
+        image_profile=args.image_profile,
     )
     output = convert(request)
     print(f"Converted to: {output}")
@@ -134,19 +263,332 @@ def _run_glossary(args: argparse.Namespace) -> Path:
     result = generate_glossary(request)
 
     args.output.parent.mkdir(parents=True, exist_ok=True)
-    if args.glossary_format == "json":
-        payload = [entry.__dict__ for entry in result.entries]
-        args.output.write_text(_to_json(payload), encoding="utf-8")
-    else:
-        lines = [f"{entry.term}\t{entry.score:.4f}" for entry in result.entries]
-        args.output.write_text("\n".join(lines), encoding="utf-8")
+    args.output.write_text(result.to_text(args.glossary_format), encoding="utf-8")
     return args.output
 
 
-def _to_json(payload: list[dict[str, object]]) -> str:
-    import json
+def _run_manifest(args: argparse.Namespace) -> int:
+    """Run every job of a JSON-lines manifest; returns the process exit code.
+
+    Lines are read and queued as they arrive, so the manifest can be a pipe
+    fed by another program. Each job's result goes to stdout as one JSON
+    line (the task as reported by ``job_codec.encode_task`` plus the
+    manifest's ``id`` and line number) as soon as the job finishes, in
+    completion order. Lines that are not valid jobs get a result line with
+    status ``invalid``. Anything else printed goes to stderr, keeping stdout
+    machine-readable (see :func:`_reserve_stdout`).
+    """
+    pool: Optional[LibreOfficePool] = None
+    if args.libreoffice_instances > 0:
+        pool = LibreOfficePool(size=args.libreoffice_instances)
+        pool.start()
+    service = ServiceLayer(libreoffice_pool=pool, queue=TaskQueue(workers=args.jobs))
+    # Manifest id and line number of each task, recorded before it is queued.
+    origins: Dict[str, Tuple[object, int]] = {}
+    # Results are written by one thread so that a slow reader of stdout
+    # never holds up the queue's workers.
+    results: "queue.Queue[Optional[Dict[str, object]]]" = queue.Queue()
+    output = _reserve_stdout()
+    writer = threading.Thread(target=_write_results, args=(results, output), name="manifest-results")
+    writer.start()
+
+    def on_change(record: TaskRecord) -> None:
+        # Called before the task's future resolves, so every result is
+        # queued before the final wait below returns.
+        if record.status in FINISHED_STATUSES and record.task_id in origins:
+            job_id, number = origins[record.task_id]
+            results.put({**encode_task(record), "id": job_id, "line": number})
+
+    service.queue.add_listener(on_change)
+    submitted: List[TaskRecord] = []
+    invalid = 0
+    manifest = sys.stdin if str(args.manifest) == "-" else args.manifest.open(encoding="utf-8")
+    try:
+        for number, line in enumerate(manifest, start=1):
+            if not line.strip():
+                continue
+            entry: object = None
+            try:
+                entry = json.loads(line)
+                if not isinstance(entry, dict):
+                    raise JobCodecError("Each line must be a JSON object.")
+                kind, job = decode_job(entry)
+                job_id = entry.get("id")
+                priority = entry.get("priority", 0)
+                if not isinstance(priority, int) or isinstance(priority, bool):
+                    raise JobCodecError("priority must be an integer.")
+                task_id = str(job_id) if job_id is not None else uuid.uuid4().hex
+                if task_id in origins:
+                    raise ValueError(f"Duplicate id: {job_id}")
+                origins[task_id] = (job_id, number)
+                try:
+                    record = service.submit_job(kind, job, priority=priority, task_id=task_id)
+                except BaseException:
+                    del origins[task_id]
+                    raise
+            except (JobCodecError, TypeError, ValueError) as exc:
+                invalid += 1
+                job_id = entry.get("id") if isinstance(entry, dict) else None
+                results.put({"id": job_id, "line": number, "status": "invalid", "error": str(exc)})
+                continue
+            submitted.append(record)
+        finished = [service.queue.wait(record.task_id) for record in submitted]
+    except KeyboardInterrupt:
+        # Running tasks stop at their next progress report.
+        for record in submitted:
+            service.cancel(record.task_id)
+        raise
+    finally:
+        if manifest is not sys.stdin:
+            manifest.close()
+        service.queue.shutdown()
+        results.put(None)
+        writer.join()
+        with contextlib.suppress(BrokenPipeError):
+            output.close()
+        if pool is not None:
+            pool.close()
+
+    not_completed = invalid + sum(1 for record in finished if record.status != TaskStatus.COMPLETED)
+    print(f"{len(submitted) + invalid} job(s), {not_completed} not completed", file=sys.stderr)
+    return 1 if not_completed else 0
+
+
+def _write_results(results: "queue.Queue[Optional[Dict[str, object]]]", stream: TextIO) -> None:
+    reader_gone = False
+    while True:
+        result = results.get()
+        if result is None:
+            return
+        if reader_gone:
+            continue
+        try:
+            stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+            stream.flush()
+        except BrokenPipeError:
+            # The consumer stopped reading; the jobs still run to completion.
+            reader_gone = True
+
+
+def _run_batch(args: argparse.Namespace) -> int:
+    """Run ``args.mode`` over every input file; returns the process exit code."""
+    if args.mode == ConversionMode.IMAGES_TO_PDF.value:
+        raise ValueError("images_to_pdf combines its inputs into one file; use image_to_pdf in batch mode.")
+    plan = _plan_batch(args)
+    if not plan:
+        raise ValueError("No input files found.")
+
+    jobs = args.jobs
+    pool: Optional[LibreOfficePool] = None
+    if args.mode in _OFFICE_MODES and jobs > 1:
+        # Plain soffice runs share one profile and cannot overlap.
+        try:
+            pool = LibreOfficePool(size=jobs)
+            pool.start()
+        except LibreOfficePoolError as exc:
+            print(f"Running Office conversions one at a time: {exc}")
+            pool, jobs = None, 1
+    service = ServiceLayer(libreoffice_pool=pool, queue=TaskQueue(workers=jobs))
+
+    started = time.time()
+    entries: List[Dict[str, object]] = []
+    submitted: Dict[str, Tuple[Path, Path]] = {}
+    for input_path, output_path in plan:
+        if not args.force and _up_to_date(input_path, output_path):
+            entries.append(_batch_entry(input_path, output_path, "skipped"))
+            _print_batch_line(len(entries), len(plan), entries[-1])
+            continue
+        record = service.submit_job(*_batch_job(args, input_path, output_path, jobs))
+        submitted[record.task_id] = (input_path, output_path)
+
+    pending = {service.queue.future(task_id): task_id for task_id in submitted}
+    try:
+        try:
+            for future in concurrent.futures.as_completed(list(pending)):
+                task_id = pending.pop(future)
+                entries.append(_finish_batch_entry(future.result(), *submitted[task_id], started))
+                _print_batch_line(len(entries), len(plan), entries[-1])
+        except KeyboardInterrupt:
+            # Running tasks stop at their next progress report.
+            print("Interrupted; cancelling the remaining files.")
+            for task_id in pending.values():
+                service.cancel(task_id)
+            for future, task_id in pending.items():
+                entries.append(_finish_batch_entry(future.result(), *submitted[task_id], started))
+    finally:
+        service.queue.shutdown(wait=False)
+        if pool is not None:
+            pool.close()
+
+    counts: Dict[str, int] = {}
+    for entry in entries:
+        counts[str(entry["status"])] = counts.get(str(entry["status"]), 0) + 1
+    summary_path = args.summary or args.output_dir / BATCH_SUMMARY_NAME
+    summary = {
+        "mode": args.mode,
+        "output_dir": str(args.output_dir),
+        "started_at": datetime.fromtimestamp(started).isoformat(),
+        "wall_seconds": round(time.time() - started, 3),
+        "jobs": jobs,
+        "counts": counts,
+        "files": entries,
+    }
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(
+        ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        + f" in {summary['wall_seconds']:.1f}s; summary: {summary_path}"
+    )
+    return 0 if set(counts) <= {TaskStatus.COMPLETED.value, "skipped"} else 1
+
+
+def _plan_batch(args: argparse.Namespace) -> List[Tuple[Path, Path]]:
+    """Pairs each input file with its output path; refuses outputs that collide."""
+    output_suffix = (
+        f".{args.glossary_format}" if args.mode == GLOSSARY_MODE else _OUTPUT_SUFFIXES[args.mode]
+    )
+    plan: List[Tuple[Path, Path]] = []
+    owners: Dict[Path, Path] = {}
+    # Earlier (or in-progress) outputs must not be picked up as inputs when
+    # the output folder sits inside an input folder.
+    excluded = (args.output_dir, args.summary or args.output_dir / BATCH_SUMMARY_NAME)
+    for input_path, base in _batch_inputs(args.input, _BATCH_INPUT_SUFFIXES[args.mode], excluded):
+        name = args.name_template.format(
+            stem=input_path.stem,
+            name=input_path.name,
+            ext=input_path.suffix.lstrip("."),
+            suffix=output_suffix,
+            rel_dir=input_path.parent.relative_to(base).as_posix(),
+        )
+        output_path = args.output_dir / name
+        key = output_path.resolve()
+        if key in owners:
+            raise ValueError(
+                f"{owners[key]} and {input_path} would both be written to {output_path}; "
+                "add {rel_dir} or {ext} to --name-template."
+            )
+        owners[key] = input_path
+        plan.append((input_path, output_path))
+    return plan
+
+
+def _batch_inputs(
+    patterns: Sequence[Path], suffixes: Sequence[str], excluded: Sequence[Path] = ()
+) -> Iterator[Tuple[Path, Path]]:
+    """Input files with the folder their ``{rel_dir}`` is relative to, each file once.
+
+    Folders contribute the files below them with one of ``suffixes``; files
+    named directly or matched by a glob pattern are taken as they are.
+    Folders and glob patterns skip anything at or below an ``excluded`` path.
+    """
+    excluded = [path.resolve() for path in excluded]
+
+    def wanted(path: Path) -> bool:
+        resolved = path.resolve()
+        return not any(resolved == root or root in resolved.parents for root in excluded)
+
+    seen = set()
+    for pattern in patterns:
+        text = str(pattern)
+        if pattern.is_dir():
+            found = [
+                (path, pattern)
+                for path in sorted(pattern.rglob("*"))
+                if path.suffix.lower() in suffixes and path.is_file() and wanted(path)
+            ]
+        elif pattern.is_file():
+            found = [(pattern, pattern.parent)]
+        elif any(char in text for char in "*?["):
+            base = pattern.parent
+            while any(char in str(base) for char in "*?["):
+                base = base.parent
+            found = [
+                (Path(match), base)
+                for match in sorted(glob.glob(text, recursive=True))
+                if Path(match).is_file() and wanted(Path(match))
+            ]
+        else:
+            raise FileNotFoundError(f"Input not found: {pattern}")
+        for path, base in found:
+            key = path.resolve()
+            if key not in seen:
+                seen.add(key)
+                yield path, base
+
+
+def _batch_job(args: argparse.Namespace, input_path: Path, output_path: Path, jobs: int) -> Tuple[str, object]:
+    if args.mode in OCR_MODES:
+        return args.mode, OcrJobInput(
+            input_path=input_path,
+            output_path=output_path,
+            language=args.lang,
+            dpi=args.dpi,
+        )
+    if args.mode == GLOSSARY_MODE:
+        return "glossary", GlossaryJobInput(
+            input_paths=[input_path],
+            output_path=output_path,
+            top_k=args.top_k,
+            window_size=args.window_size,
+            min_term_length=args.min_term_length,
+            language=args.lang,
+            dpi=args.dpi,
+            output_format=args.glossary_format,
+        )
+    return "conversion", ConversionRequest(
+        mode=ConversionMode(args.mode),
+        input_paths=[input_path],
+        output_path=output_path,
+        image_profile=args.image_profile,
+        # Split the CPUs between files rather than oversubscribe them.
+        workers=max(1, (os.cpu_count() or 1) // jobs),
+    )
+
+
+def _up_to_date(input_path: Path, output_path: Path) -> bool:
+    try:
+        return output_path.stat().st_mtime >= input_path.stat().st_mtime
+    except OSError:
+        return False
+
+
+def _finish_batch_entry(record: TaskRecord, input_path: Path, output_path: Path, started: float) -> Dict[str, object]:
+    if record.status != TaskStatus.COMPLETED:
+        # Leave no partial output behind to pass for up to date next time.
+        try:
+            if output_path.is_file() and output_path.stat().st_mtime >= started:
+                output_path.unlink()
+        except OSError:
+            pass
+    seconds = None
+    if record.started_at is not None and record.finished_at is not None:
+        seconds = round((record.finished_at - record.started_at).total_seconds(), 3)
+    return _batch_entry(input_path, output_path, record.status.value, seconds, record.error)
+
+
+def _batch_entry(
+    input_path: Path,
+    output_path: Path,
+    status: str,
+    seconds: Optional[float] = None,
+    error: Optional[str] = None,
+) -> Dict[str, object]:
+    return {
+        "input": str(input_path),
+        "output": str(output_path),
+        "status": status,
+        "seconds": seconds,
+        "error": error,
+    }
+
 
-    return json.dumps(payload, ensure_ascii=False, indent=2)
+def _print_batch_line(done: int, total: int, entry: Dict[str, object]) -> None:
+    line = f"[{done}/{total}] {entry['status']}: {entry['input']}"
+    if entry["status"] == TaskStatus.COMPLETED.value:
+        line += f" -> {entry['output']} ({entry['seconds']:.1f}s)"
+    elif entry["error"]:
+        line += f" ({entry['error']})"
+    print(line, flush=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from pdf2image import pdfinfo_from_path
+from PIL import Image
+
+from conversion import LIBREOFFICE_MODES, ConversionMode, ConversionRequest
+from pipeline import PipelineJobInput, Rasterize, ToPdf, ToPptx
+
+_MIB = 1024 * 1024
+# Interpreter-side bookkeeping every job needs regardless of its inputs.
+_JOB_OVERHEAD = 64 * _MIB
+_SOFFICE_PROCESS = 400 * _MIB
+_TESSERACT_PROCESS = 100 * _MIB
+_LETTER_POINTS = (612.0, 792.0)
+# Used only when pdfinfo cannot read the page count in time.
+_BYTES_PER_PDF_PAGE = 50 * 1024
+# Estimates run on the submitting thread (the GUI's main thread), so pdfinfo
+# gets only a moment before the size-based guess is used instead.
+_PDFINFO_TIMEOUT = 2.0
+
+
+def estimate_job_memory(kind: str, job: object) -> int:
+    """Rough peak memory, in bytes, of running a ``ServiceLayer`` job.
+
+    Raster work is sized from page count x DPI² x 3 channels (read with
+    pdfinfo, falling back to the file size if it is slow or fails) or from
+    image dimensions; everything else from file sizes.
+    Estimates err high, but they are a guide for the queue's memory budget,
+    not a limit.
+    """
+    if kind == "conversion":
+        return _JOB_OVERHEAD + _conversion_memory(job)
+    if kind == "ocr_image":
+        return _JOB_OVERHEAD + _TESSERACT_PROCESS + 2 * _decoded_image_size(job.input_path)
+    if kind == "ocr_pdf":
+        return _JOB_OVERHEAD + _TESSERACT_PROCESS + _pdf_raster_size(job.input_path, job.dpi)
+    if kind == "glossary":
+        # Inputs are read one after another; only the extracted texts pile up.
+        largest = max((_text_source_memory(path, job.dpi) for path in job.input_paths), default=0)
+        return _JOB_OVERHEAD + largest + _total_size(job.input_paths)
+    if kind == "ppt_extract":
+        return _JOB_OVERHEAD + _TESSERACT_PROCESS + 5 * _file_size(job.input_path)
+    if kind == "pipeline":
+        return _JOB_OVERHEAD + _pipeline_memory(job)
+    return _JOB_OVERHEAD
+
+
+def _conversion_memory(request: ConversionRequest) -> int:
+    mode = ConversionMode(request.mode)
+    sizes = [_file_size(path) for path in request.input_paths]
+    if mode in LIBREOFFICE_MODES:
+        # Batches run one soffice at a time; a pool's instances are already running.
+        return 4 * max(sizes, default=0) + _SOFFICE_PROCESS
+    if mode == ConversionMode.PDF_TO_PPTX:
+        if not request.input_paths:
+            # Nothing to estimate; the conversion itself reports the error.
+            return 0
+        pages, page_bytes = _pdf_pages(request.input_paths[0], request.dpi)
+        first = request.first_page or 1
+        last = min(request.last_page or pages, pages)
+        selected = max(1, last - first + 1)
+        workers = min(request.workers or os.cpu_count() or 1, selected)
+        # Pages being rendered and the encoding window, plus every encoded
+        # slide image, which python-pptx holds until the file is saved.
+        return min(3 * workers, selected) * page_bytes + selected * page_bytes // 8
+    if mode == ConversionMode.PDF_TO_DOCX:
+        processes = request.workers or os.cpu_count() or 1
+        return 30 * max(sizes, default=0) * processes
+    # Images to PDF: a window of decoded images, two per worker.
+    window = min(len(request.input_paths), 2 * (os.cpu_count() or 1) + 1)
+    largest = max((_decoded_image_size(path) for path in request.input_paths), default=0)
+    return window * largest
+
+
+def _pipeline_memory(request: PipelineJobInput) -> int:
+    total = 4 * _file_size(request.input_path)
+    for step in request.steps:
+        if isinstance(step, ToPdf) and request.input_path.suffix.lower() in {".docx", ".pptx"}:
+            total += _SOFFICE_PROCESS
+        elif isinstance(step, Rasterize):
+            # Office inputs have no page count yet; it is guessed from their size.
+            total += _pdf_raster_size(request.input_path, step.dpi)
+        elif isinstance(step, ToPptx):
+            total += total // 8
+    return total
+
+
+def _text_source_memory(path: Path, dpi: int) -> int:
+    if path.suffix.lower() == ".pdf":
+        return _TESSERACT_PROCESS + _pdf_raster_size(path, dpi)
+    return 10 * _file_size(path)
+
+
+def _pdf_raster_size(path: Path, dpi: int) -> int:
+    """All pages rendered at once, as ``convert_from_path`` does."""
+    pages, page_bytes = _pdf_pages(path, dpi)
+    return pages * page_bytes
+
+
+def _pdf_pages(path: Path, dpi: int) -> Tuple[int, int]:
+    """Page count and the RGB size of one page rendered at ``dpi``."""
+    width, height = _LETTER_POINTS
+    pages: Optional[int] = None
+    if path.suffix.lower() == ".pdf":
+        try:
+            info = pdfinfo_from_path(str(path), timeout=_PDFINFO_TIMEOUT)
+            pages = int(info["Pages"])
+            width, height = _parse_page_size(info.get("Page size", ""))
+        except Exception:  # noqa: BLE001
+            pages = None
+    if pages is None:
+        pages = max(1, _file_size(path) // _BYTES_PER_PDF_PAGE)
+    page_bytes = int(width * dpi / 72) * int(height * dpi / 72) * 3
+    return pages, page_bytes
+
+
+def _parse_page_size(text: str) -> Tuple[float, float]:
+    # pdfinfo prints e.g. "612 x 792 pts (letter)".
+    parts = text.split()
+    try:
+        return float(parts[0]), float(parts[2])
+    except (IndexError, ValueError):
+        return _LETTER_POINTS
+
+
+def _decoded_image_size(path: Path) -> int:
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            return width * height * len(image.getbands())
+    except Exception:  # noqa: BLE001
+        return 10 * _file_size(path)
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _total_size(paths: Iterable[Path]) -> int:
+    return sum(_file_size(path) for path in paths)
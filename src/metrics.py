@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:  # Optional; only needed where /proc and resource are missing.
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+if TYPE_CHECKING:
+    from task_queue import TaskRecord
+
+
+@dataclass(frozen=True)
+class StageMetrics:
+    """Measurements of one instrumented stage of a task.
+
+    ``cpu_seconds`` is CPU time of the calling thread; ``child_cpu_seconds``
+    covers subprocesses (Tesseract, LibreOffice, Poppler) that exited during
+    the stage. Peak RSS and bytes read/written are process-wide, so they are
+    only exact for one task at a time. Values the platform cannot measure
+    are ``None``.
+    """
+
+    stage: str
+    wall_seconds: float
+    cpu_seconds: float
+    child_cpu_seconds: Optional[float]
+    peak_rss_bytes: Optional[int]
+    bytes_read: Optional[int]
+    bytes_written: Optional[int]
+
+
+_RECORDER: contextvars.ContextVar[Optional[List[StageMetrics]]] = contextvars.ContextVar(
+    "metrics_recorder", default=None
+)
+_RECORDER_LOCK = threading.Lock()
+_PROMETHEUS_KEYS = ("count", "wall", "cpu", "child_cpu", "read", "written", "peak_rss")
+
+
+@contextlib.contextmanager
+def record_metrics(into: List[StageMetrics]) -> Iterator[List[StageMetrics]]:
+    """Collect the spans finished inside this block (on this context) into ``into``."""
+    token = _RECORDER.set(into)
+    try:
+        yield into
+    finally:
+        _RECORDER.reset(token)
+
+
+@contextlib.contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a stage; does nothing unless a recorder is active."""
+    recorder = _RECORDER.get()
+    if recorder is None:
+        yield
+        return
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    child_start = _child_cpu()
+    io_start = _io_counters()
+    try:
+        yield
+    finally:
+        child_end = _child_cpu()
+        io_end = _io_counters()
+        metrics = StageMetrics(
+            stage=stage,
+            wall_seconds=time.perf_counter() - wall_start,
+            cpu_seconds=time.thread_time() - cpu_start,
+            child_cpu_seconds=_delta(child_start, child_end),
+            peak_rss_bytes=_peak_rss(),
+            bytes_read=_delta(io_start[0], io_end[0]),
+            bytes_written=_delta(io_start[1], io_end[1]),
+        )
+        with _RECORDER_LOCK:
+            recorder.append(metrics)
+
+
+def write_jsonl(records: Iterable[TaskRecord], path: Path) -> None:
+    """Append one JSON line per task: its id, kind, status and stage metrics."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as handle:
+        for record in records:
+            line = {
+                "task_id": record.task_id,
+                "description": record.description,
+                "kind": record.kind,
+                "status": record.status.value,
+                "created_at": _isoformat(record.created_at),
+                "started_at": _isoformat(record.started_at),
+                "finished_at": _isoformat(record.finished_at),
+                "stages": [asdict(stage) for stage in record.metrics],
+            }
+            handle.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+
+def write_prometheus(records: Iterable[TaskRecord], path: Path, prefix: str = "shfh") -> None:
+    """Write per-stage totals in the Prometheus text format.
+
+    The file is replaced atomically, so a node_exporter textfile collector
+    never reads a half-written file.
+    """
+    totals: Dict[str, Dict[str, float]] = {}
+    for record in records:
+        for stage in record.metrics:
+            entry = totals.setdefault(stage.stage, dict.fromkeys(_PROMETHEUS_KEYS, 0))
+            entry["count"] += 1
+            entry["wall"] += stage.wall_seconds
+            entry["cpu"] += stage.cpu_seconds
+            entry["child_cpu"] += stage.child_cpu_seconds or 0.0
+            entry["read"] += stage.bytes_read or 0
+            entry["written"] += stage.bytes_written or 0
+            entry["peak_rss"] = max(entry["peak_rss"], stage.peak_rss_bytes or 0)
+
+    series: List[Tuple[str, str, str, str]] = [
+        ("stage_runs_total", "counter", "count", "Number of times the stage ran."),
+        ("stage_wall_seconds_total", "counter", "wall", "Wall-clock time spent in the stage."),
+        ("stage_cpu_seconds_total", "counter", "cpu", "Thread CPU time spent in the stage."),
+        ("stage_child_cpu_seconds_total", "counter", "child_cpu", "Subprocess CPU time spent in the stage."),
+        ("stage_read_bytes_total", "counter", "read", "Bytes read by the process during the stage."),
+        ("stage_written_bytes_total", "counter", "written", "Bytes written by the process during the stage."),
+        ("stage_peak_rss_bytes", "gauge", "peak_rss", "Highest process peak RSS seen after the stage."),
+    ]
+    lines: List[str] = []
+    for name, metric_type, key, help_text in series:
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+        for stage, entry in sorted(totals.items()):
+            lines.append(f'{prefix}_{name}{{stage="{_escape_label(stage)}"}} {_format(entry[key])}')
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    staging.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.replace(staging, path)
+
+
+def _child_cpu() -> Optional[float]:
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _peak_rss() -> Optional[int]:
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS.
+        return peak if sys.platform == "darwin" else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    return None
+
+
+def _io_counters() -> Tuple[Optional[int], Optional[int]]:
+    # rchar/wchar count reads served from the page cache too, unlike psutil
+    # on Linux; psutil covers Windows and macOS.
+    try:
+        fields = dict(
+            line.split(": ", 1) for line in Path("/proc/self/io").read_text().splitlines()
+        )
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        pass
+    if psutil is not None:
+        try:
+            counters = psutil.Process().io_counters()
+            return counters.read_bytes, counters.write_bytes
+        except (AttributeError, psutil.Error):
+            pass
+    return None, None
+
+
+def _delta(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return end - start
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    return repr(value) if isinstance(value, float) else str(value)
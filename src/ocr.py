@@ -3,13 +3,17 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 import os
-from typing import Iterable, List
+from typing import Iterable, List, Optional
 
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+from pdf2image.exceptions import PDFPopplerTimeoutError
 from PIL import Image
 import pytesseract
 
+from metrics import span
+from progress import ProgressCallback, report
 from runtime_paths import get_app_root
+from watchdog import RETRIES, ProcessTimeout, stage_timeout
 
 @dataclass(frozen=True)
 class OcrRequest:
@@ -42,37 +46,100 @@ def ocr_image(request: OcrRequest) -> OcrResult:
     if not request.input_path.exists():
         raise OcrError(f"Input image not found: {request.input_path}")
 
-    with Image.open(request.input_path) as image:
-        text = pytesseract.image_to_string(image, lang=request.language)
+    with span("ocr.tesseract"), Image.open(request.input_path) as image:
+        text = image_to_text(image, request.language)
 
     return OcrResult(text=text, pages=[OcrPageResult(page_number=1, text=text)])
 
 
-def ocr_pdf(request: OcrRequest) -> OcrResult:
+def ocr_pdf(request: OcrRequest, progress: Optional[ProgressCallback] = None) -> OcrResult:
+    """OCR every page; ``progress`` hears about rendering, then each recognized page."""
     setup_tesseract()
     if not request.input_path.exists():
         raise OcrError(f"Input PDF not found: {request.input_path}")
 
+    report(progress, "render", 0, 1, request.input_path.name)
+    timeout = render_timeout(request.input_path)
     try:
-        images = convert_from_path(str(request.input_path), dpi=request.dpi)
+        with span("ocr.render"):
+            images = RETRIES["poppler"].run(
+                lambda: _render_pdf(request.input_path, request.dpi, timeout)
+            )
+    except ProcessTimeout as exc:
+        raise OcrError(f"Failed to render PDF pages: {exc}") from exc
     except Exception as exc:  # noqa: BLE001
         raise OcrError(
             "Failed to render PDF pages. Ensure Poppler is installed and in PATH."
         ) from exc
 
-    pages = _ocr_images(images, request.language)
+    report(progress, "render", 1, 1, request.input_path.name)
+
+    return ocr_images(images, request.language, progress)
+
+
+def ocr_images(
+    images: Iterable[Image.Image],
+    language: str = "eng",
+    progress: Optional[ProgressCallback] = None,
+) -> OcrResult:
+    """OCR already rendered page images, e.g. from an in-memory pipeline."""
+    setup_tesseract()
+    pages = _ocr_images(images, language, progress)
     text = "\n\n".join(page.text for page in pages)
     return OcrResult(text=text, pages=pages)
 
 
-def _ocr_images(images: Iterable[Image.Image], language: str) -> List[OcrPageResult]:
+def _ocr_images(
+    images: Iterable[Image.Image],
+    language: str,
+    progress: Optional[ProgressCallback] = None,
+) -> List[OcrPageResult]:
+    total = len(images) if isinstance(images, (list, tuple)) else None
     results: List[OcrPageResult] = []
-    for index, image in enumerate(images, start=1):
-        text = pytesseract.image_to_string(image, lang=language)
-        results.append(OcrPageResult(page_number=index, text=text))
+    report(progress, "ocr", 0, total)
+    with span("ocr.tesseract"):
+        for index, image in enumerate(images, start=1):
+            text = image_to_text(image, language)
+            results.append(OcrPageResult(page_number=index, text=text))
+            report(progress, "ocr", index, total)
     return results
 
 
+def image_to_text(image: Image.Image, language: str = "eng") -> str:
+    """Run Tesseract on one image, killing it if it runs past its stage timeout."""
+    timeout = stage_timeout("tesseract", size_bytes=image.width * image.height * len(image.getbands()))
+
+    def run() -> str:
+        try:
+            return pytesseract.image_to_string(image, lang=language, timeout=timeout)
+        except RuntimeError as exc:
+            # pytesseract signals its own timeout with a bare RuntimeError.
+            if "timeout" in str(exc).lower():
+                raise ProcessTimeout("tesseract", timeout) from exc
+            raise
+
+    try:
+        return RETRIES["tesseract"].run(run)
+    except ProcessTimeout as exc:
+        raise OcrError(str(exc)) from exc
+
+
+def render_timeout(path: Path) -> float:
+    """The ``poppler`` stage timeout for rendering every page of ``path``."""
+    try:
+        pages = int(pdfinfo_from_path(str(path), timeout=stage_timeout("poppler"))["Pages"])
+    except Exception:  # noqa: BLE001
+        pages = 0
+    return stage_timeout("poppler", pages=pages, size_bytes=path.stat().st_size)
+
+
+def _render_pdf(path: Path, dpi: int, timeout: float) -> List[Image.Image]:
+    try:
+        return convert_from_path(str(path), dpi=dpi, timeout=timeout)
+    except PDFPopplerTimeoutError as exc:
+        raise ProcessTimeout("poppler", timeout, path.name) from exc
+
+
 def setup_tesseract() -> None:
     """Configure pytesseract to use bundled binaries when available."""
     global _TESSERACT_READY
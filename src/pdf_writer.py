@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Sequence
+
+from PIL import Image
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_COLOR_SPACES = {0: ("DeviceGray", 1), 2: ("DeviceRGB", 3)}
+_JPEG_COLOR_SPACES = {"L": "DeviceGray", "RGB": "DeviceRGB", "CMYK": "DeviceCMYK"}
+
+
+@dataclass(frozen=True)
+class PdfImage:
+    """Image data ready to be written as a PDF image XObject."""
+
+    data: bytes
+    width: int
+    height: int
+    color_space: str
+    filter: str
+    bits_per_component: int = 8
+    decode_parms: Optional[Dict[str, object]] = None
+    decode: Optional[Sequence[float]] = None
+
+
+class StreamingPdfWriter:
+    """Write a PDF one image page at a time.
+
+    Only the byte offsets of written objects are kept in memory, so the cost
+    of a document does not grow with its page count.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file: Optional[BinaryIO] = path.open("wb")
+        self._offsets: Dict[int, int] = {}
+        self._page_ids: List[int] = []
+        # Objects 1 and 2 (catalog and page tree) are written on close.
+        self._next_id = 3
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self) -> "StreamingPdfWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def add_image_page(
+        self,
+        image: PdfImage,
+        page_width: Optional[float] = None,
+        page_height: Optional[float] = None,
+    ) -> None:
+        """Add a page showing ``image`` stretched over the whole page.
+
+        Page sizes are in points and default to one point per pixel, matching
+        Pillow's PDF output at its default 72 DPI resolution.
+        """
+        width = float(page_width if page_width is not None else image.width)
+        height = float(page_height if page_height is not None else image.height)
+
+        entries = {
+            "Type": "/XObject",
+            "Subtype": "/Image",
+            "Width": image.width,
+            "Height": image.height,
+            "ColorSpace": f"/{image.color_space}",
+            "BitsPerComponent": image.bits_per_component,
+            "Filter": f"/{image.filter}",
+        }
+        if image.decode_parms:
+            entries["DecodeParms"] = _dictionary(image.decode_parms)
+        if image.decode:
+            entries["Decode"] = "[" + " ".join(_number(value) for value in image.decode) + "]"
+        image_id = self._write_stream(entries, image.data)
+
+        content = f"q {_number(width)} 0 0 {_number(height)} 0 0 cm /Im0 Do Q".encode("ascii")
+        content_id = self._write_stream({}, content)
+
+        page_id = self._write_object(
+            "<< /Type /Page /Parent 2 0 R "
+            f"/MediaBox [0 0 {_number(width)} {_number(height)}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+            f"/Contents {content_id} 0 R >>".encode("ascii")
+        )
+        self._page_ids.append(page_id)
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode("ascii"),
+            object_id=2,
+        )
+        self._write_object(b"<< /Type /Catalog /Pages 2 0 R >>", object_id=1)
+
+        xref_offset = self._file.tell()
+        size = self._next_id
+        self._file.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode("ascii"))
+        for object_id in range(1, size):
+            self._file.write(f"{self._offsets[object_id]:010d} 00000 n \n".encode("ascii"))
+        self._file.write(
+            f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii")
+        )
+        self._file.close()
+        self._file = None
+
+    def abort(self) -> None:
+        """Close and remove a partially written file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.path.unlink(missing_ok=True)
+
+    def _write_stream(self, entries: Dict[str, object], data: bytes) -> int:
+        entries = dict(entries, Length=len(data))
+        header = _dictionary(entries).encode("ascii")
+        return self._write_object(header + b"\nstream\n" + data + b"\nendstream")
+
+    def _write_object(self, body: bytes, object_id: Optional[int] = None) -> int:
+        if object_id is None:
+            object_id = self._next_id
+            self._next_id += 1
+        self._offsets[object_id] = self._file.tell()
+        self._file.write(f"{object_id} 0 obj\n".encode("ascii"))
+        self._file.write(body)
+        self._file.write(b"\nendobj\n")
+        return object_id
+
+
+def load_embeddable_image(path: Path) -> Optional[PdfImage]:
+    """Return the file's compressed data as a PdfImage if PDF can embed it as is.
+
+    Baseline/progressive JPEGs and non-interlaced 8-bit grayscale or RGB PNGs
+    qualify; anything else returns ``None`` and has to be decoded.
+    """
+    with Image.open(path) as image:
+        image_format = image.format
+        mode = image.mode
+        size = image.size
+        adobe = "adobe" in image.info
+
+    if image_format == "JPEG" and mode in _JPEG_COLOR_SPACES:
+        decode = [1.0, 0.0] * 4 if mode == "CMYK" and adobe else None
+        return PdfImage(
+            data=path.read_bytes(),
+            width=size[0],
+            height=size[1],
+            color_space=_JPEG_COLOR_SPACES[mode],
+            filter="DCTDecode",
+            decode=decode,
+        )
+    if image_format == "PNG":
+        return _load_png_passthrough(path)
+    return None
+
+
+def encode_image(image: Image.Image, compression: str = "flate", jpeg_quality: int = 85) -> PdfImage:
+    """Encode a decoded image for embedding.
+
+    ``compression`` is ``flate`` (lossless), ``jpeg`` or ``ccitt`` (Group 4,
+    bilevel images only). Bilevel (mode ``1``) images stay at one bit per
+    pixel; other modes become grayscale or RGB.
+    """
+    if image.mode == "1":
+        if compression == "ccitt":
+            encoded = _encode_ccitt(image)
+            if encoded is not None:
+                return encoded
+        return PdfImage(
+            data=zlib.compress(image.tobytes(), 6),
+            width=image.width,
+            height=image.height,
+            color_space="DeviceGray",
+            filter="FlateDecode",
+            bits_per_component=1,
+        )
+
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("L" if image.mode in ("LA", "I", "I;16", "F") else "RGB")
+    color_space = "DeviceGray" if image.mode == "L" else "DeviceRGB"
+    if compression == "jpeg":
+        stream = BytesIO()
+        image.save(stream, format="JPEG", quality=jpeg_quality)
+        return PdfImage(
+            data=stream.getvalue(),
+            width=image.width,
+            height=image.height,
+            color_space=color_space,
+            filter="DCTDecode",
+        )
+    return PdfImage(
+        data=zlib.compress(image.tobytes(), 6),
+        width=image.width,
+        height=image.height,
+        color_space=color_space,
+        filter="FlateDecode",
+    )
+
+
+def encode_image_file(path: Path) -> PdfImage:
+    with Image.open(path) as image:
+        return encode_image(image)
+
+
+def _encode_ccitt(image: Image.Image) -> Optional[PdfImage]:
+    """Group 4 encode through Pillow's libtiff writer, or ``None`` if unavailable."""
+    stream = BytesIO()
+    try:
+        # One strip: separately encoded strips cannot be concatenated.
+        image.save(stream, format="TIFF", compression="group4", strip_size=2**31 - 1)
+    except (OSError, KeyError):
+        return None
+    stream.seek(0)
+    with Image.open(stream) as tiff:
+        offsets = tiff.tag_v2.get(273)
+        counts = tiff.tag_v2.get(279)
+        photometric = tiff.tag_v2.get(262, 0)
+    if not offsets or len(offsets) != 1:
+        return None
+    data = stream.getvalue()[offsets[0] : offsets[0] + counts[0]]
+    return PdfImage(
+        data=data,
+        width=image.width,
+        height=image.height,
+        color_space="DeviceGray",
+        filter="CCITTFaxDecode",
+        bits_per_component=1,
+        decode_parms={
+            "K": -1,
+            "Columns": image.width,
+            "Rows": image.height,
+            "BlackIs1": "true" if photometric == 1 else "false",
+        },
+    )
+
+
+def _load_png_passthrough(path: Path) -> Optional[PdfImage]:
+    with path.open("rb") as handle:
+        if handle.read(8) != _PNG_SIGNATURE:
+            return None
+        header: Optional[tuple] = None
+        idat: List[bytes] = []
+        while True:
+            prefix = handle.read(8)
+            if len(prefix) < 8:
+                return None
+            length, chunk_type = struct.unpack(">I4s", prefix)
+            data = handle.read(length)
+            handle.read(4)  # CRC
+            if chunk_type == b"IHDR":
+                header = struct.unpack(">IIBBBBB", data)
+                _, _, bit_depth, color_type, _, _, interlace = header
+                if bit_depth != 8 or interlace != 0 or color_type not in _PNG_COLOR_SPACES:
+                    return None
+            elif chunk_type == b"IDAT":
+                idat.append(data)
+            elif chunk_type == b"IEND":
+                break
+
+    if header is None or not idat:
+        return None
+    width, height, bit_depth, color_type = header[:4]
+    color_space, colors = _PNG_COLOR_SPACES[color_type]
+    return PdfImage(
+        data=b"".join(idat),
+        width=width,
+        height=height,
+        color_space=color_space,
+        filter="FlateDecode",
+        bits_per_component=bit_depth,
+        decode_parms={"Predictor": 15, "Colors": colors, "BitsPerComponent": bit_depth, "Columns": width},
+    )
+
+
+def _dictionary(entries: Dict[str, object]) -> str:
+    parts = " ".join(f"/{key} {_value(value)}" for key, value in entries.items())
+    return f"<< {parts} >>"
+
+
+def _value(value: object) -> str:
+    if isinstance(value, dict):
+        return _dictionary(value)
+    if isinstance(value, float):
+        return _number(value)
+    return str(value)
+
+
+def _number(value: float) -> str:
+    text = f"{value:.4f}".rstrip("0").rstrip(".")
+    return text or "0"
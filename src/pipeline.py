@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import tempfile
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from pdf2image import convert_from_bytes, convert_from_path
+from pdf2image.exceptions import PDFPopplerTimeoutError
+from PIL import Image
+
+from conversion import (
+    ConversionError,
+    ConversionMode,
+    ConversionRequest,
+    ImageEncoding,
+    convert,
+    images_to_pptx,
+)
+from glossary import GlossaryRequest, generate_glossary
+from libreoffice_pool import LibreOfficePool
+from ocr import OcrError, ocr_images
+from text_extract import TextExtractRequest, extract_text
+from watchdog import ProcessTimeout, stage_timeout
+
+_OFFICE_MODES = {".docx": ConversionMode.DOCX_TO_PDF, ".pptx": ConversionMode.PPTX_TO_PDF}
+_IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".gif", ".webp"}
+
+
+class PipelineError(RuntimeError):
+    pass
+
+
+@dataclass
+class StageValue:
+    """The data handed from one pipeline step to the next.
+
+    ``kind`` is one of ``file`` (a path on disk), ``pdf`` / ``pptx`` (document
+    bytes), ``images`` (rendered pages) or ``text``.
+    """
+
+    kind: str
+    path: Optional[Path] = None
+    data: Optional[bytes] = None
+    images: List[Image.Image] = field(default_factory=list)
+    text: Optional[str] = None
+
+
+@dataclass
+class PipelineContext:
+    scratch_dir: Path
+    libreoffice_pool: Optional[LibreOfficePool] = None
+
+
+@dataclass(frozen=True)
+class ToPdf:
+    """file (DOCX, PPTX, PDF or image) -> pdf bytes."""
+
+    def apply(self, value: StageValue, context: PipelineContext) -> StageValue:
+        path = _expect(value, "file").path
+        suffix = path.suffix.lower()
+        if suffix == ".pdf":
+            return StageValue(kind="pdf", data=path.read_bytes())
+
+        if suffix in _OFFICE_MODES:
+            mode = _OFFICE_MODES[suffix]
+        elif suffix in _IMAGE_SUFFIXES:
+            mode = ConversionMode.IMAGE_TO_PDF
+        else:
+            raise PipelineError(f"Cannot convert {suffix} to PDF.")
+
+        scratch_output = context.scratch_dir / f"{path.stem}.pdf"
+        try:
+            convert(
+                ConversionRequest(mode=mode, input_paths=[path], output_path=scratch_output),
+                libreoffice_pool=context.libreoffice_pool,
+            )
+            return StageValue(kind="pdf", data=scratch_output.read_bytes())
+        finally:
+            scratch_output.unlink(missing_ok=True)
+
+
+@dataclass(frozen=True)
+class Rasterize:
+    """pdf bytes or PDF file -> page images."""
+
+    dpi: int = 300
+
+    def apply(self, value: StageValue, context: PipelineContext) -> StageValue:
+        try:
+            if value.kind == "pdf":
+                timeout = stage_timeout("poppler", size_bytes=len(value.data or b""))
+                images = convert_from_bytes(value.data, dpi=self.dpi, timeout=timeout)
+            else:
+                path = _expect(value, "file").path
+                timeout = stage_timeout("poppler", size_bytes=path.stat().st_size)
+                images = convert_from_path(str(path), dpi=self.dpi, timeout=timeout)
+        except PipelineError:
+            raise
+        except PDFPopplerTimeoutError:
+            timed_out = ProcessTimeout("poppler", timeout)
+            raise PipelineError(f"Failed to render PDF pages: {timed_out}") from timed_out
+        except Exception as exc:  # noqa: BLE001
+            raise PipelineError(
+                "Failed to render PDF pages. Ensure Poppler is installed and in PATH."
+            ) from exc
+        return StageValue(kind="images", images=images)
+
+
+@dataclass(frozen=True)
+class Ocr:
+    """page images -> text."""
+
+    language: str = "eng"
+
+    def apply(self, value: StageValue, context: PipelineContext) -> StageValue:
+        result = ocr_images(_expect(value, "images").images, self.language)
+        return StageValue(kind="text", text=result.text)
+
+
+@dataclass(frozen=True)
+class ExtractText:
+    """file (TXT, DOCX, PPTX or PDF) -> text."""
+
+    language: str = "eng"
+    dpi: int = 300
+
+    def apply(self, value: StageValue, context: PipelineContext) -> StageValue:
+        path = _expect(value, "file").path
+        text = extract_text(TextExtractRequest(input_path=path, language=self.language, dpi=self.dpi))
+        return StageValue(kind="text", text=text)
+
+
+@dataclass(frozen=True)
+class Glossary:
+    """text -> formatted glossary text."""
+
+    top_k: int = 30
+    window_size: int = 4
+    min_term_length: int = 2
+    output_format: str = "txt"
+
+    def apply(self, value: StageValue, context: PipelineContext) -> StageValue:
+        result = generate_glossary(
+            GlossaryRequest(
+                texts=[_expect(value, "text").text],
+                top_k=self.top_k,
+                window_size=self.window_size,
+                min_term_length=self.min_term_length,
+            )
+        )
+        return StageValue(kind="text", text=result.to_text(self.output_format))
+
+
+@dataclass(frozen=True)
+class ToPptx:
+    """page images -> pptx bytes."""
+
+    image_encoding: ImageEncoding = ImageEncoding.AUTO
+
+    def apply(self, value: StageValue, context: PipelineContext) -> StageValue:
+        stream = BytesIO()
+        images_to_pptx(_expect(value, "images").images, stream, self.image_encoding)
+        return StageValue(kind="pptx", data=stream.getvalue())
+
+
+PIPELINE_STEPS: Dict[str, type] = {
+    step.__name__: step for step in (ToPdf, Rasterize, Ocr, ExtractText, Glossary, ToPptx)
+}
+
+
+@dataclass(frozen=True)
+class PipelineJobInput:
+    """Run ``steps`` over ``input_path`` and write the final value to ``output_path``.
+
+    e.g. ``[ToPdf(), Rasterize(), Ocr("eng")]`` OCRs a DOCX of scanned pages
+    and ``[Rasterize(200), ToPptx()]`` turns a PDF into slides, with nothing
+    but the final output written outside the scratch directory.
+    """
+
+    input_path: Path
+    output_path: Path
+    steps: Sequence[object]
+
+
+def run_pipeline(
+    request: PipelineJobInput,
+    libreoffice_pool: Optional[LibreOfficePool] = None,
+) -> Path:
+    if not request.input_path.exists():
+        raise PipelineError(f"Input file not found: {request.input_path}")
+    if not request.steps:
+        raise PipelineError("A pipeline needs at least one step.")
+
+    with tempfile.TemporaryDirectory(prefix="shfh-pipeline-", dir=_scratch_root()) as scratch:
+        context = PipelineContext(scratch_dir=Path(scratch), libreoffice_pool=libreoffice_pool)
+        value = StageValue(kind="file", path=request.input_path)
+        for step in request.steps:
+            try:
+                value = step.apply(value, context)
+            except (ConversionError, OcrError) as exc:
+                raise PipelineError(f"{type(step).__name__} failed: {exc}") from exc
+
+    request.output_path.parent.mkdir(parents=True, exist_ok=True)
+    if value.kind == "text":
+        request.output_path.write_text(value.text or "", encoding="utf-8")
+    elif value.kind in {"pdf", "pptx"}:
+        request.output_path.write_bytes(value.data or b"")
+    else:
+        raise PipelineError(f"A pipeline cannot end with '{value.kind}' data.")
+    return request.output_path
+
+
+def _expect(value: StageValue, kind: str) -> StageValue:
+    if value.kind != kind:
+        raise PipelineError(f"Expected a '{kind}' value but got '{value.kind}'.")
+    return value
+
+
+def _scratch_root() -> Optional[str]:
+    """Prefer a RAM-backed tmpfs for files that external tools need on disk."""
+    shm = Path("/dev/shm")
+    if shm.is_dir():
+        try:
+            with tempfile.TemporaryFile(dir=shm):
+                return str(shm)
+        except OSError:
+            pass
+    return None
@@ -3,14 +3,15 @@ from __future__ import annotations
 from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, List, Optional
 
 from PIL import Image
 from pptx import Presentation
 from pptx.enum.shapes import MSO_SHAPE_TYPE
-import pytesseract
 
-from ocr import setup_tesseract
+from metrics import span
+from ocr import OcrError, image_to_text, setup_tesseract
+from progress import ProgressCallback, report
 
 @dataclass(frozen=True)
 class PptExtractRequest:
@@ -41,22 +42,29 @@ class PptExtractError(RuntimeError):
     pass
 
 
-def extract_ppt_text(request: PptExtractRequest) -> PptExtractResult:
+def extract_ppt_text(
+    request: PptExtractRequest, progress: Optional[ProgressCallback] = None
+) -> PptExtractResult:
     setup_tesseract()
     if not request.input_path.exists():
         raise PptExtractError(f"Input file not found: {request.input_path}")
 
     try:
-        presentation = Presentation(str(request.input_path))
+        with span("ppt_extract.parse"):
+            presentation = Presentation(str(request.input_path))
     except Exception as exc:  # noqa: BLE001
         raise PptExtractError(f"Failed to read PPTX: {request.input_path}") from exc
 
+    total = len(presentation.slides)
     slides: List[SlideText] = []
-    for index, slide in enumerate(presentation.slides, start=1):
-        lines: List[str] = []
-        for shape in slide.shapes:
-            lines.extend(_extract_shape_text(shape, request.language))
-        slides.append(SlideText(slide_number=index, lines=_dedupe_lines(lines)))
+    report(progress, "slides", 0, total)
+    with span("ppt_extract.slides"):
+        for index, slide in enumerate(presentation.slides, start=1):
+            lines: List[str] = []
+            for shape in slide.shapes:
+                lines.extend(_extract_shape_text(shape, request.language))
+            slides.append(SlideText(slide_number=index, lines=_dedupe_lines(lines)))
+            report(progress, "slides", index, total)
 
     return PptExtractResult(slides=slides)
 
@@ -82,7 +90,10 @@ def _extract_shape_text(shape, language: str) -> List[str]:
             image = Image.open(BytesIO(shape.image.blob))
         except Exception:  # noqa: BLE001
             return lines
-        ocr_text = pytesseract.image_to_string(image, lang=language)
+        try:
+            ocr_text = image_to_text(image, language)
+        except OcrError as exc:
+            raise PptExtractError(f"OCR of a picture failed: {exc}") from exc
         for line in ocr_text.splitlines():
             cleaned = line.strip()
             if cleaned:
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """How far a job has got: ``done`` of ``total`` units (pages, slides, files) in ``stage``."""
+
+    stage: str
+    done: int
+    total: Optional[int] = None
+    detail: Optional[str] = None
+
+    @property
+    def fraction(self) -> Optional[float]:
+        if not self.total:
+            return None
+        return min(1.0, self.done / self.total)
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class ProgressThrottle:
+    """Forward at most one event per ``interval`` seconds to ``callback``.
+
+    The first event of a stage and the one completing it are always
+    forwarded, so consumers never miss a stage change or a finished count.
+    """
+
+    def __init__(self, callback: ProgressCallback, interval: float = 0.25) -> None:
+        self.callback = callback
+        self.interval = interval
+        self._stage: Optional[str] = None
+        self._last_sent = 0.0
+
+    def __call__(self, event: ProgressEvent) -> None:
+        now = time.monotonic()
+        finished = event.total is not None and event.done >= event.total
+        if event.stage != self._stage or finished or now - self._last_sent >= self.interval:
+            self._stage = event.stage
+            self._last_sent = now
+            self.callback(event)
+
+
+def report(
+    progress: Optional[ProgressCallback],
+    stage: str,
+    done: int,
+    total: Optional[int] = None,
+    detail: Optional[str] = None,
+) -> None:
+    """Send an event if there is anyone to send it to."""
+    if progress is not None:
+        progress(ProgressEvent(stage=stage, done=done, total=total, detail=detail))
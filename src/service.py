@@ -1,16 +1,33 @@
 from __future__ import annotations
 
+import dataclasses
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
-from typing import List, Sequence
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
 
-from conversion import ConversionMode, ConversionRequest, convert
+from artifact_store import ArtifactStore, hash_files
+from conversion import ConversionMode, ConversionRequest, convert, convert_batch
 from glossary import GlossaryRequest, generate_glossary
+from libreoffice_pool import LibreOfficePool
+from memory_estimate import estimate_job_memory
+from metrics import span
 from ocr import OcrRequest, ocr_image, ocr_pdf
+from pipeline import PipelineJobInput, run_pipeline
 from ppt_extract import PptExtractRequest, extract_ppt_text
-from task_queue import TaskQueue, TaskRecord
+from progress import report
+from task_queue import TaskQueue, TaskRecord, TaskStatus, task_progress
 from text_extract import TextExtractRequest, extract_text
 
+if TYPE_CHECKING:
+    from task_journal import TaskJournal
+
 
 @dataclass(frozen=True)
 class GlossaryJobInput:
@@ -40,65 +57,284 @@ class PptExtractJobInput:
 
 
 class ServiceLayer:
-    def __init__(self) -> None:
-        self.queue = TaskQueue()
+    """Queues jobs as tasks; pass a concurrent ``TaskQueue`` to run them in parallel.
 
-    def submit_conversion(self, request: ConversionRequest) -> TaskRecord:
-        return self.queue.enqueue(
-            description=f"Convert {request.mode}",
-            handler=lambda: convert(request),
-        )
+    Every job is a frozen dataclass identified by a kind (``conversion``,
+    ``ocr_image``, ``ocr_pdf``, ``glossary``, ``ppt_extract``, ``pipeline``)
+    and is kept on its ``TaskRecord`` so it can be journaled and replayed.
+    Handlers are ``functools.partial`` objects over module-level functions so
+    that a process-pool queue can pickle them (as long as no LibreOffice pool
+    or artifact store is attached).
 
-    def submit_ocr_image(self, request: OcrJobInput) -> TaskRecord:
-        return self.queue.enqueue(
-            description=f"OCR image {request.input_path.name}",
-            handler=lambda: _run_ocr_image(request),
-        )
+    With ``coalesce=True`` a job whose input bytes and options match one that
+    is queued, running, or completed within ``coalesce_ttl`` is not run
+    again: its task waits for that one and copies the output to its own
+    ``output_path``, and runs the job itself only if the original failed or
+    was cancelled. Inputs are hashed at submission. Batch conversions are
+    never coalesced.
+    """
 
-    def submit_ocr_pdf(self, request: OcrJobInput) -> TaskRecord:
-        return self.queue.enqueue(
-            description=f"OCR PDF {request.input_path.name}",
-            handler=lambda: _run_ocr_pdf(request),
-        )
+    def __init__(
+        self,
+        libreoffice_pool: Optional[LibreOfficePool] = None,
+        artifact_store: Optional[ArtifactStore] = None,
+        queue: Optional[TaskQueue] = None,
+        journal: Optional[TaskJournal] = None,
+        coalesce: bool = False,
+        coalesce_ttl: timedelta = timedelta(minutes=10),
+    ) -> None:
+        self.queue = queue if queue is not None else TaskQueue()
+        self.libreoffice_pool = libreoffice_pool
+        self.artifact_store = artifact_store
+        self.journal = journal
+        self.coalesce = coalesce
+        self.coalesce_ttl = coalesce_ttl
+        self._coalesce_lock = threading.Lock()
+        # fingerprint -> (task doing the work, the output it writes)
+        self._coalesce_targets: "OrderedDict[str, Tuple[TaskRecord, Path]]" = OrderedDict()
+        if journal is not None:
+            self.queue.add_listener(journal.record)
+            journal.recover(self)
+
+    def submit_conversion(self, request: ConversionRequest, priority: int = 0) -> TaskRecord:
+        return self.submit_job("conversion", request, priority)
+
+    def submit_ocr_image(self, request: OcrJobInput, priority: int = 0) -> TaskRecord:
+        return self.submit_job("ocr_image", request, priority)
+
+    def submit_ocr_pdf(self, request: OcrJobInput, priority: int = 0) -> TaskRecord:
+        return self.submit_job("ocr_pdf", request, priority)
+
+    def submit_glossary(self, request: GlossaryJobInput, priority: int = 0) -> TaskRecord:
+        return self.submit_job("glossary", request, priority)
+
+    def submit_ppt_extract(self, request: PptExtractJobInput, priority: int = 0) -> TaskRecord:
+        return self.submit_job("ppt_extract", request, priority)
+
+    def submit_pipeline(self, request: PipelineJobInput, priority: int = 0) -> TaskRecord:
+        return self.submit_job("pipeline", request, priority)
+
+    def submit_job(
+        self,
+        kind: str,
+        job: object,
+        priority: int = 0,
+        task_id: Optional[str] = None,
+    ) -> TaskRecord:
+        """Queue a job by kind; ``task_id`` lets a recovered job keep its old id.
+
+        If the queue has a memory budget, the job's peak memory is estimated
+        from its inputs so the queue can decide when to start it.
+        """
+        try:
+            build = _TASK_BUILDERS[kind]
+        except KeyError as exc:
+            raise ValueError(f"Unknown job kind: {kind}") from exc
+        description, handler = build(self, job)
+        memory = estimate_job_memory(kind, job) if self.queue.memory_budget is not None else 0
+        fingerprint = _job_fingerprint(kind, job) if self.coalesce else None
+        if fingerprint is None:
+            return self.queue.enqueue(
+                description=description,
+                handler=handler,
+                priority=priority,
+                task_id=task_id,
+                kind=kind,
+                job=job,
+                memory_estimate=memory,
+            )
+
+        output_path = job.output_path
+        with self._coalesce_lock:
+            target = self._coalesce_target_locked(fingerprint)
+            if target is None:
+                record = self.queue.enqueue(
+                    description=description,
+                    handler=handler,
+                    priority=priority,
+                    task_id=task_id,
+                    kind=kind,
+                    job=job,
+                    memory_estimate=memory,
+                )
+                self._coalesce_targets[fingerprint] = (record, output_path)
+                return record
+            primary, primary_output = target
+            return self.queue.enqueue(
+                description=f"{description} (same as task {primary.task_id[:8]})",
+                handler=partial(_run_coalesced, primary, primary_output, output_path, handler),
+                priority=priority,
+                task_id=task_id,
+                kind=kind,
+                job=job,
+                depends_on=primary.task_id,
+                memory_estimate=memory,
+            )
+
+    def cancel(self, task_id: str) -> bool:
+        return self.queue.cancel(task_id)
+
+    def _coalesce_target_locked(self, fingerprint: str) -> Optional[Tuple[TaskRecord, Path]]:
+        cutoff = datetime.utcnow() - self.coalesce_ttl
+
+        def usable(record: TaskRecord, output: Path) -> bool:
+            if record.status in (TaskStatus.PENDING, TaskStatus.RUNNING):
+                return True
+            return (
+                record.status == TaskStatus.COMPLETED
+                and record.finished_at is not None
+                and record.finished_at >= cutoff
+                and output.exists()
+            )
+
+        # Drop stale entries from the oldest end; a usable one stops the sweep.
+        while self._coalesce_targets:
+            oldest_key, oldest = next(iter(self._coalesce_targets.items()))
+            if usable(*oldest):
+                break
+            del self._coalesce_targets[oldest_key]
 
-    def submit_glossary(self, request: GlossaryJobInput) -> TaskRecord:
-        return self.queue.enqueue(
-            description="Generate glossary",
-            handler=lambda: _run_glossary(request),
+        target = self._coalesce_targets.get(fingerprint)
+        if target is not None and not usable(*target):
+            del self._coalesce_targets[fingerprint]
+            return None
+        return target
+
+    def _conversion_task(self, request: ConversionRequest) -> Tuple[str, Callable[[], object]]:
+        if request.batch:
+            return (
+                f"Convert {request.mode} batch ({len(request.input_paths)} files)",
+                partial(
+                    convert_batch,
+                    request,
+                    libreoffice_pool=self.libreoffice_pool,
+                    artifact_store=self.artifact_store,
+                ),
+            )
+        return (
+            f"Convert {request.mode}",
+            partial(
+                _run_conversion,
+                request,
+                libreoffice_pool=self.libreoffice_pool,
+                artifact_store=self.artifact_store,
+            ),
         )
 
-    def submit_ppt_extract(self, request: PptExtractJobInput) -> TaskRecord:
-        return self.queue.enqueue(
-            description=f"Extract PPT {request.input_path.name}",
-            handler=lambda: _run_ppt_extract(request),
+    def _ocr_image_task(self, request: OcrJobInput) -> Tuple[str, Callable[[], object]]:
+        return f"OCR image {request.input_path.name}", partial(_run_ocr_image, request)
+
+    def _ocr_pdf_task(self, request: OcrJobInput) -> Tuple[str, Callable[[], object]]:
+        return f"OCR PDF {request.input_path.name}", partial(_run_ocr_pdf, request)
+
+    def _glossary_task(self, request: GlossaryJobInput) -> Tuple[str, Callable[[], object]]:
+        return "Generate glossary", partial(_run_glossary, request)
+
+    def _ppt_extract_task(self, request: PptExtractJobInput) -> Tuple[str, Callable[[], object]]:
+        return f"Extract PPT {request.input_path.name}", partial(_run_ppt_extract, request)
+
+    def _pipeline_task(self, request: PipelineJobInput) -> Tuple[str, Callable[[], object]]:
+        steps = " -> ".join(type(step).__name__ for step in request.steps)
+        return (
+            f"Pipeline {request.input_path.name}: {steps}",
+            partial(run_pipeline, request, libreoffice_pool=self.libreoffice_pool),
         )
 
 
+_TASK_BUILDERS: Dict[str, Callable[[ServiceLayer, object], Tuple[str, Callable[[], object]]]] = {
+    "conversion": ServiceLayer._conversion_task,
+    "ocr_image": ServiceLayer._ocr_image_task,
+    "ocr_pdf": ServiceLayer._ocr_pdf_task,
+    "glossary": ServiceLayer._glossary_task,
+    "ppt_extract": ServiceLayer._ppt_extract_task,
+    "pipeline": ServiceLayer._pipeline_task,
+}
+
+
+def _run_conversion(
+    request: ConversionRequest,
+    libreoffice_pool: Optional[LibreOfficePool],
+    artifact_store: Optional[ArtifactStore],
+) -> Path:
+    return convert(
+        request,
+        libreoffice_pool=libreoffice_pool,
+        artifact_store=artifact_store,
+        progress=task_progress(),
+    )
+
+
+def _job_fingerprint(kind: str, job: object) -> Optional[str]:
+    """Hash of a job's input bytes and options, ignoring where its output goes."""
+    if isinstance(job, ConversionRequest) and job.batch:
+        return None
+    inputs: List[Path] = []
+    options = [kind]
+    for field in dataclasses.fields(job):
+        value = getattr(job, field.name)
+        if field.name in ("output_path", "output_paths"):
+            continue
+        if field.name == "input_path":
+            inputs.append(value)
+        elif field.name == "input_paths":
+            inputs.extend(value)
+        else:
+            options.append(f"{field.name}={value!r}")
+    try:
+        return hash_files(inputs, options)
+    except OSError:
+        # Let the task itself report the missing or unreadable input.
+        return None
+
+
+def _run_coalesced(
+    primary: TaskRecord,
+    primary_output: Path,
+    output_path: Path,
+    fallback: Callable[[], object],
+) -> object:
+    if primary.status != TaskStatus.COMPLETED or not primary_output.exists():
+        return fallback()
+    if primary_output.resolve() != output_path.resolve():
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        staging = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}.tmp")
+        shutil.copyfile(primary_output, staging)
+        os.replace(staging, output_path)
+    return output_path
+
+
 def _run_ocr_image(request: OcrJobInput) -> Path:
     result = ocr_image(OcrRequest(request.input_path, request.language))
-    request.output_path.parent.mkdir(parents=True, exist_ok=True)
-    request.output_path.write_text(result.text, encoding="utf-8")
+    _write_output(request.output_path, result.text)
     return request.output_path
 
 
 def _run_ocr_pdf(request: OcrJobInput) -> Path:
-    result = ocr_pdf(OcrRequest(request.input_path, request.language, request.dpi))
-    request.output_path.parent.mkdir(parents=True, exist_ok=True)
-    request.output_path.write_text(result.text, encoding="utf-8")
+    result = ocr_pdf(
+        OcrRequest(request.input_path, request.language, request.dpi), progress=task_progress()
+    )
+    _write_output(request.output_path, result.text)
     return request.output_path
 
 
 def _run_glossary(request: GlossaryJobInput) -> Path:
-    texts = [
-        extract_text(
-            TextExtractRequest(
-                input_path=path,
-                language=request.language,
-                dpi=request.dpi,
+    progress = task_progress()
+    total = len(request.input_paths)
+    texts = []
+    for index, path in enumerate(request.input_paths):
+        report(progress, "extract", index, total, path.name)
+        texts.append(
+            extract_text(
+                TextExtractRequest(
+                    input_path=path,
+                    language=request.language,
+                    dpi=request.dpi,
+                )
             )
         )
-        for path in request.input_paths
-    ]
+    report(progress, "extract", total, total)
+
+    report(progress, "glossary", 0, 1)
     result = generate_glossary(
         GlossaryRequest(
             texts=texts,
@@ -108,13 +344,8 @@ def _run_glossary(request: GlossaryJobInput) -> Path:
         )
     )
 
-    request.output_path.parent.mkdir(parents=True, exist_ok=True)
-    if request.output_format == "json":
-        payload = [entry.__dict__ for entry in result.entries]
-        request.output_path.write_text(_to_json(payload), encoding="utf-8")
-    else:
-        lines = [f"{entry.term}\t{entry.score:.4f}" for entry in result.entries]
-        request.output_path.write_text("\n".join(lines), encoding="utf-8")
+    _write_output(request.output_path, result.to_text(request.output_format))
+    report(progress, "glossary", 1, 1)
     return request.output_path
 
 
@@ -123,14 +354,14 @@ def _run_ppt_extract(request: PptExtractJobInput) -> Path:
         PptExtractRequest(
             input_path=request.input_path,
             language=request.language,
-        )
+        ),
+        progress=task_progress(),
     )
-    request.output_path.parent.mkdir(parents=True, exist_ok=True)
-    request.output_path.write_text(result.to_text(), encoding="utf-8")
+    _write_output(request.output_path, result.to_text())
     return request.output_path
 
 
-def _to_json(payload: List[dict[str, object]]) -> str:
-    import json
-
-    return json.dumps(payload, ensure_ascii=False, indent=2)
\ No newline at end of file
+def _write_output(path: Path, text: str) -> None:
+    with span("service.write_output"):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
@@ -0,0 +1,544 @@
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from job_codec import JobCodecError, decode_job, encode_job, encode_task, to_json_value
+from libreoffice_pool import LibreOfficePool
+from service import ServiceLayer
+from task_queue import TaskQueue, TaskRecord
+
+# Descriptor names sort by priority (highest first), then submission time.
+_PRIORITY_OFFSET = 1 << 31
+
+
+class SpoolError(RuntimeError):
+    pass
+
+
+class Spool:
+    """A job queue kept in a directory that any number of hosts can share.
+
+    Layout under ``root``:
+
+    * ``jobs/`` - one JSON descriptor per queued job, written atomically;
+    * ``leases/`` - ``<task_id>.lease``, created exclusively by the worker
+      that claims the job, never rewritten, and touched on every heartbeat;
+      next to it ``<task_id>.progress``, the running task's latest progress;
+    * ``results/`` - ``<task_id>.json``, the finished task as reported by
+      :func:`job_codec.encode_task`;
+    * ``cancel/`` - markers asking the worker running a job to stop.
+
+    A lease not renewed for ``lease_seconds`` is taken to belong to a dead
+    worker and may be broken, and the job runs again, so jobs must be safe
+    to repeat. Lease ages come from file modification times; hosts sharing
+    a spool need roughly synchronised clocks (well within ``lease_seconds``).
+    Paths in jobs must mean the same thing on every host, e.g. absolute
+    paths on the shared mount.
+    """
+
+    def __init__(self, root: Path, lease_seconds: float = 60.0, max_attempts: int = 3) -> None:
+        self.root = root
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.jobs_dir = root / "jobs"
+        self.leases_dir = root / "leases"
+        self.results_dir = root / "results"
+        self.cancel_dir = root / "cancel"
+        self._staging_dir = root / "tmp"
+        for directory in (self.jobs_dir, self.leases_dir, self.results_dir, self.cancel_dir, self._staging_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def submit(self, kind: str, job: object, priority: int = 0, task_id: Optional[str] = None) -> str:
+        """Queue a job and return its task id.
+
+        Relative paths in the job are resolved against the current working
+        directory by the worker that runs it.
+        """
+        task_id = task_id or uuid.uuid4().hex
+        if not task_id.replace("-", "").replace("_", "").isalnum():
+            raise SpoolError(f"Task ids may only contain letters, digits, '-' and '_': {task_id}")
+        if self._descriptor_path(task_id) is not None or self.result_path(task_id).exists():
+            raise SpoolError(f"Duplicate task id: {task_id}")
+        priority = max(-_PRIORITY_OFFSET + 1, min(_PRIORITY_OFFSET - 1, priority))
+        descriptor = {
+            **encode_job(kind, job),
+            "task_id": task_id,
+            "priority": priority,
+            "cwd": os.getcwd(),
+            "submitted_at": time.time(),
+            "attempts": 0,
+        }
+        name = f"{_PRIORITY_OFFSET - priority:010d}-{time.time_ns():020d}-{task_id}.json"
+        self._write_json(self.jobs_dir / name, descriptor)
+        return task_id
+
+    def status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """The finished task, or its state (``pending``/``running``); None if unknown."""
+        result = _read_json(self.result_path(task_id))
+        if result is not None:
+            return result
+        lease = _read_json(self.lease_path(task_id))
+        if lease is not None and not self._is_stale(self.lease_path(task_id)):
+            progress = _read_json(self.progress_path(task_id)) or {}
+            return {
+                "task_id": task_id,
+                "status": "running",
+                "worker": lease.get("owner"),
+                "progress": progress.get("progress") if progress.get("owner") == lease.get("owner") else None,
+            }
+        descriptor_path = self._descriptor_path(task_id)
+        descriptor = _read_json(descriptor_path) if descriptor_path is not None else None
+        if descriptor is None:
+            return None
+        return {
+            "task_id": task_id,
+            "kind": descriptor.get("kind"),
+            "status": "pending",
+            "priority": descriptor.get("priority", 0),
+            "attempts": descriptor.get("attempts", 0),
+        }
+
+    def wait(self, task_id: str, timeout: Optional[float] = None, poll_interval: float = 0.5) -> Dict[str, Any]:
+        """Block until the job's result has been written; raises ``TimeoutError``."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            result = _read_json(self.result_path(task_id))
+            if result is not None:
+                return result
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Task {task_id} did not finish within {timeout:g}s")
+            time.sleep(poll_interval)
+
+    def cancel(self, task_id: str) -> bool:
+        """Cancel a queued job now, or ask the worker running it to stop.
+
+        Returns False if the job is unknown or already finished.
+        """
+        if self.result_path(task_id).exists():
+            return False
+        descriptor_path = self._descriptor_path(task_id)
+        if descriptor_path is None:
+            return False
+        owner = f"cancel:{socket.gethostname()}:{os.getpid()}"
+        if self._acquire_lease(task_id, owner):
+            self._finish_unrun(task_id, descriptor_path, owner, "cancelled", "Cancelled before start.")
+        else:
+            (self.cancel_dir / task_id).touch()
+        return True
+
+    def pending(self) -> List[str]:
+        """Descriptor names of queued jobs, in the order workers take them."""
+        return sorted(name for name in os.listdir(self.jobs_dir) if name.endswith(".json"))
+
+    def result_path(self, task_id: str) -> Path:
+        return self.results_dir / f"{task_id}.json"
+
+    def lease_path(self, task_id: str) -> Path:
+        return self.leases_dir / f"{task_id}.lease"
+
+    def progress_path(self, task_id: str) -> Path:
+        return self.leases_dir / f"{task_id}.progress"
+
+    def _descriptor_path(self, task_id: str) -> Optional[Path]:
+        suffix = f"-{task_id}.json"
+        for name in os.listdir(self.jobs_dir):
+            if name.endswith(suffix) and _task_id_from_name(name) == task_id:
+                return self.jobs_dir / name
+        return None
+
+    def _acquire_lease(self, task_id: str, owner: str) -> bool:
+        # The lease is written in full and then hard-linked into place: like
+        # O_EXCL the link fails if the lease exists, but it is also atomic on
+        # NFS and nobody ever sees a half-written lease.
+        path = self.lease_path(task_id)
+        staging = self._staging_dir / f"{uuid.uuid4().hex}.lease"
+        staging.write_text(json.dumps(_lease_body(task_id, owner)), encoding="utf-8")
+        try:
+            for _ in range(2):
+                try:
+                    os.link(staging, path)
+                    return True
+                except FileExistsError:
+                    if not self._break_stale_lease(path):
+                        return False
+            return False
+        finally:
+            staging.unlink(missing_ok=True)
+
+    def _renew_lease(self, task_id: str, owner: str, progress: Any = None) -> bool:
+        """Extend the lease if ``owner`` still holds it; False if it was lost.
+
+        The lease is only touched, never rewritten: if it was broken and
+        claimed by another worker in the meantime, the touch merely extends
+        the new owner's lease and the owner check after it fails.
+        """
+        try:
+            os.utime(self.lease_path(task_id))
+        except FileNotFoundError:
+            return False
+        if not self._holds_lease(task_id, owner):
+            return False
+        if progress is not None:
+            self._write_json(self.progress_path(task_id), {"owner": owner, "progress": progress})
+        return True
+
+    def _holds_lease(self, task_id: str, owner: str) -> bool:
+        lease = _read_json(self.lease_path(task_id))
+        return lease is not None and lease.get("owner") == owner
+
+    def _release_lease(self, task_id: str, owner: str) -> None:
+        # Moved aside before checking, so a lease claimed by another worker
+        # after the check is never the one deleted; it is put back instead.
+        path = self.lease_path(task_id)
+        tombstone = path.with_name(f"{path.name}.{uuid.uuid4().hex}.released")
+        try:
+            os.rename(path, tombstone)
+        except FileNotFoundError:
+            return
+        lease = _read_json(tombstone)
+        if lease is not None and lease.get("owner") != owner:
+            try:
+                os.link(tombstone, path)
+            except OSError:
+                pass
+        tombstone.unlink(missing_ok=True)
+
+    def _break_stale_lease(self, path: Path) -> bool:
+        """Remove an expired lease; True if the lease is gone."""
+        if not path.exists():
+            return True
+        if not self._is_stale(path):
+            return False
+        # Renaming is atomic, so only one worker breaks a given lease.
+        tombstone = path.with_name(f"{path.name}.{uuid.uuid4().hex}.stale")
+        try:
+            os.rename(path, tombstone)
+        except FileNotFoundError:
+            return True
+        if not self._is_stale(tombstone):
+            # Renewed between the check and the rename: put it back, unless
+            # someone has claimed the job in the meantime.
+            try:
+                os.link(tombstone, path)
+            except OSError:
+                pass
+            tombstone.unlink(missing_ok=True)
+            return False
+        tombstone.unlink(missing_ok=True)
+        return True
+
+    def _is_stale(self, path: Path) -> bool:
+        try:
+            return time.time() - path.stat().st_mtime >= self.lease_seconds
+        except FileNotFoundError:
+            return False
+
+    def _finish_unrun(self, task_id: str, descriptor_path: Path, owner: str, status: str, error: str) -> None:
+        """Record a result for a claimed job that will not run, and clean up after it."""
+        self._write_result(task_id, {"task_id": task_id, "status": status, "result": None, "error": error}, owner)
+        self._cleanup(task_id, descriptor_path, owner)
+
+    def _write_result(self, task_id: str, result: Dict[str, Any], owner: str) -> None:
+        self._write_json(self.result_path(task_id), {**result, "worker": owner})
+
+    def _cleanup(self, task_id: str, descriptor_path: Path, owner: str) -> None:
+        descriptor_path.unlink(missing_ok=True)
+        (self.cancel_dir / task_id).unlink(missing_ok=True)
+        self.progress_path(task_id).unlink(missing_ok=True)
+        self._release_lease(task_id, owner)
+
+    def _write_json(self, path: Path, data: Dict[str, Any]) -> None:
+        # Staged in the spool itself so that the rename stays on one filesystem.
+        staging = self._staging_dir / f"{uuid.uuid4().hex}.tmp"
+        staging.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(staging, path)
+
+
+@dataclass
+class _Claim:
+    descriptor_path: Path
+    record: TaskRecord
+    attempts: int
+
+
+class SpoolWorker:
+    """Claims jobs from a :class:`Spool` and runs them on a local :class:`ServiceLayer`.
+
+    Up to ``concurrency`` jobs are held at once. A heartbeat thread renews
+    their leases (with the task's latest progress), and cancels a task whose
+    lease was lost or whose job was cancelled through the spool.
+    """
+
+    def __init__(
+        self,
+        spool: Spool,
+        service: Optional[ServiceLayer] = None,
+        concurrency: Optional[int] = None,
+        poll_interval: float = 1.0,
+    ) -> None:
+        if service is None:
+            service = ServiceLayer(queue=TaskQueue(workers=concurrency or os.cpu_count() or 1, max_records=1000))
+        if not service.queue.concurrent:
+            raise ValueError("SpoolWorker needs a ServiceLayer with a concurrent TaskQueue.")
+        self.spool = spool
+        self.service = service
+        self.concurrency = concurrency or service.queue.workers
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = spool.lease_seconds / 4
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._claims: Dict[str, _Claim] = {}
+        self._claims_lock = threading.Lock()
+        # (spool task id, finished queue record) pairs for the run loop.
+        self._finished: "queue.Queue[Tuple[str, TaskRecord]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def run(self, drain: bool = False) -> int:
+        """Work until :meth:`stop` (or, with ``drain``, until the spool is empty).
+
+        Returns the number of results written. Jobs still held when the
+        worker stops are cancelled and their leases released, so that other
+        workers can take them straight away.
+        """
+        written = 0
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="spool-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            while not self._stop.is_set():
+                try:
+                    written += self._collect_finished()
+                    claimed = len(self._claims) < self.concurrency and self._claim_next()
+                except (OSError, SpoolError) as exc:
+                    # A shared mount can drop out for a while; keep trying.
+                    print(f"Spool unavailable: {exc}", file=sys.stderr)
+                    claimed = False
+                if claimed:
+                    continue
+                if drain and not self._claims and not self.spool.pending():
+                    break
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+        finally:
+            self._stop.set()
+            heartbeat.join()
+            self._abandon_claims()
+        return written
+
+    def _claim_next(self) -> bool:
+        for name in self.spool.pending():
+            task_id = _task_id_from_name(name)
+            if task_id in self._claims or not self.spool._acquire_lease(task_id, self.owner):
+                continue
+            descriptor_path = self.spool.jobs_dir / name
+            try:
+                descriptor = _read_json(descriptor_path)
+            except SpoolError as exc:
+                # Descriptors are written atomically, so this one stays broken;
+                # finish it rather than trip over it on every pass.
+                self.spool._finish_unrun(task_id, descriptor_path, self.owner, "failed", str(exc))
+                return True
+            if descriptor is None or self.spool.result_path(task_id).exists():
+                # Finished by another worker since the directory was listed.
+                self.spool._cleanup(task_id, descriptor_path, self.owner)
+                continue
+            if (self.spool.cancel_dir / task_id).exists():
+                self.spool._finish_unrun(task_id, descriptor_path, self.owner, "cancelled", "Cancelled before start.")
+                return True
+            attempts = descriptor.get("attempts", 0) + 1
+            if attempts > self.spool.max_attempts:
+                self.spool._finish_unrun(
+                    task_id,
+                    descriptor_path,
+                    self.owner,
+                    "failed",
+                    f"Abandoned after {attempts - 1} attempts whose workers stopped responding.",
+                )
+                return True
+            try:
+                cwd = descriptor.get("cwd")
+                kind, job = decode_job(descriptor, base_dir=Path(cwd) if cwd else None)
+            except (JobCodecError, TypeError, ValueError) as exc:
+                self.spool._finish_unrun(task_id, descriptor_path, self.owner, "failed", f"Invalid job: {exc}")
+                return True
+            self.spool._write_json(descriptor_path, {**descriptor, "attempts": attempts})
+            # Every claim gets a queue task of its own: an earlier run of the
+            # same job (one whose lease this worker lost) may still be held
+            # in the queue's records.
+            queue_id = f"{task_id}.{uuid.uuid4().hex[:8]}"
+            try:
+                record = self.service.submit_job(kind, job, descriptor.get("priority", 0), task_id=queue_id)
+            except Exception as exc:  # noqa: BLE001
+                print(f"Could not queue {task_id}: {exc}", file=sys.stderr)
+                self._give_back(task_id, descriptor_path, attempts)
+                return False
+            with self._claims_lock:
+                self._claims[task_id] = _Claim(descriptor_path, record, attempts)
+            self.service.queue.future(queue_id).add_done_callback(functools.partial(self._on_done, task_id))
+            return True
+        return False
+
+    def _on_done(self, task_id: str, future: Future) -> None:
+        # Runs under the queue's lock; the files are written by the run loop.
+        self._finished.put((task_id, future.result()))
+        self._wake.set()
+
+    def _collect_finished(self) -> int:
+        written = 0
+        while True:
+            try:
+                task_id, record = self._finished.get_nowait()
+            except queue.Empty:
+                return written
+            with self._claims_lock:
+                claim = self._claims.get(task_id)
+                if claim is None or claim.record is not record:
+                    continue
+                del self._claims[task_id]
+            # A lost lease means another worker may be running the job again;
+            # its result is the one that counts.
+            if not self.spool._renew_lease(task_id, self.owner):
+                continue
+            result = {**encode_task(record), "task_id": task_id, "attempts": claim.attempts}
+            self.spool._write_result(task_id, result, self.owner)
+            written += 1
+            # Lost while the result was being written: the new owner will
+            # overwrite the result and cleans up the job itself.
+            if self.spool._holds_lease(task_id, self.owner):
+                self.spool._cleanup(task_id, claim.descriptor_path, self.owner)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self.heartbeat_interval):
+            with self._claims_lock:
+                claims = list(self._claims.items())
+            for task_id, claim in claims:
+                try:
+                    progress = to_json_value(claim.record.progress)
+                    if not self.spool._renew_lease(task_id, self.owner, progress):
+                        self.service.cancel(claim.record.task_id)
+                    elif (self.spool.cancel_dir / task_id).exists():
+                        self.service.cancel(claim.record.task_id)
+                except (OSError, SpoolError) as exc:
+                    # Keep going: a dead heartbeat would let every lease expire.
+                    print(f"Could not renew the lease on {task_id}: {exc}", file=sys.stderr)
+
+    def _abandon_claims(self) -> None:
+        with self._claims_lock:
+            claims, self._claims = self._claims, {}
+        for task_id, claim in claims.items():
+            self.service.cancel(claim.record.task_id)
+            self._give_back(task_id, claim.descriptor_path, claim.attempts)
+
+    def _give_back(self, task_id: str, descriptor_path: Path, attempts: int) -> None:
+        """Release a claimed job for other workers without counting the attempt."""
+        try:
+            descriptor = _read_json(descriptor_path)
+            if descriptor is not None:
+                self.spool._write_json(descriptor_path, {**descriptor, "attempts": attempts - 1})
+            self.spool._release_lease(task_id, self.owner)
+        except (OSError, SpoolError):
+            pass
+
+
+def _task_id_from_name(name: str) -> str:
+    return name.split("-", 2)[2][: -len(".json")]
+
+
+def _lease_body(task_id: str, owner: str) -> Dict[str, Any]:
+    return {"task_id": task_id, "owner": owner, "claimed_at": time.time()}
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except ValueError as exc:
+        raise SpoolError(f"Corrupt spool file {path}: {exc}") from exc
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run or feed a shared SH-file-helper job spool")
+    parser.add_argument("spool", type=Path, help="Spool directory, e.g. on a shared mount.")
+    parser.add_argument(
+        "--lease-seconds",
+        default=60.0,
+        type=float,
+        help="How long a silent worker keeps its jobs before others may take them.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    worker = commands.add_parser("worker", help="Claim and run jobs.")
+    worker.add_argument("--workers", default=os.cpu_count() or 1, type=int, help="Jobs run at once.")
+    worker.add_argument(
+        "--libreoffice-instances",
+        default=0,
+        type=int,
+        help="Warm LibreOffice instances to keep for Office conversions.",
+    )
+    worker.add_argument("--drain", action="store_true", help="Exit once the spool is empty.")
+
+    submit = commands.add_parser("submit", help="Queue a job.")
+    submit.add_argument("kind", help="Job kind, e.g. conversion, ocr_pdf, glossary.")
+    submit.add_argument("job", help="The job's fields as a JSON object.")
+    submit.add_argument("--priority", default=0, type=int, help="Higher runs sooner.")
+
+    for name, help_text in (("status", "Show a job."), ("cancel", "Cancel a job.")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("task_id")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    spool = Spool(args.spool, lease_seconds=args.lease_seconds)
+    if args.command == "submit":
+        kind, job = decode_job({"kind": args.kind, "job": json.loads(args.job)})
+        print(spool.submit(kind, job, args.priority))
+        return 0
+    if args.command == "status":
+        status = spool.status(args.task_id)
+        print(json.dumps(status, indent=2, ensure_ascii=False))
+        return 0 if status is not None else 1
+    if args.command == "cancel":
+        return 0 if spool.cancel(args.task_id) else 1
+
+    pool = LibreOfficePool(size=args.libreoffice_instances) if args.libreoffice_instances > 0 else None
+    if pool is not None:
+        pool.start()
+    service = ServiceLayer(
+        libreoffice_pool=pool,
+        queue=TaskQueue(workers=args.workers, max_records=1000),
+    )
+    worker = SpoolWorker(spool, service, concurrency=args.workers)
+    try:
+        written = worker.run(drain=args.drain)
+    except KeyboardInterrupt:
+        print(f"{worker.owner}: stopped; unfinished jobs were returned to the spool", file=sys.stderr)
+        return 130
+    finally:
+        service.queue.shutdown(wait=False)
+        if pool is not None:
+            pool.close()
+    print(f"{worker.owner}: {written} result(s) written", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
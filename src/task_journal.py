@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+from job_codec import JobCodecError, decode_job, encode_job, to_json_value
+from task_queue import TaskRecord, TaskStatus
+
+if TYPE_CHECKING:
+    from service import ServiceLayer
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    kind TEXT,
+    job_json TEXT,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    result_json TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, created_at);
+"""
+
+# The job is written once, when the task is queued; later updates leave it
+# (and the original creation time) alone.
+_UPSERT = """
+INSERT INTO tasks (
+    task_id, description, kind, job_json, status, priority,
+    created_at, started_at, finished_at, result_json, error
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (task_id) DO UPDATE SET
+    description = excluded.description,
+    kind = excluded.kind,
+    job_json = COALESCE(excluded.job_json, tasks.job_json),
+    status = excluded.status,
+    priority = excluded.priority,
+    started_at = excluded.started_at,
+    finished_at = excluded.finished_at,
+    result_json = excluded.result_json,
+    error = excluded.error
+"""
+
+_COLUMNS = (
+    "task_id, description, kind, job_json, status, priority, "
+    "created_at, started_at, finished_at, result_json, error"
+)
+
+_CLOSE = object()
+
+_Row = Tuple[Any, ...]
+
+
+class TaskJournalError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    """A task as last recorded in the journal; ``job`` and ``result`` are JSON data."""
+
+    task_id: str
+    description: str
+    kind: Optional[str]
+    job: Optional[dict]
+    status: TaskStatus
+    priority: int
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    result: Any
+    error: Optional[str]
+
+
+class TaskJournal:
+    """Persist task records and their jobs to SQLite so work survives a crash.
+
+    Attach it with ``ServiceLayer(journal=...)``: every status change of a
+    queued task is recorded, and tasks that were pending or running when the
+    process died are queued again (under their old ids) on startup.
+
+    :meth:`record` never touches the database. A background thread writes
+    queued changes in batches, one transaction at most every
+    ``flush_interval`` seconds, and the database runs in WAL mode with
+    ``synchronous=NORMAL``, so a burst of short tasks costs a handful of
+    commits rather than one fsync per change. The changes of the last
+    interval can be lost on power failure, not on a process crash.
+    """
+
+    def __init__(self, path: Path, flush_interval: float = 0.2, batch_size: int = 500) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._connection = sqlite3.connect(str(path), check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(_SCHEMA)
+        except sqlite3.Error as exc:
+            raise TaskJournalError(f"Cannot open task journal {path}: {exc}") from exc
+        self._db_lock = threading.Lock()
+        self._changes: "queue.Queue[object]" = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="task-journal", daemon=True)
+        self._writer.start()
+
+    def __enter__(self) -> "TaskJournal":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    def record(self, record: TaskRecord) -> None:
+        """Queue a snapshot of ``record`` for writing (a ``TaskQueue`` listener).
+
+        Jobs the codec cannot serialize are journaled without one and are not
+        replayed. Changes arriving after :meth:`close` are dropped.
+        """
+        if self._closed:
+            return
+        self._changes.put(_snapshot(record))
+
+    def flush(self) -> None:
+        """Block until every change recorded so far is committed."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._changes.put(done)
+        done.wait()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._changes.put(_CLOSE)
+        self._writer.join()
+        with self._db_lock:
+            self._connection.close()
+
+    def get(self, task_id: str) -> Optional[JournalEntry]:
+        self.flush()
+        rows = self._query(f"SELECT {_COLUMNS} FROM tasks WHERE task_id = ?", (task_id,))
+        return _entry(rows[0]) if rows else None
+
+    def list(self, status: Optional[TaskStatus] = None, limit: Optional[int] = None) -> List[JournalEntry]:
+        """Journaled tasks, oldest first, optionally only those with ``status``."""
+        self.flush()
+        sql = f"SELECT {_COLUMNS} FROM tasks"
+        params: List[Any] = []
+        if status is not None:
+            sql += " WHERE status = ?"
+            params.append(TaskStatus(status).value)
+        sql += " ORDER BY created_at"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [_entry(row) for row in self._query(sql, params)]
+
+    def interrupted(self) -> List[JournalEntry]:
+        """Tasks that never finished, e.g. because the process was killed."""
+        entries = self.list(TaskStatus.PENDING) + self.list(TaskStatus.RUNNING)
+        return sorted(entries, key=lambda entry: entry.created_at)
+
+    def recover(self, service: ServiceLayer) -> List[TaskRecord]:
+        """Queue every interrupted task on ``service`` again, keeping its task id.
+
+        Tasks whose job cannot be decoded are marked failed instead.
+        """
+        recovered: List[TaskRecord] = []
+        for entry in self.interrupted():
+            if service.queue.get_task(entry.task_id) is not None:
+                continue
+            try:
+                if entry.kind is None or entry.job is None:
+                    raise JobCodecError("no replayable job was journaled")
+                kind, job = decode_job({"kind": entry.kind, "job": entry.job})
+            except JobCodecError as exc:
+                self._mark_failed(entry.task_id, f"Interrupted and cannot be resumed: {exc}")
+                continue
+            recovered.append(
+                service.submit_job(kind, job, priority=entry.priority, task_id=entry.task_id)
+            )
+        return recovered
+
+    def _mark_failed(self, task_id: str, error: str) -> None:
+        with self._db_lock:
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE tasks SET status = ?, error = ?, finished_at = ? WHERE task_id = ?",
+                    (TaskStatus.FAILED.value, error, datetime.utcnow().isoformat(), task_id),
+                )
+
+    def _query(self, sql: str, params: Any) -> List[_Row]:
+        with self._db_lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def _write_loop(self) -> None:
+        while True:
+            batch: List[_Row] = []
+            waiters: List[threading.Event] = []
+            closing = False
+            item = self._changes.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _CLOSE:
+                    closing = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if closing or waiters or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._changes.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+            if closing:
+                return
+
+    def _write(self, batch: List[_Row]) -> None:
+        with self._db_lock:
+            try:
+                with self._connection:
+                    self._connection.executemany(_UPSERT, batch)
+            except sqlite3.Error:
+                # Losing journal rows must not take the queue down with it.
+                pass
+
+
+def _snapshot(record: TaskRecord) -> _Row:
+    job_json: Optional[str] = None
+    if record.status == TaskStatus.PENDING and record.kind is not None:
+        try:
+            job_json = json.dumps(encode_job(record.kind, record.job)["job"])
+        except JobCodecError:
+            job_json = None
+    result_json = json.dumps(to_json_value(record.result)) if record.result is not None else None
+    return (
+        record.task_id,
+        record.description,
+        record.kind,
+        job_json,
+        TaskStatus(record.status).value,
+        record.priority,
+        record.created_at.isoformat(),
+        _isoformat(record.started_at),
+        _isoformat(record.finished_at),
+        result_json,
+        record.error,
+    )
+
+
+def _entry(row: _Row) -> JournalEntry:
+    (task_id, description, kind, job_json, status, priority,
+     created_at, started_at, finished_at, result_json, error) = row
+    return JournalEntry(
+        task_id=task_id,
+        description=description,
+        kind=kind,
+        job=json.loads(job_json) if job_json is not None else None,
+        status=TaskStatus(status),
+        priority=priority,
+        created_at=datetime.fromisoformat(created_at),
+        started_at=_parse(started_at),
+        finished_at=_parse(finished_at),
+        result=json.loads(result_json) if result_json is not None else None,
+        error=error,
+    )
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _parse(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
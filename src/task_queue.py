@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import contextlib
+import contextvars
 import enum
+import heapq
+import itertools
+import threading
 import uuid
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime, timedelta
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from metrics import StageMetrics, record_metrics
+from progress import ProgressCallback, ProgressEvent, ProgressThrottle
 
 
 class TaskStatus(str, enum.Enum):
@@ -12,6 +22,19 @@ class TaskStatus(str, enum.Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+
+
+FINISHED_STATUSES = frozenset(
+    {TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED, TaskStatus.TIMED_OUT}
+)
+
+# How often smaller tasks may overtake a task waiting for memory before the
+# dispatcher holds them back until it has been admitted.
+_MAX_BYPASSES = 16
+# How many tasks waiting for memory the dispatcher looks past for backfill.
+_BACKFILL_WINDOW = 64
 
 
 @dataclass
@@ -24,36 +47,232 @@ class TaskRecord:
     finished_at: Optional[datetime] = None
     result: Any = None
     error: Optional[str] = None
+    priority: int = 0
+    cancel_requested: bool = False
+    kind: Optional[str] = None
+    job: Any = None
+    progress: Optional[ProgressEvent] = None
+    depends_on: Optional[str] = None
+    memory_estimate: int = 0
+    metrics: List[StageMetrics] = field(default_factory=list)
+
+
+class TaskCancelled(Exception):
+    """Raised inside a handler that stops early because its task was cancelled."""
+
+
+_CURRENT_TASK: contextvars.ContextVar[Optional[TaskRecord]] = contextvars.ContextVar(
+    "current_task", default=None
+)
+_CURRENT_QUEUE: contextvars.ContextVar[Optional["TaskQueue"]] = contextvars.ContextVar(
+    "current_queue", default=None
+)
+
+
+def current_task() -> Optional[TaskRecord]:
+    """The record of the task whose handler is running on this thread, if any."""
+    return _CURRENT_TASK.get()
+
+
+def raise_if_cancelled() -> None:
+    """Cooperative cancellation point for long-running handlers."""
+    record = _CURRENT_TASK.get()
+    if record is not None and record.cancel_requested:
+        raise TaskCancelled(f"Task {record.task_id} was cancelled.")
+
+
+def task_progress(interval: float = 0.25) -> Optional[ProgressCallback]:
+    """A callback that records progress on the current task, or ``None`` outside one.
+
+    Updates are throttled to one per ``interval`` seconds, and every report
+    is also a cancellation point. Tasks run in a process pool report nothing.
+    """
+    record = _CURRENT_TASK.get()
+    queue = _CURRENT_QUEUE.get()
+    if record is None or queue is None:
+        return None
+    throttle = ProgressThrottle(lambda event: queue._set_progress(record, event), interval)
+
+    def report(event: ProgressEvent) -> None:
+        if record.cancel_requested:
+            raise TaskCancelled(f"Task {record.task_id} was cancelled.")
+        throttle(event)
+
+    return report
 
 
 class TaskQueue:
-    def __init__(self) -> None:
-        self._tasks: List[TaskRecord] = []
+    """Runs queued task handlers, highest ``priority`` first, FIFO within a priority.
+
+    With ``workers=0`` (the default) handlers run on the caller's thread from
+    :meth:`run_next` / :meth:`run_all`. With ``workers > 0`` tasks are
+    dispatched to a thread (or, with ``executor="process"``, process) pool as
+    soon as they are enqueued. Process pools need picklable handlers and can
+    only cancel tasks that have not started.
+
+    A task enqueued with ``depends_on`` stays pending, without holding a
+    worker, until that other task has finished (however it finished).
+
+    With a ``memory_budget`` (bytes), concurrent mode only starts a task if
+    its ``memory_estimate`` fits next to those already running; a task over
+    the whole budget runs alone and tasks estimated at zero always start.
+    Smaller tasks further back in the queue may start around one that is
+    waiting for memory, but only a limited number of times, so big tasks
+    are not starved.
+
+    Handlers are dropped as soon as their task finishes. Finished records are
+    kept until there are more than ``max_records`` of them or they are older
+    than ``max_age``; ``None`` disables either limit. A pruned task is
+    forgotten entirely: ``get_task`` returns ``None`` and ``future``/``wait``
+    raise ``KeyError``, so hold on to the future to see a result later.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        executor: str = "thread",
+        max_records: Optional[int] = None,
+        max_age: Optional[timedelta] = None,
+        memory_budget: Optional[int] = None,
+    ) -> None:
+        if workers < 0:
+            raise ValueError("workers must be zero (inline) or positive.")
+        if executor not in {"thread", "process"}:
+            raise ValueError("executor must be 'thread' or 'process'.")
+        self.workers = workers
+        self.executor_kind = executor
+        self.max_records = max_records
+        self.max_age = max_age
+        self.memory_budget = memory_budget
+        self._memory_in_use = 0
+        self._bypasses: Dict[str, int] = {}
+        self._tasks: Dict[str, TaskRecord] = {}
+        self._active: Dict[str, TaskRecord] = {}
+        self._finished: Deque[str] = deque()
         self._handlers: Dict[str, Callable[[], Any]] = {}
+        self._futures: Dict[str, Future] = {}
+        self._pending: List[Tuple[int, int, str]] = []
+        self._dependents: Dict[str, List[str]] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.RLock()
+        self._running = 0
+        self._executor: Optional[Executor] = None
+        self._listeners: List[Callable[[TaskRecord], None]] = []
+        self._progress_listeners: List[Callable[[TaskRecord], None]] = []
+
+    @property
+    def concurrent(self) -> bool:
+        return self.workers > 0
 
-    def enqueue(self, description: str, handler: Callable[[], Any]) -> TaskRecord:
-        task_id = uuid.uuid4().hex
-        record = TaskRecord(task_id=task_id, description=description)
-        self._tasks.append(record)
-        self._handlers[task_id] = handler
+    def enqueue(
+        self,
+        description: str,
+        handler: Callable[[], Any],
+        priority: int = 0,
+        task_id: Optional[str] = None,
+        kind: Optional[str] = None,
+        job: Any = None,
+        depends_on: Optional[str] = None,
+        memory_estimate: int = 0,
+    ) -> TaskRecord:
+        task_id = task_id or uuid.uuid4().hex
+        record = TaskRecord(
+            task_id=task_id,
+            description=description,
+            priority=priority,
+            kind=kind,
+            job=job,
+            depends_on=depends_on,
+            memory_estimate=memory_estimate,
+        )
+        with self._lock:
+            if task_id in self._tasks:
+                raise ValueError(f"Duplicate task id: {task_id}")
+            self._tasks[task_id] = record
+            self._active[task_id] = record
+            self._handlers[task_id] = handler
+            self._futures[task_id] = Future()
+            if depends_on is not None and depends_on in self._active:
+                self._dependents.setdefault(depends_on, []).append(task_id)
+            else:
+                self._push_pending_locked(record)
+            self._notify_locked(record)
+            if self.concurrent:
+                self._dispatch_locked()
         return record
 
+    def add_listener(self, listener: Callable[[TaskRecord], None], progress: bool = False) -> None:
+        """Call ``listener(record)`` after every status change.
+
+        With ``progress=True`` it is also called when a running task reports
+        progress. Listeners run under the queue lock on whichever thread made
+        the change, so they must be quick and must not block on the queue.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            if progress:
+                self._progress_listeners.append(listener)
+
     def list_tasks(self) -> List[TaskRecord]:
-        return list(self._tasks)
+        with self._lock:
+            self._prune_locked()
+            return list(self._tasks.values())
 
     def get_task(self, task_id: str) -> Optional[TaskRecord]:
-        for task in self._tasks:
-            if task.task_id == task_id:
-                return task
-        return None
+        return self._tasks.get(task_id)
 
-    def run_next(self) -> Optional[TaskRecord]:
-        for record in self._tasks:
+    def future(self, task_id: str) -> Future:
+        """A future that resolves to the task's record once it has finished.
+
+        Raises ``KeyError`` if the task is unknown or was already pruned.
+        """
+        with self._lock:
+            try:
+                return self._futures[task_id]
+            except KeyError:
+                raise KeyError(f"Unknown or pruned task: {task_id}") from None
+
+    def cancel(self, task_id: str) -> bool:
+        """Cancel a pending task, or ask a running one to stop at its next check.
+
+        Returns False if the task is unknown or already finished.
+        """
+        with self._lock:
+            record = self.get_task(task_id)
+            if record is None or record.status in FINISHED_STATUSES:
+                return False
+            record.cancel_requested = True
             if record.status == TaskStatus.PENDING:
-                return self._run_task(record)
-        return None
+                self._finish_locked(
+                    record, error="Cancelled before start.", status=TaskStatus.CANCELLED
+                )
+                if self.concurrent:
+                    self._dispatch_locked()
+            return True
+
+    def run_next(self) -> Optional[TaskRecord]:
+        """Run the next pending task inline; in concurrent mode wait for one instead."""
+        if self.concurrent:
+            with self._lock:
+                waiting = next(iter(self._active), None)
+                future = self._futures[waiting] if waiting is not None else None
+            return future.result() if future is not None else None
+
+        with self._lock:
+            record = self._pop_pending_locked()
+        if record is None:
+            return None
+        return self._run_task(record)
 
     def run_all(self) -> List[TaskRecord]:
+        """Run (inline) or wait for (concurrent) every task queued so far."""
+        if self.concurrent:
+            with self._lock:
+                waiting = [(task, self._futures[task_id]) for task_id, task in self._active.items()]
+            for _, future in waiting:
+                future.result()
+            return [task for task, _ in waiting]
+
         completed: List[TaskRecord] = []
         while True:
             record = self.run_next()
@@ -62,21 +281,241 @@ class TaskQueue:
             completed.append(record)
         return completed
 
+    def wait(self, task_id: str, timeout: Optional[float] = None) -> TaskRecord:
+        """Block until the task has finished, running it now if the queue is inline.
+
+        Raises ``KeyError`` like :meth:`future`.
+        """
+        if not self.concurrent:
+            with self._lock:
+                record = self.get_task(task_id)
+                # The heap entry is skipped later because the status changes.
+                runnable = record is not None and record.status == TaskStatus.PENDING
+                dependency = record.depends_on if runnable else None
+            if dependency is not None and dependency in self._active:
+                self.wait(dependency)
+            if runnable:
+                self._run_task(record)
+        return self.future(task_id).result(timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _push_pending_locked(self, record: TaskRecord) -> None:
+        heapq.heappush(self._pending, (-record.priority, next(self._sequence), record.task_id))
+
+    def _pop_pending_locked(self) -> Optional[TaskRecord]:
+        entry = self._pop_pending_entry_locked()
+        return entry[1] if entry is not None else None
+
+    def _pop_pending_entry_locked(self) -> Optional[Tuple[Tuple[int, int, str], TaskRecord]]:
+        while self._pending:
+            entry = heapq.heappop(self._pending)
+            record = self.get_task(entry[2])
+            if record is not None and record.status == TaskStatus.PENDING:
+                return entry, record
+        return None
+
+    def _dispatch_locked(self) -> None:
+        # Tasks passed over for lack of memory go back with their original
+        # heap entries, so they keep their place in the queue.
+        waiting: List[Tuple[Tuple[int, int, str], TaskRecord]] = []
+        try:
+            while self._running < self.workers:
+                entry = self._pop_pending_entry_locked()
+                if entry is None:
+                    return
+                record = entry[1]
+                if not self._fits_memory_locked(record):
+                    waiting.append(entry)
+                    if len(waiting) >= _BACKFILL_WINDOW:
+                        return
+                    continue
+                if waiting:
+                    blocked = waiting[0][1].task_id
+                    self._bypasses[blocked] = self._bypasses.get(blocked, 0) + 1
+                    if self._bypasses[blocked] > _MAX_BYPASSES:
+                        waiting.append(entry)
+                        return
+                self._start_locked(record)
+        finally:
+            for entry in waiting:
+                heapq.heappush(self._pending, entry[0])
+
+    def _fits_memory_locked(self, record: TaskRecord) -> bool:
+        if self.memory_budget is None or self._memory_in_use == 0 or record.memory_estimate == 0:
+            return True
+        return self._memory_in_use + record.memory_estimate <= self.memory_budget
+
+    def _start_locked(self, record: TaskRecord) -> None:
+        handler = self._handlers.pop(record.task_id, None)
+        if handler is None:
+            self._finish_locked(record, error="Task handler not found.")
+            return
+        self._bypasses.pop(record.task_id, None)
+        self._running += 1
+        self._memory_in_use += record.memory_estimate
+        executor = self._get_executor_locked()
+        if self.executor_kind == "process":
+            # A child process cannot report when it starts; count the task
+            # as running from the moment a worker slot is reserved for it.
+            self._mark_running(record)
+            future = executor.submit(handler)
+        else:
+            future = executor.submit(self._execute, record, handler)
+        future.add_done_callback(lambda done, record=record: self._on_done(record, done))
+
+    def _get_executor_locked(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="task-queue"
+                )
+        return self._executor
+
+    def _execute(self, record: TaskRecord, handler: Callable[[], Any]) -> Any:
+        with self._lock:
+            if record.status != TaskStatus.PENDING:
+                raise TaskCancelled(f"Task {record.task_id} was cancelled.")
+            self._mark_running(record)
+        with self._task_context(record):
+            return handler()
+
+    def _on_done(self, record: TaskRecord, future: Future) -> None:
+        with self._lock:
+            self._running -= 1
+            self._memory_in_use -= record.memory_estimate
+            if record.status in FINISHED_STATUSES:
+                pass
+            elif future.cancelled():
+                self._finish_locked(record, error="Cancelled.", status=TaskStatus.CANCELLED)
+            else:
+                exc = future.exception()
+                if exc is None:
+                    self._finish_locked(record, result=future.result())
+                else:
+                    self._finish_with_error_locked(record, exc)
+            self._dispatch_locked()
+
     def _run_task(self, record: TaskRecord) -> TaskRecord:
-        handler = self._handlers.get(record.task_id)
+        with self._lock:
+            handler = self._handlers.pop(record.task_id, None)
         if handler is None:
-            record.status = TaskStatus.FAILED
-            record.error = "Task handler not found."
-            record.finished_at = datetime.utcnow()
+            with self._lock:
+                self._finish_locked(record, error="Task handler not found.")
             return record
 
-        record.status = TaskStatus.RUNNING
-        record.started_at = datetime.utcnow()
+        with self._lock:
+            self._mark_running(record)
         try:
-            record.result = handler()
-            record.status = TaskStatus.COMPLETED
+            with self._task_context(record):
+                result = handler()
         except Exception as exc:  # noqa: BLE001
-            record.status = TaskStatus.FAILED
-            record.error = str(exc)
+            with self._lock:
+                self._finish_with_error_locked(record, exc)
+        else:
+            with self._lock:
+                self._finish_locked(record, result=result)
+        return record
+
+    @contextlib.contextmanager
+    def _task_context(self, record: TaskRecord) -> Iterator[None]:
+        task_token = _CURRENT_TASK.set(record)
+        queue_token = _CURRENT_QUEUE.set(self)
+        try:
+            with record_metrics(record.metrics):
+                yield
+        finally:
+            _CURRENT_QUEUE.reset(queue_token)
+            _CURRENT_TASK.reset(task_token)
+
+    def _set_progress(self, record: TaskRecord, event: ProgressEvent) -> None:
+        with self._lock:
+            if record.status != TaskStatus.RUNNING:
+                return
+            record.progress = event
+            for listener in self._progress_listeners:
+                listener(record)
+
+    def _mark_running(self, record: TaskRecord) -> None:
+        record.status = TaskStatus.RUNNING
+        record.started_at = datetime.utcnow()
+        self._notify_locked(record)
+
+    def _notify_locked(self, record: TaskRecord) -> None:
+        for listener in self._listeners:
+            listener(record)
+
+    def _finish_with_error_locked(self, record: TaskRecord, exc: BaseException) -> None:
+        if isinstance(exc, TaskCancelled):
+            status = TaskStatus.CANCELLED
+        elif _caused_by_timeout(exc):
+            status = TaskStatus.TIMED_OUT
+        else:
+            status = TaskStatus.FAILED
+        self._finish_locked(record, error=str(exc), status=status)
+
+    def _finish_locked(
+        self,
+        record: TaskRecord,
+        result: Any = None,
+        error: Optional[str] = None,
+        status: Optional[TaskStatus] = None,
+    ) -> None:
+        record.result = result
+        record.error = error
+        record.status = status or (TaskStatus.FAILED if error is not None else TaskStatus.COMPLETED)
         record.finished_at = datetime.utcnow()
-        return record
\ No newline at end of file
+        self._handlers.pop(record.task_id, None)
+        self._bypasses.pop(record.task_id, None)
+        self._active.pop(record.task_id, None)
+        self._finished.append(record.task_id)
+        for dependent_id in self._dependents.pop(record.task_id, ()):
+            dependent = self._tasks.get(dependent_id)
+            if dependent is not None and dependent.status == TaskStatus.PENDING:
+                self._push_pending_locked(dependent)
+        self._notify_locked(record)
+        future = self._futures.get(record.task_id)
+        if future is not None and not future.done():
+            future.set_result(record)
+        self._prune_locked()
+
+    def _prune_locked(self) -> None:
+        """Forget the oldest finished records beyond the retention limits."""
+        cutoff = datetime.utcnow() - self.max_age if self.max_age is not None else None
+        while self._finished:
+            oldest = self._tasks.get(self._finished[0])
+            over_count = self.max_records is not None and len(self._finished) > self.max_records
+            expired = (
+                cutoff is not None
+                and oldest is not None
+                and oldest.finished_at is not None
+                and oldest.finished_at < cutoff
+            )
+            if oldest is not None and not over_count and not expired:
+                break
+            task_id = self._finished.popleft()
+            self._tasks.pop(task_id, None)
+            self._futures.pop(task_id, None)
+
+
+def _caused_by_timeout(exc: BaseException) -> bool:
+    """Whether a ``TimeoutError`` (e.g. a killed subprocess) is behind ``exc``.
+
+    Only explicit causes (``raise ... from``) count: an error that merely
+    happened while handling an earlier timeout, such as a retry failing
+    differently, is not a timeout.
+    """
+    seen = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        if isinstance(current, TimeoutError):
+            return True
+        seen.add(id(current))
+        current = current.__cause__
+    return False
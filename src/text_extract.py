@@ -7,6 +7,7 @@ from typing import Iterable, List
 from docx import Document
 from pptx import Presentation
 
+from metrics import span
 from ocr import OcrRequest, ocr_pdf
 
 
@@ -27,11 +28,14 @@ def extract_text(request: TextExtractRequest) -> str:
 
     suffix = request.input_path.suffix.lower()
     if suffix == ".txt":
-        return request.input_path.read_text(encoding="utf-8")
+        with span("text_extract.txt"):
+            return request.input_path.read_text(encoding="utf-8")
     if suffix == ".docx":
-        return _extract_docx_text(request.input_path)
+        with span("text_extract.docx"):
+            return _extract_docx_text(request.input_path)
     if suffix == ".pptx":
-        return _extract_pptx_text(request.input_path)
+        with span("text_extract.pptx"):
+            return _extract_pptx_text(request.input_path)
     if suffix == ".pdf":
         return _extract_pdf_text(request)
 
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing.process
+import os
+import signal
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Sequence, Tuple, Type, TypeVar, Union
+
+_MB = 1024 * 1024
+
+T = TypeVar("T")
+
+
+class ProcessTimeout(TimeoutError):
+    """An external tool ran past the time allowed for its stage.
+
+    A ``TimeoutError`` anywhere in a failed task's exception chain gives the
+    task the ``TIMED_OUT`` status instead of ``FAILED``.
+    """
+
+    def __init__(self, stage: str, timeout: float, detail: str = "") -> None:
+        message = f"{stage} timed out after {timeout:g}s"
+        super().__init__(f"{message}: {detail}" if detail else message)
+        self.stage = stage
+        self.timeout = timeout
+
+
+@dataclass(frozen=True)
+class TimeoutPolicy:
+    """``base`` seconds plus an allowance per file, per page and per MB of input."""
+
+    base: float
+    per_file: float = 0.0
+    per_page: float = 0.0
+    per_mb: float = 0.0
+    maximum: Optional[float] = None
+
+    def timeout_for(self, files: int = 1, pages: int = 0, size_bytes: int = 0) -> float:
+        timeout = (
+            self.base
+            + self.per_file * files
+            + self.per_page * pages
+            + self.per_mb * size_bytes / _MB
+        )
+        return min(timeout, self.maximum) if self.maximum is not None else timeout
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Try an operation up to ``attempts`` times when it raises one of ``retry_on``."""
+
+    attempts: int = 1
+    backoff: float = 1.0
+    retry_on: Tuple[Type[BaseException], ...] = (ProcessTimeout,)
+
+    def run(self, operation: Callable[[], T]) -> T:
+        attempt = 1
+        while True:
+            try:
+                return operation()
+            except self.retry_on:
+                if attempt >= self.attempts:
+                    raise
+            time.sleep(self.backoff * attempt)
+            attempt += 1
+
+    async def run_async(self, operation: Callable[[], Awaitable[T]]) -> T:
+        """:meth:`run` for coroutines; backs off without blocking the event loop."""
+        attempt = 1
+        while True:
+            try:
+                return await operation()
+            except self.retry_on:
+                if attempt >= self.attempts:
+                    raise
+            await asyncio.sleep(self.backoff * attempt)
+            attempt += 1
+
+
+# Per-stage limits; replace entries to tune them for a deployment.
+TIMEOUTS: Dict[str, TimeoutPolicy] = {
+    # soffice startup dominates small files; big decks and documents add up.
+    "libreoffice": TimeoutPolicy(base=60.0, per_file=30.0, per_mb=10.0, maximum=3600.0),
+    "poppler": TimeoutPolicy(base=30.0, per_page=5.0, per_mb=2.0, maximum=1800.0),
+    # Sized by the decoded image handed to Tesseract.
+    "tesseract": TimeoutPolicy(base=60.0, per_mb=5.0, maximum=600.0),
+    # pdf2docx's multi-processing mode; layout analysis is slow per page.
+    "pdf2docx": TimeoutPolicy(base=60.0, per_page=10.0, per_mb=5.0, maximum=3600.0),
+}
+
+# A hung soffice is usually a stuck profile or startup race, worth one more
+# try; Poppler, Tesseract and pdf2docx hang on the same page every time.
+RETRIES: Dict[str, RetryPolicy] = {
+    "libreoffice": RetryPolicy(attempts=2),
+    "poppler": RetryPolicy(attempts=1),
+    "tesseract": RetryPolicy(attempts=1),
+    "pdf2docx": RetryPolicy(attempts=1),
+}
+
+
+def stage_timeout(stage: str, files: int = 1, pages: int = 0, size_bytes: int = 0) -> float:
+    return TIMEOUTS[stage].timeout_for(files=files, pages=pages, size_bytes=size_bytes)
+
+
+def run_process(
+    command: Sequence[str],
+    timeout: float,
+    stage: str,
+) -> subprocess.CompletedProcess:
+    """``subprocess.run(check=True, capture_output=True, text=True)`` with a watchdog.
+
+    The command gets its own process group (session on POSIX), and the whole
+    group is killed on timeout, so helpers it forked (soffice.bin, oosplash)
+    are not left behind. Raises :class:`ProcessTimeout` on timeout.
+    """
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        **new_group_options(),
+    )
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired as exc:
+        kill_process_group(process)
+        process.communicate()
+        raise ProcessTimeout(stage, timeout, " ".join(command[:2])) from exc
+    except BaseException:
+        kill_process_group(process)
+        process.wait()
+        raise
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, stdout, stderr)
+    return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+
+def kill_process_group(
+    process: Union[subprocess.Popen, asyncio.subprocess.Process, multiprocessing.process.BaseProcess],
+) -> None:
+    """Kill ``process`` and everything in its process group.
+
+    The process must lead a group of its own: started with
+    :func:`new_group_options`, or (a ``multiprocessing`` child) having
+    called ``os.setsid()`` on POSIX.
+    """
+    if isinstance(process, subprocess.Popen):
+        finished = process.poll()
+    elif isinstance(process, multiprocessing.process.BaseProcess):
+        finished = process.exitcode
+    else:
+        finished = process.returncode
+    if finished is not None and os.name != "posix":
+        return
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                capture_output=True,
+                check=False,
+            )
+    except (ProcessLookupError, PermissionError, FileNotFoundError):
+        process.kill()
+
+
+def new_group_options() -> dict:
+    """``Popen`` keyword arguments that start the child in a process group of its own."""
+    if os.name == "posix":
+        return {"start_new_session": True}
+    return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}